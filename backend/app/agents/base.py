@@ -13,6 +13,8 @@ except ImportError:
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.deadline import get_current_deadline, record_degradation
+from app.core.tracing import trace_span
 
 logger = get_logger("agents.base")
 
@@ -135,6 +137,16 @@ CRITICAL GUARDRAILS - YOU MUST FOLLOW THESE:
         """Rough token estimation (~4 chars per token for English)."""
         return len(text) // 4
 
+    def _llm_timeout(self, default: float) -> float:
+        """Network timeout for an LLM call, capped by the request deadline."""
+        deadline = get_current_deadline()
+        return deadline.cap_timeout(default) if deadline else default
+
+    def _deadline_expired(self) -> bool:
+        """True if the active request deadline has no budget left for LLM calls."""
+        deadline = get_current_deadline()
+        return deadline is not None and deadline.expired()
+
     def _call_groq(self, prompt: str, max_retries: int = 3) -> Optional[str]:
         """Call Groq API with rate limit handling and retries."""
         import time
@@ -156,7 +168,7 @@ CRITICAL GUARDRAILS - YOU MUST FOLLOW THESE:
                         "temperature": 0.7,
                         "max_tokens": 2048
                     },
-                    timeout=60
+                    timeout=self._llm_timeout(60)
                 )
                 
                 if response.status_code == 200:
@@ -169,6 +181,11 @@ CRITICAL GUARDRAILS - YOU MUST FOLLOW THESE:
                     if retry_after:
                         wait_time = min(int(retry_after), 30)  # Cap at 30s
                     
+                    deadline = get_current_deadline()
+                    if deadline and wait_time >= deadline.remaining():
+                        logger.warning(f"[{self.name}] [WARN] Groq rate limit wait exceeds request deadline. Giving up.")
+                        return None
+                    
                     logger.warning(f"[{self.name}] ⏳ Groq rate limit. Waiting {wait_time}s (attempt {attempt+1}/{max_retries})...")
                     time.sleep(wait_time)
                     continue
@@ -179,7 +196,7 @@ CRITICAL GUARDRAILS - YOU MUST FOLLOW THESE:
                     
             except Exception as e:
                 logger.error(f"[{self.name}] [WARN] Groq error: {e}")
-                if attempt < max_retries - 1:
+                if attempt < max_retries - 1 and not self._deadline_expired():
                     time.sleep(2)
                     continue
                 return None
@@ -197,7 +214,7 @@ CRITICAL GUARDRAILS - YOU MUST FOLLOW THESE:
                     "prompt": prompt,
                     "stream": False
                 },
-                timeout=300  # 5 min timeout for larger models (14B)
+                timeout=self._llm_timeout(300)  # 5 min timeout for larger models (14B)
             )
             if response.status_code == 200:
                 return response.json().get("response", "")
@@ -221,6 +238,9 @@ CRITICAL GUARDRAILS - YOU MUST FOLLOW THESE:
                 error_str = str(e)
                 if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
                     wait_time = (2 ** attempt) * 2
+                    deadline = get_current_deadline()
+                    if deadline and wait_time >= deadline.remaining():
+                        return None
                     logger.warning(f"[{self.name}] [WARN] Gemini Rate Limit. Retry {attempt+1}/{max_retries} in {wait_time}s...")
                     time.sleep(wait_time)
                 else:
@@ -263,6 +283,7 @@ CRITICAL GUARDRAILS - YOU MUST FOLLOW THESE:
     ) -> str:
         """
         Calls LLM with fallback strategy: OpenRouter -> Groq -> Ollama -> Gemini -> Rule-based Fallback.
+        Providers are skipped once the active request deadline (if any) has expired.
         """
         full_prompt = f"System: {system_prompt}\n\nUser: {prompt}"
         input_tokens = self._estimate_tokens(full_prompt)
@@ -271,9 +292,10 @@ CRITICAL GUARDRAILS - YOU MUST FOLLOW THESE:
         provider_used = None
         
         # 0. Try OpenRouter (if enabled)
-        if self.use_openrouter and self.openrouter_api_key:
+        if not self._deadline_expired() and self.use_openrouter and self.openrouter_api_key:
             logger.info(f"[{self.name}] 🦄 Calling OpenRouter ({self.openrouter_model})...")
-            result = self._call_openrouter(full_prompt)
+            with trace_span("llm.openrouter", agent=self.name, model=self.openrouter_model):
+                result = self._call_openrouter(full_prompt)
             if result:
                 provider_used = "openrouter"
                 logger.info(f"[{self.name}] [OK] OpenRouter Response")
@@ -281,9 +303,10 @@ CRITICAL GUARDRAILS - YOU MUST FOLLOW THESE:
                  logger.warning(f"[{self.name}] [WARN] OpenRouter failed/empty.")
                  
         # 1. Try Groq first (fast cloud)
-        if not result and self.use_groq and self.groq_api_key:
+        if not result and not self._deadline_expired() and self.use_groq and self.groq_api_key:
             logger.info(f"[{self.name}] [CALL] Calling Groq ({self.groq_model})...")
-            result = self._call_groq(full_prompt)
+            with trace_span("llm.groq", agent=self.name, model=self.groq_model):
+                result = self._call_groq(full_prompt)
             if result:
                 provider_used = "groq"
                 logger.info(f"[{self.name}] [OK] Groq Response")
@@ -291,9 +314,10 @@ CRITICAL GUARDRAILS - YOU MUST FOLLOW THESE:
                 logger.warning(f"[{self.name}] [WARN] Groq failed/empty.")
         
         # 2. Try Ollama (if configured and no result yet)
-        if not result and self.use_ollama:
+        if not result and not self._deadline_expired() and self.use_ollama:
             logger.info(f"[{self.name}] 🦙 Calling Ollama ({self.ollama_model})...")
-            result = self._call_ollama(full_prompt)
+            with trace_span("llm.ollama", agent=self.name, model=self.ollama_model):
+                result = self._call_ollama(full_prompt)
             if result:
                 provider_used = "ollama"
                 logger.info(f"[{self.name}] [OK] Ollama Response")
@@ -301,9 +325,10 @@ CRITICAL GUARDRAILS - YOU MUST FOLLOW THESE:
                 logger.warning(f"[{self.name}] [WARN] Ollama failed/empty.")
 
         # 3. Try Gemini (if enabled and no result yet)
-        if not result and self.use_gemini:
+        if not result and not self._deadline_expired() and self.use_gemini:
             logger.info(f"[{self.name}] 🚀 Calling Gemini ({self.gemini_model_name})...")
-            result = self._call_gemini(full_prompt, max_retries)
+            with trace_span("llm.gemini", agent=self.name, model=self.gemini_model_name):
+                result = self._call_gemini(full_prompt, max_retries)
             if result:
                 provider_used = "gemini"
                 logger.info(f"[{self.name}] [OK] Gemini Response")
@@ -320,8 +345,14 @@ CRITICAL GUARDRAILS - YOU MUST FOLLOW THESE:
         
         # 4. Final Fallback
         if fallback_func:
-            logger.warning(f"[{self.name}] [RETRY] Using rule-based fallback")
-            return fallback_func(fallback_args)
+            if self._deadline_expired():
+                logger.warning(f"[{self.name}] [DEADLINE] Request deadline reached, using rule-based fallback")
+                record_degradation("deadline_exceeded")
+            else:
+                logger.warning(f"[{self.name}] [RETRY] Using rule-based fallback")
+                record_degradation("llm_unavailable")
+            with trace_span("llm.fallback", agent=self.name):
+                return fallback_func(fallback_args)
             
         # 5. No recourse
         return "[Error] Analysis unavailable - LLM generation failed and no fallback provided."
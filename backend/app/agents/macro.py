@@ -34,6 +34,13 @@ class MacroAgent(BaseAgent):
                 region = "INDIA"
                 break
         
+        # No macro in the retrieved context: use the shared region snapshot
+        if not macro_data:
+            from app.services.macro_snapshot_service import macro_snapshot_service
+            snapshot = macro_snapshot_service.peek(region)
+            if snapshot:
+                macro_data = [{"content": str(snapshot), "metadata": {"type": "macro", "source": "macro_snapshot"}}]
+        
         # Calculate data quality
         data_quality = self.calculate_data_quality(macro_data)
         
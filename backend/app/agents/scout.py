@@ -1,10 +1,21 @@
-from yahooquery import Ticker
-from typing import Dict, Any, List
+from app.core.providers import Ticker, YFTicker
+from typing import Dict, Any, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 from app.services.cache_service import cache_data
+from app.services import indicators
+from app.services.price_store import price_store
+from app.services.indicator_state_service import indicator_states
 from app.core.config import settings
+from app.core.tracing import trace_span, propagate_context
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from functools import partial
+import copy
 import datetime
+import time
+
+# yahooquery modules used for the financials snapshot (single and batch)
+FINANCIAL_MODULES = ['summaryDetail', 'financialData', 'defaultKeyStatistics', 'summaryProfile', 'price', 'quoteType']
 
 
 class ScoutAgent:
@@ -13,6 +24,22 @@ class ScoutAgent:
     Enhanced with data validation, quality indicators, and improved error handling.
     """
     
+    # Per-source fetch timeouts (seconds) for the parallel collection step
+    SOURCE_TIMEOUTS = {
+        "financials": 20,
+        "technicals": 20,
+        "macro": 15,
+        "news": 15,
+        "screener": 15,
+    }
+    
+    # Assets merged/validated concurrently by collect_batch
+    BATCH_MAX_WORKERS = 6
+    
+    # News racing: items kept per ticker and how long to wait for any source
+    NEWS_LIMIT = 5
+    NEWS_RACE_TIMEOUT = 10
+    
     def __init__(self):
         self.name = "Scout Agent"
     
@@ -21,8 +48,13 @@ class ScoutAgent:
         Main entry point to collect data for a given asset.
         Returns data with quality indicators.
         """
+        from app.services.hot_ticker_service import hot_ticker_service
+        hot_ticker_service.record(asset_id)
+        
         # Real data collection (mock mode disabled for production)
-        result = self._fetch_cached_data(asset_id)
+        with trace_span("scout.collect", asset_id=asset_id):
+            # Deep copy: callers mutate nested sections, which must not reach the cached entry
+            result = copy.deepcopy(self._fetch_cached_data(asset_id))
         
         # Add data quality assessment
         result["data_quality"] = self._assess_data_quality(result)
@@ -30,9 +62,165 @@ class ScoutAgent:
         
         return result
 
+    def collect_batch(self, asset_ids: List[str], force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Collect data for many assets at once.
+        Financial modules, price/quote types and 1y history for every uncached
+        symbol come from a few bulk yahooquery calls (macro comes from the shared
+        region snapshot); each asset is then merged individually and all of them
+        are validated and sanity-checked together in one batch pass.
+        Results also fill the per-asset cache used by collect_data; force=True
+        refetches even fresh entries (used by the hot-ticker refresher).
+        """
+        symbols = list(dict.fromkeys(a.strip() for a in asset_ids if a and a.strip()))
+        collected: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for symbol in symbols:
+            cached = None if force else ScoutAgent._fetch_cached_data.peek(symbol)
+            if cached is not None:
+                collected[symbol] = cached
+            else:
+                missing.append(symbol)
+        
+        if missing:
+            print(f"[Scout Agent] [BATCH] {len(symbols) - len(missing)} cached, bulk fetching {len(missing)} symbols")
+            prefetched = self._prefetch_bulk(missing)
+            
+            def gather(symbol):
+                with trace_span("scout.batch.asset", asset_id=symbol):
+                    return ScoutAgent._gather_asset_data(symbol, prefetched.get(symbol))
+            
+            gathered = self._map_batch(gather, missing)
+            
+            # Validate and sanity-check every pending stock in one vectorised pass
+            from app.services.data_validator import data_validator
+            from app.services.sanity_checker import sanity_checker
+            
+            pending = {symbol: data for symbol, data in gathered.items() if "anomalies" not in data}
+            with trace_span("scout.batch.validate", symbols=len(pending)):
+                validated = data_validator.validate_batch({
+                    data["asset_id"]: (data["financials"], data["technicals"]) for data in pending.values()
+                })
+                checked = sanity_checker.check_batch({
+                    asset_id: financials for asset_id, (financials, _, _) in validated.items()
+                })
+            
+            def finish(symbol):
+                data = gathered[symbol]
+                if symbol in pending:
+                    with trace_span("scout.batch.finish", asset_id=symbol):
+                        data = ScoutAgent._finish_asset_data(
+                            data, validated[data["asset_id"]], checked[data["asset_id"]]
+                        )
+                ScoutAgent._fetch_cached_data.prime(data, symbol)
+                return data
+            
+            collected.update(self._map_batch(finish, list(gathered)))
+        
+        results = {}
+        for symbol in symbols:
+            if symbol not in collected:
+                continue
+            result = copy.deepcopy(collected[symbol])
+            result["data_quality"] = self._assess_data_quality(result)
+            result["collection_timestamp"] = datetime.datetime.now().isoformat()
+            results[symbol] = result
+        return results
+
+    def _map_batch(self, fn, symbols: List[str]) -> Dict[str, Any]:
+        """Run fn(symbol) on the batch pool; symbols that raise are logged and left out."""
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.BATCH_MAX_WORKERS, thread_name_prefix="scout-batch") as executor:
+            futures = {symbol: executor.submit(propagate_context(fn), symbol) for symbol in symbols}
+            for symbol, future in futures.items():
+                try:
+                    results[symbol] = future.result()
+                except Exception as e:
+                    print(f"[Scout Agent] [WARN] Batch collection failed for {symbol}: {e}")
+        return results
+
+    @staticmethod
+    def _prefetch_bulk(asset_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Bulk-fetch yahooquery modules and history for many symbols and split
+        them per symbol. Anything that fails here is simply left out, and the
+        per-asset path fetches it individually.
+        """
+        from app.services.coingecko_service import coingecko_service
+        
+        crypto = [s for s in asset_ids if s.startswith("CRYPTO:") or coingecko_service.is_crypto(s)]
+        if len(crypto) > 1:
+            # One /coins/markets call warms every coin's quote for the per-asset path
+            with trace_span("scout.coingecko.batch_markets", symbols=len(crypto)):
+                coingecko_service.get_markets([coingecko_service.coin_id(s) for s in crypto])
+        
+        symbols = [
+            s for s in asset_ids
+            if s not in ("DEMO.NS", "DEMO", "ELIDA.NS") and s not in crypto
+        ]
+        prefetched: Dict[str, Dict[str, Any]] = {s: {} for s in symbols}
+        if not symbols:
+            return prefetched
+        
+        tickers = Ticker(symbols, asynchronous=True)
+        try:
+            with trace_span("scout.yahooquery.batch_modules", symbols=len(symbols)):
+                modules = tickers.get_modules(FINANCIAL_MODULES)
+            if isinstance(modules, dict):
+                for symbol in symbols:
+                    if isinstance(modules.get(symbol), dict):
+                        prefetched[symbol]["modules"] = {symbol: modules[symbol]}
+        except Exception as e:
+            print(f"[Scout Agent] [WARN] Bulk modules fetch failed: {e}")
+        
+        try:
+            with trace_span("scout.yahooquery.batch_history", symbols=len(symbols)):
+                history = tickers.history(period="1y")
+            if isinstance(history, pd.DataFrame) and not history.empty and "symbol" in history.index.names:
+                fetched = set(history.index.get_level_values("symbol"))
+                for symbol in symbols:
+                    if symbol in fetched:
+                        prefetched[symbol]["history"] = history.xs(symbol, level="symbol")
+                        price_store.merge_frame(symbol, prefetched[symbol]["history"])
+        except Exception as e:
+            print(f"[Scout Agent] [WARN] Bulk history fetch failed: {e}")
+        
+        return prefetched
+
     @staticmethod
-    @cache_data(expire_seconds=3600)
+    @cache_data(expire_seconds=3600, cache_if=lambda data: not data.get("fallback_sources"))
     def _fetch_cached_data(asset_id: str) -> Dict[str, Any]:
+        # Results padded with fallbacks are not cached, so the next call retries
+        return ScoutAgent._build_asset_data(asset_id)
+
+    @staticmethod
+    def _build_asset_data(asset_id: str, prefetched: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Collect, merge and validate all data for one asset (uncached).
+        prefetched carries bulk-fetched modules/history from collect_batch.
+        """
+        gathered = ScoutAgent._gather_asset_data(asset_id, prefetched)
+        if "anomalies" in gathered:
+            return gathered
+        
+        # Apply data validation and corrections (currency, price anomalies), then
+        # sanity checks to catch hallucinations (D/E ratio, etc.)
+        from app.services.data_validator import data_validator
+        from app.services.sanity_checker import sanity_checker
+        
+        asset_id = gathered["asset_id"]
+        validated = data_validator.validate_and_enrich(gathered["financials"], gathered["technicals"], asset_id)
+        checked = sanity_checker.check_financials(validated[0], asset_id)
+        return ScoutAgent._finish_asset_data(gathered, validated, checked)
+
+    @staticmethod
+    def _gather_asset_data(asset_id: str, prefetched: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Collect and merge the sources for one asset.
+        Demo and crypto assets come back as finished results (with "anomalies");
+        stocks come back unvalidated, keyed by their normalized "asset_id", for
+        _finish_asset_data.
+        """
         print(f"[Scout Agent] [FIND] Collecting data for {asset_id}...")
         
         # DEMO MODE - Safe mock company for presentations
@@ -44,7 +232,8 @@ class ScoutAgent:
         from app.services.coingecko_service import coingecko_service
         if coingecko_service.is_crypto(asset_id) or asset_id.startswith("CRYPTO:"):
             print(f"[Scout Agent] [CRYPTO] Detected cryptocurrency: {asset_id}")
-            crypto_data = coingecko_service.get_crypto_data(asset_id)
+            with trace_span("scout.coingecko"):
+                crypto_data = coingecko_service.get_crypto_data(asset_id)
             
             if "error" not in crypto_data:
                 # Build financials-like structure from crypto data
@@ -77,6 +266,19 @@ class ScoutAgent:
                     "rsi_14": ScoutAgent._calculate_rsi_from_history(history) if history else None,
                     "trend_signal": ScoutAgent._calculate_trend_from_history(history) if history else "Unknown"
                 }
+                if crypto_data.get("indicators"):
+                    ind = crypto_data["indicators"]
+                    technicals.update({
+                        "current_price": ScoutAgent._safe_round(ind.get("current_price"), 6),
+                        "sma_50": ScoutAgent._safe_round(ind.get("sma_50"), 6),
+                        "sma_200": ScoutAgent._safe_round(ind.get("sma_200"), 6),
+                        "volatility_raw": ScoutAgent._safe_round(ind.get("volatility_raw"), 4),
+                        "high_52w": ScoutAgent._safe_round(ind.get("high_52w"), 6),
+                        "low_52w": ScoutAgent._safe_round(ind.get("low_52w"), 6),
+                        "pct_from_52w_high": ScoutAgent._safe_round(ind.get("pct_from_52w_high")),
+                        "max_drawdown_pct": ScoutAgent._safe_round(ind.get("max_drawdown_pct")),
+                        "macd_histogram": ScoutAgent._safe_round(ind.get("macd_histogram"), 6),
+                    })
                 
                 macro = ScoutAgent._get_macro_data_static(asset_id)
                 news = []  # Crypto news would need different source
@@ -101,17 +303,18 @@ class ScoutAgent:
             print(f"[Scout Agent] [FIX] Normalizing ticker: ASIANPAINTS.NS -> ASIANPAINT.NS")
             asset_id = "ASIANPAINT.NS"
 
-        # Regular stock data flow
-        financials = ScoutAgent._get_financials_deep_static(asset_id)
-        technicals = ScoutAgent._get_technicals_static(asset_id)
-        macro = ScoutAgent._get_macro_data_static(asset_id)
-        news = ScoutAgent._get_news_static(asset_id)
+        # Regular stock data flow - independent sources are fetched concurrently
+        sources = ScoutAgent._fetch_sources_parallel(asset_id, prefetched)
+        financials = sources["financials"]
+        technicals = sources["technicals"]
+        macro = sources["macro"]
+        news = sources["news"]
+        fallback_sources = list(sources.get("fallback_sources", []))
         
         # Enrich with Screener.in data for Indian stocks (NEW)
-        if asset_id.endswith(".NS") or asset_id.endswith(".BO"):
+        if "screener" in sources:
             try:
-                from app.services.screener_service import screener_service
-                screener_data = screener_service.get_data(asset_id)
+                screener_data = sources["screener"]
                 
                 if "error" not in screener_data:
                     print(f"[Scout Agent] [DATA] Screener.in fetch successful")
@@ -146,17 +349,33 @@ class ScoutAgent:
             except Exception as e:
                 print(f"[Scout Agent] [WARN] Screener.in enrichment failed: {e}")
         
-        # Apply data validation and corrections (currency, price anomalies)
+        return {
+            "asset_id": asset_id,
+            "financials": financials,
+            "technicals": technicals,
+            "macro": macro,
+            "news": news,
+            "fallback_sources": fallback_sources
+        }
+
+    @staticmethod
+    def _finish_asset_data(
+        gathered: Dict[str, Any],
+        validated: Tuple[Dict[str, Any], Dict[str, Any], List[Dict]],
+        checked: Tuple[Dict[str, Any], List[Any]]
+    ) -> Dict[str, Any]:
+        """
+        Final stock result from _gather_asset_data output plus its validation
+        (validate_and_enrich) and sanity check (check_financials) results.
+        """
         from app.services.data_validator import data_validator
         
-        financials, technicals, anomalies = data_validator.validate_and_enrich(
-            financials, technicals, asset_id
-        )
-        
-        # Apply sanity checks to catch hallucinations (D/E ratio, etc.)
-        from app.services.sanity_checker import sanity_checker
-        
-        financials, sanity_alerts = sanity_checker.check_financials(financials, asset_id)
+        asset_id = gathered["asset_id"]
+        _, technicals, anomalies = validated
+        financials, sanity_alerts = checked
+        macro = gathered["macro"]
+        news = gathered["news"]
+        fallback_sources = gathered["fallback_sources"]
         
         # Log sanity check results
         for alert in sanity_alerts:
@@ -196,15 +415,86 @@ class ScoutAgent:
         print(f"  - Anomalies: {len(anomalies)} detected")
         print(f"  - Sanity Alerts: {len(sanity_alerts)} issues")
         
+        # Mock data returned by the fetchers themselves also counts as a fallback
+        # (unless Screener.in recovered the financials)
+        if financials.get("is_mock") and "financials" not in fallback_sources:
+            fallback_sources.append("financials")
+        if "Mock" in str(technicals.get("source", "")) and "technicals" not in fallback_sources:
+            fallback_sources.append("technicals")
+        
         return {
             "financials": financials,
             "technicals": technicals,
             "macro": macro,
             "news": news,
             "anomalies": anomalies,
-            "sanity_alerts": [{"field": a.field, "severity": a.severity, "message": a.message} for a in sanity_alerts]
+            "sanity_alerts": [{"field": a.field, "severity": a.severity, "message": a.message} for a in sanity_alerts],
+            "fallback_sources": fallback_sources
         }
 
+    @staticmethod
+    def _fetch_sources_parallel(asset_id: str, prefetched: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Fetch financials, technicals, macro, news and (for Indian stocks)
+        Screener.in concurrently. A source that errors or exceeds its timeout
+        is replaced by its fallback, so total latency tracks the slowest
+        source rather than the sum of all of them.
+        Sources already present in prefetched skip their network round trip.
+        The names of sources that fell back are listed under "fallback_sources".
+        """
+        from app.services.screener_service import screener_service
+        
+        fetch_financials = ScoutAgent._get_financials_deep_static
+        fetch_technicals = ScoutAgent._get_technicals_static
+        if prefetched:
+            if prefetched.get("modules") is not None:
+                fetch_financials = partial(fetch_financials, modules=prefetched["modules"])
+            if prefetched.get("history") is not None:
+                fetch_technicals = partial(fetch_technicals, history=prefetched["history"])
+        
+        fetchers = {
+            "financials": (fetch_financials, lambda: ScoutAgent._get_mock_financials(asset_id)),
+            "technicals": (fetch_technicals, ScoutAgent._get_mock_technicals),
+            "macro": (ScoutAgent._get_macro_data_static, lambda: {"region": "Unknown", "error": "Macro fetch timed out"}),
+            "news": (ScoutAgent._get_news_static, list),
+        }
+        if asset_id.endswith(".NS") or asset_id.endswith(".BO"):
+            fetchers["screener"] = (screener_service.get_data, lambda: {"error": "Screener.in fetch timed out"})
+        
+        def run_source(name, fetch):
+            with trace_span(f"scout.{name}"):
+                return fetch(asset_id)
+        
+        results = {}
+        fallback_sources = []
+        start = time.monotonic()
+        # Stragglers are abandoned (not joined); their fallback is used instead
+        executor = ThreadPoolExecutor(max_workers=len(fetchers), thread_name_prefix="scout")
+        try:
+            futures = {
+                name: executor.submit(propagate_context(run_source), name, fetch)
+                for name, (fetch, _) in fetchers.items()
+            }
+            for name, future in futures.items():
+                fallback = fetchers[name][1]
+                remaining = ScoutAgent.SOURCE_TIMEOUTS[name] - (time.monotonic() - start)
+                try:
+                    results[name] = future.result(timeout=max(0.0, remaining))
+                except FuturesTimeout:
+                    print(f"[Scout Agent] [WARN] {name} fetch exceeded {ScoutAgent.SOURCE_TIMEOUTS[name]}s, using fallback")
+                    results[name] = fallback()
+                    fallback_sources.append(name)
+                except Exception as e:
+                    print(f"[Scout Agent] [WARN] {name} fetch failed: {e}, using fallback")
+                    results[name] = fallback()
+                    fallback_sources.append(name)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        results["fallback_sources"] = fallback_sources
+        print(f"[Scout Agent] [TIME] Parallel source fetch took {time.monotonic() - start:.2f}s")
+        return results
+
     @staticmethod
     def _map_screener_to_financials(screener_data: Dict[str, Any], old_financials: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -327,15 +617,18 @@ class ScoutAgent:
         return quality
 
     @staticmethod
-    def _get_financials_deep_static(asset_id: str) -> Dict[str, Any]:
+    def _get_financials_deep_static(asset_id: str, modules: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Fetch comprehensive financial data with validation.
+        modules may carry a bulk get_modules() response that includes asset_id.
         """
         try:
-            ticker = Ticker(asset_id)
-            
-            # Request quoteType carefully as it might fail for some assets
-            modules = ticker.get_modules(['summaryDetail', 'financialData', 'defaultKeyStatistics', 'summaryProfile', 'price', 'quoteType'])
+            if modules is None:
+                ticker = Ticker(asset_id)
+                
+                # Request quoteType carefully as it might fail for some assets
+                with trace_span("scout.yahooquery.financials"):
+                    modules = ticker.get_modules(FINANCIAL_MODULES)
             
             if asset_id not in modules or isinstance(modules[asset_id], str):
                 raise ValueError(f"No data found for {asset_id}")
@@ -490,9 +783,9 @@ class ScoutAgent:
             # Fallback: Try yfinance
             try:
                 print(f"[Scout Agent] [RETRY] Attempting yfinance fallback for financials...")
-                import yfinance as yf
-                ticker = yf.Ticker(asset_id)
-                info = ticker.info
+                ticker = YFTicker(asset_id)
+                with trace_span("scout.yfinance.financials"):
+                    info = ticker.info
                 
                 if not info or 'regularMarketPrice' not in info:
                     raise ValueError("yfinance returned empty data")
@@ -597,130 +890,71 @@ class ScoutAgent:
         }
 
     @staticmethod
-    def _get_technicals_static(asset_id: str) -> Dict[str, Any]:
+    def _get_technicals_static(asset_id: str, history: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
         """
         Calculate technical indicators with enhanced error handling.
+        history may carry this symbol's slice of a bulk yahooquery history();
+        otherwise the local price store is tried before live providers.
         """
         try:
-            # Primary: YahooQuery
-            # Primary: yfinance (More robust standard)
-            try:
-                import yfinance as yf
-                # print(f"[Scout Agent] [CHART] Fetching technicals via yfinance for {asset_id}...")
-                ticker = yf.Ticker(asset_id)
-                df = ticker.history(period="1y")
+            if history is not None and len(history) >= 50:
+                # Bulk-fetched by collect_batch
+                df = history
+                close_col = ScoutAgent._select_close_column(df)
+                source = "YahooQuery (Batch)"
+            else:
+                df = ScoutAgent._history_from_store(asset_id)
+                close_col = 'close'
+                source = "Price Store (YahooQuery)"
+            if df is None:
+                # Primary: yfinance (More robust standard)
+                try:
+                    # print(f"[Scout Agent] [CHART] Fetching technicals via yfinance for {asset_id}...")
+                    ticker = YFTicker(asset_id)
+                    with trace_span("scout.yfinance.history"):
+                        df = ticker.history(period="1y")
                 
-                if df.empty or len(df) < 50:
-                    raise ValueError("yfinance returned empty technicals")
+                    if df.empty or len(df) < 50:
+                        raise ValueError("yfinance returned empty technicals")
                 
-                close_col = 'Close'
-                source = "yfinance (Live)"
+                    close_col = 'Close'
+                    source = "yfinance (Live)"
 
-            except Exception as yf_e:
-                print(f"[Scout Agent] [WARN] yfinance technicals failed: {yf_e}")
+                except Exception as yf_e:
+                    print(f"[Scout Agent] [WARN] yfinance technicals failed: {yf_e}")
                 
-                # Fallback: YahooQuery
-                try:
-                    print(f"[Scout Agent] [RETRY] Attempting YahooQuery fallback for technicals...")
-                    ticker = Ticker(asset_id)
-                    hist = ticker.history(period="1y")
+                    # Fallback: YahooQuery
+                    try:
+                        print(f"[Scout Agent] [RETRY] Attempting YahooQuery fallback for technicals...")
+                        ticker = Ticker(asset_id)
+                        with trace_span("scout.yahooquery.history"):
+                            hist = ticker.history(period="1y")
                     
-                    if isinstance(hist, dict) or hist.empty:
-                        raise ValueError("No historical data")
+                        if isinstance(hist, dict) or hist.empty:
+                            raise ValueError("No historical data")
                     
-                    # Handle MultiIndex
-                    if 'symbol' in hist.index.names:
-                        df = hist.xs(asset_id, level='symbol')
-                    else:
-                        df = hist
+                        # Handle MultiIndex
+                        if 'symbol' in hist.index.names:
+                            df = hist.xs(asset_id, level='symbol')
+                        else:
+                            df = hist
 
-                    if df.empty or len(df) < 50:
-                        raise ValueError("Insufficient historical data")
+                        if df.empty or len(df) < 50:
+                            raise ValueError("Insufficient historical data")
 
-                    # Determine close column
-                    close_col = 'close' if 'close' in df.columns else 'adjclose'
-                    if close_col not in df.columns:
-                        if 'Close' in df.columns:
-                            close_col = 'Close'
-                        else:
-                            raise ValueError("No Close price column found")
+                        close_col = ScoutAgent._select_close_column(df)
                             
-                    source = "YahooQuery (Fallback)"
-                except Exception as yq_e:
-                    raise ValueError(f"Both providers failed. yfinance: {yf_e}, YahooQuery: {yq_e}")
+                        source = "YahooQuery (Fallback)"
+                    except Exception as yq_e:
+                        raise ValueError(f"Both providers failed. yfinance: {yf_e}, YahooQuery: {yq_e}")
 
-            close = df[close_col]
-            
-            # Calculate indicators
-            sma_50 = close.rolling(window=50).mean().iloc[-1]
-            sma_200 = close.rolling(window=200).mean().iloc[-1] if len(close) >= 200 else None
-            current_price = close.iloc[-1]
-            
-            # Trend determination
-            if sma_200 is not None:
-                if current_price > sma_50 > sma_200:
-                    trend = "Strong Uptrend (Bullish)"
-                elif current_price < sma_50 < sma_200:
-                    trend = "Strong Downtrend (Bearish)"
-                elif sma_50 > sma_200:
-                    trend = "Uptrend (Golden Cross)"
-                else:
-                    trend = "Downtrend (Death Cross)"
-            else:
-                trend = "Neutral (Insufficient history for 200-day SMA)"
-            
-            # RSI calculation
-            delta = close.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = (100 - (100 / (1 + rs))).iloc[-1]
-            
-            # Safely handle NaN RSI (e.g. flat price)
-            if pd.isna(rsi):
-                rsi = 50.0
-            
-            rsi_status = "Neutral"
-            if rsi > 70:
-                rsi_status = "Overbought"
-            elif rsi < 30:
-                rsi_status = "Oversold"
-            
-            # Volatility
-            daily_returns = close.pct_change().dropna()
-            volatility = daily_returns.std() * np.sqrt(252)
+            close = df[close_col].to_numpy(dtype=float)
+            # Incremental: only bars newer than the persisted state are fed in
+            ind = indicator_states.sync(asset_id, df.index, close)
             
-            # 52-week range
-            high_52w = close.max()
-            low_52w = close.min()
-            pct_from_high = ((current_price - high_52w) / high_52w) * 100
-            
-            # Prepare history for charting
-            history_df = pd.concat([
-                close,
-                close.rolling(window=50).mean().rename('sma_50')
-            ], axis=1).iloc[-100:]
-            
-            history = []
-            for idx, row in history_df.iterrows():
-                # Handle both datetime and date index types
-                if hasattr(idx, 'date'):
-                    date_str = str(idx.date())
-                else:
-                    date_str = str(idx).split(" ")[0]
-                    
-                history.append({
-                    "date": date_str,
-                    "price": round(float(row[close_col]), 2),
-                    "sma_50": round(float(row['sma_50']), 2) if not pd.isna(row['sma_50']) else None
-                })
-
-                        # Recent price changes (for data latency awareness)
-            price_1d_ago = close.iloc[-2] if len(close) >= 2 else current_price
-            price_5d_ago = close.iloc[-6] if len(close) >= 6 else current_price
-            
-            price_change_1d = ((current_price - price_1d_ago) / price_1d_ago) * 100 if price_1d_ago else 0
-            price_change_5d = ((current_price - price_5d_ago) / price_5d_ago) * 100 if price_5d_ago else 0
+            current_price = ind["current_price"]
+            price_change_1d = ind["price_change_1d"]
+            price_change_5d = ind["price_change_5d"]
             
             # Generate price alert for significant moves
             price_alert = None
@@ -732,25 +966,34 @@ class ScoutAgent:
                 price_alert = f"[WARN] ALERT: Price dropped {abs(price_change_1d):.1f}% today"
             elif price_change_1d >= 3:
                 price_alert = f"[CHART] ALERT: Price surged {price_change_1d:.1f}% today"
-
+            
+            r = ScoutAgent._safe_round
             return {
                 "source": source,
-                "current_price": round(float(current_price), 2),
-                "sma_50": round(float(sma_50), 2),
-                "sma_200": round(float(sma_200), 2) if sma_200 else None,
-                "trend_signal": trend,
-                "rsi_14": round(float(rsi), 2),
-                "rsi_status": rsi_status,
-                "volatility_annualized": f"{volatility:.2%}",
-                "volatility_raw": round(float(volatility), 4),
-                "high_52w": round(float(high_52w), 2),
-                "low_52w": round(float(low_52w), 2),
-                "pct_from_52w_high": round(float(pct_from_high), 2),
-                # NEW: Recent price changes
-                "price_change_1d": round(float(price_change_1d), 2),
-                "price_change_5d": round(float(price_change_5d), 2),
+                "current_price": r(current_price),
+                "sma_20": r(ind["sma_20"]),
+                "sma_50": r(ind["sma_50"]),
+                "sma_200": r(ind["sma_200"]),
+                "ema_20": r(ind["ema_20"]),
+                "trend_signal": ind["trend_signal"],
+                "rsi_14": r(ind["rsi_14"]),
+                "rsi_status": ind["rsi_status"],
+                "macd": r(ind["macd"], 4),
+                "macd_signal": r(ind["macd_signal"], 4),
+                "macd_histogram": r(ind["macd_histogram"], 4),
+                "bollinger_upper": r(ind["bollinger_upper"]),
+                "bollinger_lower": r(ind["bollinger_lower"]),
+                "volatility_annualized": f"{ind['volatility_raw']:.2%}",
+                "volatility_raw": r(ind["volatility_raw"], 4),
+                "high_52w": r(ind["high_52w"]),
+                "low_52w": r(ind["low_52w"]),
+                "pct_from_52w_high": r(ind["pct_from_52w_high"]),
+                "max_drawdown_pct": r(ind["max_drawdown_pct"]),
+                # Recent price changes (for data latency awareness)
+                "price_change_1d": r(price_change_1d),
+                "price_change_5d": r(price_change_5d),
                 "price_alert": price_alert,
-                "history": history,
+                "history": indicators.history_records(df.index, close),
                 "data_points": len(close)
             }
             
@@ -760,6 +1003,26 @@ class ScoutAgent:
                  return ScoutAgent._get_mock_technicals()
             raise e  # Propagate error if no demo data allowed
 
+    @staticmethod
+    def _history_from_store(asset_id: str) -> Optional[pd.DataFrame]:
+        """One year of daily bars from the local price store, or None if too short."""
+        try:
+            with trace_span("scout.price_store"):
+                start = datetime.date.today() - datetime.timedelta(days=365)
+                df = price_store.get_frame(asset_id, start=start)
+        except Exception as e:
+            print(f"[Scout Agent] [WARN] Price store read failed: {e}")
+            return None
+        return df if len(df) >= 50 else None
+
+    @staticmethod
+    def _select_close_column(df: pd.DataFrame) -> str:
+        """Pick the close price column from a yahooquery/yfinance history frame."""
+        for column in ("close", "adjclose", "Close"):
+            if column in df.columns:
+                return column
+        raise ValueError("No Close price column found")
+
     @staticmethod
     def _get_mock_technicals() -> Dict[str, Any]:
         """
@@ -787,14 +1050,21 @@ class ScoutAgent:
     @staticmethod
     def _get_macro_data_static(asset_id: str = None) -> Dict[str, Any]:
         """
-        Fetch macro indicators with region awareness.
-        Uses India VIX for .NS/.BO stocks, US VIX for others.
+        Get macro indicators with region awareness.
+        Uses India VIX for .NS/.BO stocks, US VIX for others. Served from the
+        shared per-region snapshot, which refreshes in the background.
+        """
+        from app.services.macro_snapshot_service import macro_snapshot_service, region_for_asset
+        return macro_snapshot_service.get_snapshot(region_for_asset(asset_id))
+
+    @staticmethod
+    def _fetch_macro_snapshot(region: str) -> Dict[str, Any]:
+        """
+        Fetch macro indicators for a region ("US" or "INDIA") from
+        yahooquery, FRED and (for India) the RBI site.
         """
-        # Detect region from asset_id
-        is_india = asset_id and asset_id.upper().endswith((".NS", ".BO"))
-        region = "INDIA" if is_india else "US"
+        is_india = region == "INDIA"
         
-        # Region-specific macro proxies
         # Region-specific macro proxies
         if is_india:
             macro_proxies = {
@@ -818,7 +1088,8 @@ class ScoutAgent:
         try:
             symbols = list(macro_proxies.values())
             tickers = Ticker(symbols)
-            price_data = tickers.price
+            with trace_span("scout.yahooquery.macro"):
+                price_data = tickers.price
             
             for key, symbol in macro_proxies.items():
                 if symbol in price_data and isinstance(price_data[symbol], dict):
@@ -852,7 +1123,8 @@ class ScoutAgent:
         # Integrate FRED Data (Economic Indicators)
         try:
             from app.services.fred_service import fred_service
-            fred_data = fred_service.get_macro_summary()
+            with trace_span("scout.fred"):
+                fred_data = fred_service.get_macro_summary()
             if "indicators" in fred_data:
                 for ind_name, ind_data in fred_data["indicators"].items():
                     if isinstance(ind_data, dict):
@@ -870,11 +1142,14 @@ class ScoutAgent:
         if is_india:
             try:
                 from app.services.rbi_service import rbi_service
-                rbi_data = rbi_service.get_real_time_rates()
+                with trace_span("scout.rbi"):
+                    rbi_data = rbi_service.get_real_time_rates()
                 if "repo_rate" in rbi_data:
                     results["rbi_repo_rate"] = rbi_data["repo_rate"]
-                    results["rbi_repo_rate_desc"] = "Policy Repo Rate (RBI Live)"
-                    print(f"[Scout Agent] [INDIA] RBI Live Rate: {rbi_data['repo_rate']}%")
+                    results["rbi_repo_rate_desc"] = "Policy Repo Rate (RBI, last known)" if rbi_data["stale"] else "Policy Repo Rate (RBI Live)"
+                    results["rbi_repo_rate_as_of"] = rbi_data["as_of"]
+                    results["rbi_repo_rate_stale"] = rbi_data["stale"]
+                    print(f"[Scout Agent] [INDIA] RBI Rate: {rbi_data['repo_rate']}% (as of {rbi_data['as_of']})")
                 elif "error" in rbi_data:
                     print(f"[Scout Agent] [WARN] RBI Scraper Warning: {rbi_data['error']}")
             except Exception as e:
@@ -885,127 +1160,119 @@ class ScoutAgent:
     @staticmethod
     def _get_news_static(asset_id: str) -> List[Dict[str, str]]:
         """
-        Fetch news using multiple sources with fallback.
-        Primary: yahooquery search API (returns news section)
-        Fallback: yfinance
+        Fetch news by racing yahooquery search, Ticker.news() and yfinance
+        concurrently; the first non-empty source wins. Real news is cached
+        per ticker for 10 minutes; generated/placeholder fallbacks are not,
+        so the next call retries the sources. Items are copied so callers
+        can annotate them.
         """
-        results = []
+        results = [dict(item) for item in ScoutAgent._fetch_news_cached(asset_id)]
         
-        # Method 1: Try yahooquery search API (more reliable for news)
-        try:
-            from yahooquery import search, Ticker
-            
-            # Try to get company name for better search
-            try:
-                ticker_info = Ticker(asset_id)
-                quote_type = ticker_info.quote_type.get(asset_id, {})
-                company_name = quote_type.get("longName", "") or quote_type.get("shortName", "")
-                if company_name:
-                    search_term = f"{company_name} stock news"
-                else:
-                    search_term = asset_id.replace(".NS", "").replace(".BO", "") + " stock news"
-            except:
-                search_term = asset_id.replace(".NS", "").replace(".BO", "") + " stock news"
-            
-            print(f"[Scout Agent] [NEWS] Searching news for: {search_term}")
-            search_result = search(search_term)
-            
-            if search_result and "news" in search_result:
-                news_items = search_result.get("news", [])
-                
-                for item in news_items[:5]:
-                    if isinstance(item, dict):
-                        title = item.get("title", "")
-                        link = item.get("link", "")
-                        publisher = item.get("publisher", "Unknown")
-                        published = item.get("providerPublishTime", "")
-                        
-                        # Convert timestamp if numeric
-                        if isinstance(published, (int, float)):
-                            try:
-                                from datetime import datetime
-                                published = datetime.fromtimestamp(published).isoformat()
-                            except:
-                                published = str(published)
-                        
-                        if title:
-                            results.append({
-                                "title": title,
-                                "link": link,
-                                "publisher": publisher,
-                                "timestamp": published,
-                                "source": "YahooQuery Search"
-                            })
-                
-                if results:
-                    print(f"[Scout Agent] [OK] Found {len(results)} news items via search")
-                    return results
-                    
-        except Exception as e:
-            print(f"[Scout Agent] [WARN] yahooquery search news failed: {e}")
+        # Generate fallback news based on company info
+        if not results:
+            results = ScoutAgent._get_fallback_news(asset_id)
         
-        # Method 2: Try yahooquery Ticker.news() (sometimes works)
-        try:
-            from yahooquery import Ticker
-            ticker = Ticker(asset_id)
-            news_response = ticker.news()
-            
-            if isinstance(news_response, list) and news_response and news_response[0] != "error":
-                for item in news_response[:5]:
-                    if isinstance(item, dict):
-                        title = item.get("title", "")
-                        if title:
-                            results.append({
-                                "title": title,
-                                "link": item.get("link", ""),
-                                "publisher": item.get("publisher", "Unknown"),
-                                "timestamp": str(item.get("providerPublishTime", "")),
-                                "source": "YahooQuery Ticker"
-                            })
-                
-                if results:
-                    print(f"[Scout Agent] [OK] Found {len(results)} news items via Ticker.news()")
-                    return results
-                    
-        except Exception as e:
-            print(f"[Scout Agent] [WARN] yahooquery Ticker.news() failed: {e}")
+        return results if results else [{"title": f"No recent news found for {asset_id}", "link": "", "publisher": "", "timestamp": "", "source": "None"}]
+
+    @staticmethod
+    @cache_data(expire_seconds=600, stale_seconds=300, cache_if=bool)
+    def _fetch_news_cached(asset_id: str) -> List[Dict[str, str]]:
+        return ScoutAgent._race_news_sources({
+            "search": partial(ScoutAgent._news_from_search, asset_id),
+            "ticker": partial(ScoutAgent._news_from_ticker, asset_id),
+            "yfinance": partial(ScoutAgent._news_from_yfinance, asset_id),
+        }, limit=ScoutAgent.NEWS_LIMIT)
+
+    @staticmethod
+    def _race_news_sources(sources: Dict[str, Any], limit: int) -> List[Dict[str, str]]:
+        """
+        Run news sources concurrently and return the first non-empty result
+        (empty if none). Sources still running after NEWS_RACE_TIMEOUT are
+        abandoned.
+        """
+        def run_source(name, fetch):
+            with trace_span(f"scout.news.{name}"):
+                return fetch()
         
-        # Method 3: Try yfinance with rate limiting
+        executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="scout-news")
         try:
-            import yfinance as yf
-            import time
-            
-            # Rate limiting: wait a bit to avoid hitting limits
-            time.sleep(0.5)
-            
-            ticker = yf.Ticker(asset_id)
-            yf_news = ticker.news
-            
-            if yf_news and isinstance(yf_news, list):
-                for item in yf_news[:5]:
-                    if isinstance(item, dict):
-                        title = item.get("title", "")
-                        if title:
-                            results.append({
-                                "title": title,
-                                "link": item.get("link", ""),
-                                "publisher": item.get("publisher", "Unknown"),
-                                "timestamp": str(item.get("providerPublishTime", "")),
-                                "source": "yfinance"
-                            })
-                
-                if results:
-                    print(f"[Scout Agent] [OK] Found {len(results)} news items via yfinance")
-                    return results
-                    
-        except Exception as e:
-            print(f"[Scout Agent] [WARN] yfinance news failed: {e}")
+            futures = {
+                executor.submit(propagate_context(run_source), name, fetch): name
+                for name, fetch in sources.items()
+            }
+            for future in as_completed(futures, timeout=ScoutAgent.NEWS_RACE_TIMEOUT):
+                name = futures[future]
+                try:
+                    items = future.result()
+                except Exception as e:
+                    print(f"[Scout Agent] [WARN] {name} news failed: {e}")
+                    continue
+                if items:
+                    print(f"[Scout Agent] [OK] Found {len(items)} news items via {name}")
+                    return items[:limit]
+        except FuturesTimeout:
+            print(f"[Scout Agent] [WARN] News sources exceeded {ScoutAgent.NEWS_RACE_TIMEOUT}s")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         
-        # Method 4: Generate fallback news based on company info
-        if not results:
-            results = ScoutAgent._get_fallback_news(asset_id)
+        return []
+
+    @staticmethod
+    def _format_news_items(items: Any, source: str, limit: int, **extra) -> List[Dict[str, str]]:
+        """Normalize raw Yahoo news dicts into Scout's news item shape."""
+        results = []
+        if not isinstance(items, list):
+            return results
+        for item in items[:limit]:
+            if not isinstance(item, dict) or not item.get("title"):
+                continue
+            published = item.get("providerPublishTime", "")
+            # Convert timestamp if numeric
+            if isinstance(published, (int, float)):
+                try:
+                    published = datetime.datetime.fromtimestamp(published).isoformat()
+                except (OverflowError, OSError, ValueError):
+                    published = str(published)
+            results.append({
+                "title": item["title"],
+                "link": item.get("link", ""),
+                "publisher": item.get("publisher", "Unknown"),
+                "timestamp": published,
+                "source": source,
+                **extra
+            })
+        return results
+
+    @staticmethod
+    def _news_from_search(asset_id: str) -> List[Dict[str, str]]:
+        """yahooquery search API news section (searching by company name when known)."""
+        from app.core.providers import search
         
-        return results if results else [{"title": f"No recent news found for {asset_id}", "link": "", "publisher": "", "timestamp": "", "source": "None"}]
+        symbol_term = asset_id.replace(".NS", "").replace(".BO", "") + " stock news"
+        try:
+            quote_type = Ticker(asset_id).quote_type.get(asset_id, {})
+            company_name = quote_type.get("longName", "") or quote_type.get("shortName", "")
+            search_term = f"{company_name} stock news" if company_name else symbol_term
+        except Exception:
+            search_term = symbol_term
+        
+        print(f"[Scout Agent] [NEWS] Searching news for: {search_term}")
+        search_result = search(search_term)
+        if not search_result or "news" not in search_result:
+            return []
+        return ScoutAgent._format_news_items(search_result.get("news", []), "YahooQuery Search", ScoutAgent.NEWS_LIMIT)
+
+    @staticmethod
+    def _news_from_ticker(asset_id: str) -> List[Dict[str, str]]:
+        """yahooquery Ticker.news() (sometimes works)."""
+        news_response = Ticker(asset_id).news()
+        if not isinstance(news_response, list) or not news_response or news_response[0] == "error":
+            return []
+        return ScoutAgent._format_news_items(news_response, "YahooQuery Ticker", ScoutAgent.NEWS_LIMIT)
+
+    @staticmethod
+    def _news_from_yfinance(asset_id: str) -> List[Dict[str, str]]:
+        return ScoutAgent._format_news_items(YFTicker(asset_id).news, "yfinance", ScoutAgent.NEWS_LIMIT)
 
     @staticmethod
     def _get_fallback_news(asset_id: str) -> List[Dict[str, str]]:
@@ -1013,7 +1280,7 @@ class ScoutAgent:
         Generate intelligent fallback news based on company profile.
         """
         try:
-            from yahooquery import Ticker
+            from app.core.providers import Ticker
             ticker = Ticker(asset_id)
             profile = ticker.summary_profile.get(asset_id, {})
             
@@ -1049,51 +1316,31 @@ class ScoutAgent:
     def _get_volatility_news(asset_id: str, query: str) -> List[Dict[str, str]]:
         """
         Search for news specifically related to price volatility events.
-        Uses a more targeted search query.
+        Uses a more targeted search query; results are cached like regular
+        news (empty results are not).
         """
-        results = []
-        
         try:
-            from yahooquery import search
-            
-            print(f"[Scout Agent] [SEARCH] Volatility news search: {query}")
-            search_result = search(query)
-            
-            if search_result and "news" in search_result:
-                news_items = search_result.get("news", [])
-                
-                for item in news_items[:3]:  # Get top 3 volatility-related
-                    if isinstance(item, dict):
-                        title = item.get("title", "")
-                        link = item.get("link", "")
-                        publisher = item.get("publisher", "Unknown")
-                        published = item.get("providerPublishTime", "")
-                        
-                        # Convert timestamp if numeric
-                        if isinstance(published, (int, float)):
-                            try:
-                                from datetime import datetime
-                                published = datetime.fromtimestamp(published).isoformat()
-                            except:
-                                published = str(published)
-                        
-                        if title:
-                            results.append({
-                                "title": title,
-                                "link": link,
-                                "publisher": publisher,
-                                "timestamp": published,
-                                "source": "Volatility Search",
-                                "priority": "HIGH",
-                                "reason": "Related to significant price movement"
-                            })
-                
-                if results:
-                    print(f"[Scout Agent] [OK] Found {len(results)} volatility-related news items")
-                    
+            return [dict(item) for item in ScoutAgent._fetch_volatility_news_cached(asset_id, query)]
         except Exception as e:
             print(f"[Scout Agent] [WARN] Volatility news search failed: {e}")
+            return []
+
+    @staticmethod
+    @cache_data(expire_seconds=600, stale_seconds=300, cache_if=bool)
+    def _fetch_volatility_news_cached(asset_id: str, query: str) -> List[Dict[str, str]]:
+        from app.core.providers import search
         
+        print(f"[Scout Agent] [SEARCH] Volatility news search: {query}")
+        with trace_span("scout.news.volatility_search"):
+            search_result = search(query)
+        if not search_result or "news" not in search_result:
+            return []
+        results = ScoutAgent._format_news_items(
+            search_result.get("news", []), "Volatility Search", 3,  # Top 3 volatility-related
+            priority="HIGH", reason="Related to significant price movement"
+        )
+        if results:
+            print(f"[Scout Agent] [OK] Found {len(results)} volatility-related news items")
         return results
 
     @staticmethod
@@ -1108,58 +1355,40 @@ class ScoutAgent:
         except (TypeError, ValueError):
             return None
 
+    @staticmethod
+    def _history_closes(history: list) -> np.ndarray:
+        """Closes from a list of history dicts (CoinGecko uses 'Close')."""
+        return indicators.as_array([h.get("Close") or h.get("close") or h.get("price") or 0 for h in history])
+
     @staticmethod
     def _calculate_rsi_from_history(history: list, period: int = 14) -> float:
-        """Calculate RSI from price history list."""
+        """Calculate Wilder RSI from price history list."""
         if len(history) < period + 1:
             return None
-        
-        try:
-            prices = [h.get("Close") or h.get("close", 0) for h in history[-period-1:]]
-            deltas = [prices[i+1] - prices[i] for i in range(len(prices)-1)]
-            
-            gains = [d if d > 0 else 0 for d in deltas]
-            losses = [-d if d < 0 else 0 for d in deltas]
-            
-            avg_gain = sum(gains) / period
-            avg_loss = sum(losses) / period
-            
-            if avg_loss == 0:
-                return 100.0
-            
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
-            return round(rsi, 2)
-        except:
-            return None
+        value = indicators.last(indicators.rsi(ScoutAgent._history_closes(history), period))
+        return round(value, 2) if value is not None else None
     
     @staticmethod
     def _calculate_trend_from_history(history: list) -> str:
-        """Determine trend signal from price history."""
+        """Determine trend signal from price history (last 20 vs prior 20 bars)."""
         if len(history) < 20:
             return "Insufficient Data"
         
-        try:
-            recent = [h.get("Close") or h.get("close", 0) for h in history[-20:]]
-            older = [h.get("Close") or h.get("close", 0) for h in history[-40:-20]] if len(history) >= 40 else recent
-            
-            recent_avg = sum(recent) / len(recent)
-            older_avg = sum(older) / len(older)
-            
-            change = ((recent_avg - older_avg) / older_avg) * 100 if older_avg else 0
-            
-            if change > 10:
-                return "Strong Uptrend (Bullish)"
-            elif change > 3:
-                return "Uptrend (Bullish)"
-            elif change < -10:
-                return "Strong Downtrend (Bearish)"
-            elif change < -3:
-                return "Downtrend (Bearish)"
-            else:
-                return "Neutral (Sideways)"
-        except:
-            return "Unknown"
+        closes = ScoutAgent._history_closes(history)
+        recent_avg = closes[-20:].mean()
+        older_avg = closes[-40:-20].mean() if len(closes) >= 40 else recent_avg
+        change = ((recent_avg - older_avg) / older_avg) * 100 if older_avg else 0
+        
+        if change > 10:
+            return "Strong Uptrend (Bullish)"
+        elif change > 3:
+            return "Uptrend (Bullish)"
+        elif change < -10:
+            return "Strong Downtrend (Bearish)"
+        elif change < -3:
+            return "Downtrend (Bearish)"
+        else:
+            return "Neutral (Sideways)"
 
     @staticmethod
     def _get_demo_company_data() -> Dict[str, Any]:
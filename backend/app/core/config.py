@@ -30,6 +30,93 @@ class Settings(BaseSettings):
     # Groq Llama 8B Instant - fast inference
     GROQ_MODEL: str = Field(default="llama-3.1-8b-instant", validation_alias="OVERRIDE_GROQ_MODEL")
     
+    # Latency Budget (seconds per analysis request; 0 disables the deadline)
+    ANALYSIS_DEADLINE_SECONDS: float = 8.0
+
+    # Data cache (memory LRU tier + disk tier)
+    CACHE_MEMORY_MAX_ENTRIES: int = 256
+    CACHE_DISK_MAX_MB: int = 256
+
+    # Macro snapshots (shared per region, refreshed in the background)
+    MACRO_REFRESH_SECONDS: float = 300
+    MACRO_BACKGROUND_REFRESH: bool = True
+
+    # RBI policy rates (persisted last-known value, refreshed on a schedule)
+    RBI_STORE_PATH: str = "data/rbi_rates.json"
+    RBI_REFRESH_SECONDS: float = 6 * 3600
+    RBI_RETRY_BACKOFF_SECONDS: float = 600  # No new scrape this soon after a failed one
+    RBI_BACKGROUND_REFRESH: bool = True
+
+    # CoinGecko free-tier request budget (token bucket)
+    COINGECKO_RATE_PER_MINUTE: float = 25
+    COINGECKO_BURST: int = 5
+
+    # Hot-ticker refresher (keeps the most-requested Scout payloads warm)
+    HOT_TICKER_REFRESH: bool = True
+    HOT_TICKER_TOP_N: int = 10
+    HOT_TICKER_REFRESH_SECONDS: float = 120
+    HOT_TICKER_REFRESH_BUDGET: int = 5  # Max tickers refetched per cycle
+    HOT_TICKER_HALF_LIFE_SECONDS: float = 3600
+
+    # Warm-up of the popular-ticker universe, embedding model and LLM
+    # (WARMUP_INTERVAL_SECONDS=0 runs it once at startup only)
+    WARMUP_ON_STARTUP: bool = False
+    WARMUP_INTERVAL_SECONDS: float = 0
+    WARMUP_CONCURRENCY: int = 2  # Bulk Scout batches in flight
+    WARMUP_BATCH_SIZE: int = 10
+    WARMUP_BUDGET_SECONDS: float = 180
+    WARMUP_LLM: bool = True
+
+    # RAG sentence embeddings: loaded on first use or by warm-up; encode calls
+    # from all callers are micro-batched. EMBEDDING_WORKERS > 0 encodes in
+    # worker processes (results returned through shared memory). A model that
+    # fails to load is retried after EMBEDDING_LOAD_RETRY_SECONDS.
+    EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_BATCH_WAIT_MS: float = 5
+    EMBEDDING_WORKERS: int = 0
+    EMBEDDING_LOAD_RETRY_SECONDS: float = 60
+
+    # Lightweight quotes (/market-data, /api/quotes) are cached this long
+    QUOTE_CACHE_SECONDS: float = 5
+
+    # Live quote fan-out (WebSocket/SSE): one shared poll per interval
+    QUOTE_STREAM_INTERVAL_SECONDS: float = 5
+    QUOTE_STREAM_MAX_SYMBOLS: int = 50
+
+    # Watchlist price alerts: one vectorised evaluation pass per interval
+    ALERTS_BACKGROUND: bool = True
+    ALERTS_INTERVAL_SECONDS: float = 300
+
+    # Local daily OHLCV store (relative paths resolve against backend/)
+    PRICE_STORE_DIR: str = "data/ohlcv"
+    PRICE_STORE_REFRESH_SECONDS: float = 900
+
+    # Persisted incremental indicator states (one JSON file per symbol)
+    INDICATOR_STATE_DIR: str = "data/indicator_state"
+
+    # Listings master for the in-memory ticker autocomplete/resolution index
+    SYMBOL_MASTER_PATH: str = "data/symbols.csv"
+
+    # Persistent company-name -> ticker memo (web-search resolutions)
+    TICKER_MEMO_PATH: str = "data/ticker_memo.json"
+    TICKER_MEMO_TTL_SECONDS: float = 30 * 24 * 3600
+    TICKER_MEMO_NEGATIVE_TTL_SECONDS: float = 24 * 3600
+
+    # External data providers: live, record (capture responses to fixtures)
+    # or replay (serve fixtures offline). Replay sleeps recorded latency x scale.
+    PROVIDER_MODE: Literal["live", "record", "replay"] = "live"
+    PROVIDER_FIXTURE_DIR: str = "fixtures/providers"
+    PROVIDER_REPLAY_LATENCY_SCALE: float = 0.0
+
+    # Tracing (Zipkin v2 JSON; export path and collector URL are both optional,
+    # file export is off by default). Relative export paths resolve against
+    # backend/; the file rotates to <path>.1 once it exceeds the size cap.
+    TRACING_ENABLED: bool = True
+    TRACE_EXPORT_PATH: Optional[str] = None
+    TRACE_EXPORT_MAX_BYTES: int = 10 * 1024 * 1024
+    TRACE_COLLECTOR_URL: Optional[str] = None
+
     # Database
     DATABASE_URL: str = "sqlite:///./elida.db"
     
@@ -0,0 +1,85 @@
+"""
+Request latency budgets for ELIDA.
+A Deadline is created once per analysis request and propagated to each
+pipeline stage, so slow stages degrade to their rule-based fallbacks
+instead of holding the whole request hostage. Stages that answer from a
+fallback record it in the active degradation scope so it can be reported.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+
+# Minimum network timeout handed to HTTP clients (requests rejects 0)
+MIN_TIMEOUT_SECONDS = 0.1
+
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar("elida_deadline", default=None)
+_degradations: ContextVar[Optional[List[str]]] = ContextVar("elida_degradations", default=None)
+
+
+class Deadline:
+    """
+    A monotonic-clock deadline with helpers for carving stage budgets.
+    """
+
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = max(0.0, float(budget_seconds))
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + self.budget_seconds
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self) -> float:
+        """Seconds since the deadline was created."""
+        return time.monotonic() - self.started_at
+
+    def expired(self) -> bool:
+        """True once the budget is spent."""
+        return time.monotonic() >= self.expires_at
+
+    def sub_deadline(self, share: float) -> "Deadline":
+        """Carve a stage deadline from a share (0-1) of the remaining budget."""
+        return Deadline(self.remaining() * max(0.0, min(1.0, share)))
+
+    def cap_timeout(self, timeout: float) -> float:
+        """Clamp a network timeout so it never outlives the deadline."""
+        return max(MIN_TIMEOUT_SECONDS, min(timeout, self.remaining()))
+
+
+def get_current_deadline() -> Optional[Deadline]:
+    """Get the deadline active in the current thread/context, if any."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """
+    Make `deadline` the active deadline for the enclosed block.
+    Worker threads do not inherit context, so each stage enters its own scope.
+    """
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def record_degradation(reason: str):
+    """Note that the current stage fell back (no-op outside a degradation scope)."""
+    reasons = _degradations.get()
+    if reasons is not None:
+        reasons.append(reason)
+
+
+@contextmanager
+def degradation_scope() -> Iterator[List[str]]:
+    """Collect the fallback reasons recorded inside the enclosed block."""
+    reasons: List[str] = []
+    token = _degradations.set(reasons)
+    try:
+        yield reasons
+    finally:
+        _degradations.reset(token)
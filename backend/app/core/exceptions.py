@@ -90,3 +90,10 @@ class OrchestrationException(ElidaException):
             f"Orchestration failed for {asset_id} during {phase}: {reason}",
             {"asset_id": asset_id, "phase": phase, "reason": reason}
         )
+
+
+class FixtureMissingError(DataFetchException):
+    """Replay mode found no recorded response for a provider call."""
+    
+    def __init__(self, provider: str, call: str):
+        super().__init__(call, provider, "no recorded fixture (provider replay mode)")
@@ -0,0 +1,271 @@
+"""
+External data providers with record/replay.
+Every network-bound data call (yahooquery, yfinance, plain HTTP scrapes and
+APIs) goes through this module. In "live" mode the real clients are returned
+untouched; "record" additionally captures each response to a fixture file;
+"replay" serves fixtures without touching the network (optionally sleeping
+the recorded latency), so benchmarks and load tests run offline and
+deterministically.
+Fixtures live at <PROVIDER_FIXTURE_DIR>/<provider>/<sha1 of the call>.pkl.
+"""
+import hashlib
+import inspect
+import os
+import pickle
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from app.core.config import settings
+from app.core.exceptions import FixtureMissingError
+from app.core.logging import get_logger
+
+logger = get_logger("providers")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+# Query parameters that must never end up in fixture keys, descriptions or fixtures
+_SECRET_PARAM = re.compile(r"key|token|secret|password", re.IGNORECASE)
+# The same parameters inside URLs and messages ("...&api_key=abc123&...")
+_SECRET_IN_URL = re.compile(r"([?&;][^=&\s]*(?:key|token|secret|password)[^=&\s]*=)[^&#\s'\"]*", re.IGNORECASE)
+
+_config = {
+    "mode": settings.PROVIDER_MODE,
+    "fixture_dir": os.path.join(BACKEND_DIR, settings.PROVIDER_FIXTURE_DIR),
+    "latency_scale": settings.PROVIDER_REPLAY_LATENCY_SCALE,
+}
+
+
+def configure(mode: Optional[str] = None, fixture_dir: Optional[str] = None, latency_scale: Optional[float] = None):
+    """Switch provider mode at runtime (benchmarks, load tests, test suites)."""
+    if mode is not None:
+        if mode not in ("live", "record", "replay"):
+            raise ValueError(f"Unknown provider mode: {mode}")
+        _config["mode"] = mode
+    if fixture_dir is not None:
+        _config["fixture_dir"] = fixture_dir
+    if latency_scale is not None:
+        _config["latency_scale"] = latency_scale
+
+
+def get_mode() -> str:
+    return _config["mode"]
+
+
+# ============== Fixture Store ==============
+
+def _redact(params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {k: ("<redacted>" if _SECRET_PARAM.search(str(k)) else v) for k, v in (params or {}).items()}
+
+
+def _redact_text(text: str) -> str:
+    """Mask secret query-parameter values in a URL or in a message quoting one."""
+    return _SECRET_IN_URL.sub(r"\1<redacted>", text)
+
+
+def _recordable_error(error: Exception) -> Exception:
+    """
+    The exception to pickle into a fixture: the original when it is clean,
+    otherwise the same type rebuilt from the redacted message (requests
+    exceptions also carry the request/response, and with them the URL).
+    """
+    message = str(error)
+    redacted = _redact_text(message)
+    carries_http = getattr(error, "request", None) is not None or getattr(error, "response", None) is not None
+    if redacted == message and not carries_http:
+        try:
+            pickle.dumps(error)
+            return error
+        except Exception:
+            pass
+    try:
+        clean = type(error)(redacted)
+        pickle.dumps(clean)
+        return clean
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {redacted}")
+
+
+def _describe(target: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+    parts = [repr(a) for a in args] + [f"{k}={v!r}" for k, v in sorted(_redact(kwargs).items())]
+    return f"{target}({', '.join(parts)})"
+
+
+def _fixture_path(provider: str, call: str) -> str:
+    digest = hashlib.sha1(call.encode()).hexdigest()
+    return os.path.join(_config["fixture_dir"], provider, f"{digest}.pkl")
+
+
+def _save(provider: str, call: str, record: Dict[str, Any]):
+    path = _fixture_path(provider, call)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Could not record fixture for {call}: {e}")
+
+
+def _invoke(provider: str, call: str, fetch: Callable[[], Any]) -> Any:
+    """Run a provider call according to the current mode."""
+    mode = _config["mode"]
+    if mode == "live":
+        return fetch()
+
+    if mode == "replay":
+        try:
+            with open(_fixture_path(provider, call), "rb") as f:
+                record = pickle.load(f)
+        except FileNotFoundError:
+            raise FixtureMissingError(provider, call)
+        if _config["latency_scale"] > 0:
+            time.sleep(record["latency"] * _config["latency_scale"])
+        if "error" in record:
+            raise record["error"]
+        return record["value"]
+
+    # Record: failures are captured too, so replay takes the same fallback paths
+    start = time.monotonic()
+    record: Dict[str, Any] = {"call": call, "recorded_at": time.time()}
+    try:
+        value = fetch()
+        record["value"] = value
+        return value
+    except Exception as e:
+        record["error"] = _recordable_error(e)
+        raise
+    finally:
+        record["latency"] = time.monotonic() - start
+        _save(provider, call, record)
+
+
+# ============== yahooquery / yfinance ==============
+
+class RecordingTicker:
+    """
+    Stand-in for a yahooquery/yfinance Ticker in record/replay mode.
+    Properties and method calls are recorded per (symbols, name, arguments);
+    the real Ticker is only constructed when a live call is needed.
+    """
+
+    def __init__(self, provider: str, ticker_cls: type, symbols: Any, kwargs: Dict[str, Any]):
+        self._provider = provider
+        self._ticker_cls = ticker_cls
+        self._symbols = symbols
+        self._kwargs = kwargs
+        self._ticker = None
+
+    def _real(self):
+        if self._ticker is None:
+            self._ticker = self._ticker_cls(self._symbols, **self._kwargs)
+        return self._ticker
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        target = f"{self._symbols!r}.{name}"
+        attr = inspect.getattr_static(self._ticker_cls, name, None)
+        if isinstance(attr, property):
+            return _invoke(self._provider, target, lambda: getattr(self._real(), name))
+        if attr is None and get_mode() != "replay":
+            return getattr(self._real(), name)  # Plain instance attribute, no I/O
+
+        def call(*args, **kwargs):
+            return _invoke(
+                self._provider,
+                _describe(target, args, kwargs),
+                lambda: getattr(self._real(), name)(*args, **kwargs)
+            )
+        return call
+
+
+def Ticker(symbols: Any, **kwargs) -> Any:
+    """yahooquery.Ticker (or its recording stand-in)."""
+    from yahooquery import Ticker as YQTicker
+
+    if get_mode() == "live":
+        return YQTicker(symbols, **kwargs)
+    return RecordingTicker("yahooquery", YQTicker, symbols, kwargs)
+
+
+def search(query: str, **kwargs) -> Any:
+    """yahooquery.search."""
+    from yahooquery import search as yq_search
+
+    return _invoke("yahooquery", _describe("search", (query,), kwargs), lambda: yq_search(query, **kwargs))
+
+
+def YFTicker(symbol: str) -> Any:
+    """yfinance.Ticker (or its recording stand-in)."""
+    import yfinance as yf
+
+    if get_mode() == "live":
+        return yf.Ticker(symbol)
+    return RecordingTicker("yfinance", yf.Ticker, symbol, {})
+
+
+# ============== HTTP ==============
+
+class RecordedResponse:
+    """Picklable snapshot of a requests/curl response (the parts callers use)."""
+
+    def __init__(self, url: str, status_code: int, content: bytes, headers: Dict[str, str], encoding: Optional[str]):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers)
+        self.encoding = encoding or "utf-8"
+
+    @classmethod
+    def from_response(cls, response) -> "RecordedResponse":
+        # The URL carries the query string, so API keys are masked before pickling
+        return cls(_redact_text(str(response.url)), response.status_code, response.content,
+                   dict(response.headers), response.encoding)
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self) -> Any:
+        import json
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+def http_get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    session: Optional[requests.Session] = None,
+    provider: str = "http"
+) -> Any:
+    """
+    GET through requests (or the given session). Headers are not part of the
+    fixture key, and key/token-like params are redacted from it.
+    """
+    client = session or requests
+
+    def fetch():
+        return client.get(url, params=params, headers=headers, timeout=timeout)
+
+    if get_mode() == "live":
+        return fetch()
+    return _invoke(
+        provider,
+        _describe(f"GET {_redact_text(url)}", (), params or {}),
+        lambda: RecordedResponse.from_response(fetch())
+    )
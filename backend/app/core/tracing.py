@@ -0,0 +1,241 @@
+"""
+Lightweight request tracing for ELIDA.
+Opens nested timing spans across Scout, RAG, agents, Match Score and Coach,
+exports finished traces as Zipkin v2 JSON (to a size-capped local JSONL file
+and/or a collector such as Zipkin/Jaeger) and produces a compact timing
+summary that debug-mode API responses can attach. Spans that finish after
+their trace was exported (abandoned straggler threads) are exported on
+their own as they finish.
+"""
+import json
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("tracing")
+
+SERVICE_NAME = "elida-backend"
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("elida_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("elida_span", default=None)
+
+# Exports run off the request thread
+_export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+_file_lock = threading.Lock()
+
+
+class Span:
+    """A single timed operation within a trace."""
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], tags: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.tags = {k: str(v) for k, v in tags.items() if v is not None}
+        self.start_time = time.time()
+        self._start_perf = time.perf_counter()
+        self.duration: Optional[float] = None
+
+    def set_tag(self, key: str, value: Any):
+        self.tags[key] = str(value)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start_perf
+
+    def elapsed(self) -> float:
+        """Duration in seconds (time so far if still open)."""
+        return self.duration if self.duration is not None else time.perf_counter() - self._start_perf
+
+    def to_zipkin(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace.trace_id,
+            "id": self.span_id,
+            "name": self.name,
+            "timestamp": int(self.start_time * 1_000_000),
+            "duration": max(1, int(self.elapsed() * 1_000_000)),
+            "localEndpoint": {"serviceName": SERVICE_NAME},
+            "tags": self.tags
+        }
+        if self.parent_id:
+            span["parentId"] = self.parent_id
+        return span
+
+
+class Trace:
+    """All spans recorded for one request."""
+
+    def __init__(self, name: str):
+        self.trace_id = secrets.token_hex(16)
+        self.name = name
+        self.spans: List[Span] = []
+        self.exported = False
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def finish_span(self, span: Span) -> bool:
+        """Finish a span; True if the trace was already exported without it."""
+        with self._lock:
+            span.finish()
+            return self.exported
+
+    def take_for_export(self) -> List[Dict[str, Any]]:
+        """Mark the trace exported and return its finished spans (open ones export when they finish)."""
+        with self._lock:
+            self.exported = True
+            return [span.to_zipkin() for span in self.spans if span.duration is not None]
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact timing summary (milliseconds, in start order) for API responses."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_time)
+        if not spans:
+            return {"trace_id": self.trace_id, "total_ms": 0, "spans": []}
+
+        origin = spans[0].start_time
+        depths: Dict[str, int] = {}
+        compact = []
+        for span in spans:
+            depth = depths.get(span.parent_id, -1) + 1 if span.parent_id else 0
+            depths[span.span_id] = depth
+            compact.append({
+                "name": span.name,
+                "start_ms": round((span.start_time - origin) * 1000, 1),
+                "ms": round(span.elapsed() * 1000, 1),
+                "depth": depth
+            })
+        return {
+            "trace_id": self.trace_id,
+            "total_ms": round(spans[0].elapsed() * 1000, 1),
+            "spans": compact
+        }
+
+    def to_zipkin(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [span.to_zipkin() for span in self.spans]
+
+
+def get_current_trace() -> Optional[Trace]:
+    """Get the trace active in the current context, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str, **tags) -> Iterator[Optional[Trace]]:
+    """
+    Start a new trace with a root span; exports it when the block exits.
+    Yields None (and records nothing) when tracing is disabled.
+    """
+    if not settings.TRACING_ENABLED:
+        yield None
+        return
+
+    trace = Trace(name)
+    trace_token = _current_trace.set(trace)
+    try:
+        with trace_span(name, **tags):
+            yield trace
+    finally:
+        _current_trace.reset(trace_token)
+        export_trace(trace)
+
+
+@contextmanager
+def trace_span(name: str, **tags) -> Iterator[Optional[Span]]:
+    """
+    Time the enclosed block as a child of the current span.
+    A no-op when no trace is active, so library code can always call it.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    span = Span(trace, name, parent.span_id if parent else None, tags)
+    trace.add(span)
+    span_token = _current_span.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.set_tag("error", e)
+        raise
+    finally:
+        late = trace.finish_span(span)
+        _current_span.reset(span_token)
+        if late:
+            span.set_tag("late", True)
+            _submit_export([span.to_zipkin()])
+
+
+def propagate_context(func: Callable) -> Callable:
+    """
+    Bind func to a copy of the caller's context (trace, span, deadline) so it
+    can be submitted to a thread pool. Worker threads do not inherit context.
+    """
+    ctx = copy_context()
+
+    def wrapper(*args, **kwargs):
+        return ctx.run(func, *args, **kwargs)
+    return wrapper
+
+
+def export_trace(trace: Trace):
+    """Queue a finished trace for export to the configured file/collector."""
+    spans = trace.take_for_export()
+    if len(trace.spans) <= 1:
+        return  # Nothing beyond the root span (e.g. health checks)
+    _submit_export(spans)
+
+
+def _submit_export(spans: List[Dict[str, Any]]):
+    if not spans or (not settings.TRACE_EXPORT_PATH and not settings.TRACE_COLLECTOR_URL):
+        return
+    _export_executor.submit(_export, spans)
+
+
+def export_path() -> Optional[str]:
+    """Trace file path (relative paths resolve against backend/), or None if file export is off."""
+    path = settings.TRACE_EXPORT_PATH
+    if not path:
+        return None
+    return path if os.path.isabs(path) else os.path.join(BACKEND_DIR, path)
+
+
+def _write_file(path: str, line: str):
+    """Append one line, rotating the file to <path>.1 once it passes the size cap."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _file_lock:
+        try:
+            if os.path.getsize(path) + len(line) > settings.TRACE_EXPORT_MAX_BYTES:
+                os.replace(path, f"{path}.1")
+        except OSError:
+            pass  # No file yet
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def _export(spans: List[Dict[str, Any]]):
+    try:
+        path = export_path()
+        if path:
+            _write_file(path, json.dumps(spans) + "\n")
+
+        if settings.TRACE_COLLECTOR_URL:
+            import requests
+            requests.post(settings.TRACE_COLLECTOR_URL, json=spans, timeout=2)
+    except Exception as e:
+        logger.warning(f"Trace export failed: {e}")
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse, StreamingResponse
 from app.core.errors import AppException, ResourceNotFound, InvalidRequest, LLMGenerationError, AuthenticationError
 from fastapi.middleware.cors import CORSMiddleware
@@ -27,6 +27,7 @@ from app.auth.routes import router as auth_router
 from app.auth.auth import get_current_user_id
 from app.routers.profile import router as profile_router
 from app.routers.history import router as history_router
+from app.routers.alerts import router as alerts_router
 from app.demo_cache import get_demo_analysis, is_demo_ticker, DEMO_ANALYSES, get_demo_comparison, is_demo_comparison
 
 app = FastAPI(
@@ -61,6 +62,7 @@ async def app_exception_handler(request: Request, exc: AppException):
 # Import our new exceptions and logging
 from app.core.exceptions import ElidaException, OrchestrationException, AgentException, DataFetchException, ValidationException, AuthException
 from app.core.logging import get_logger, setup_logging
+from app.core.tracing import start_trace
 
 # Initialize logging
 main_logger = setup_logging()
@@ -91,8 +93,31 @@ async def elida_exception_handler(request: Request, exc: ElidaException):
 
 @app.on_event("startup")
 def startup_event():
-    """Initialize database on startup."""
+    """Initialize database and background refreshers on startup."""
     init_db()
+    from app.services.symbol_index import symbol_index
+    symbol_index.load()
+    if settings.MACRO_BACKGROUND_REFRESH:
+        from app.services.macro_snapshot_service import macro_snapshot_service
+        macro_snapshot_service.start()
+    if settings.RBI_BACKGROUND_REFRESH:
+        from app.services.rbi_service import rbi_service
+        rbi_service.start()
+    if settings.HOT_TICKER_REFRESH:
+        from app.services.hot_ticker_service import hot_ticker_service
+        hot_ticker_service.start()
+    if settings.WARMUP_ON_STARTUP:
+        from app.services.warmup_service import warmup_service
+        warmup_service.start()
+    if settings.ALERTS_BACKGROUND:
+        from app.services.alert_service import alert_service
+        alert_service.start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """Stop embedding worker processes, if any were started."""
+    from app.services.embedding_service import embedding_service
+    embedding_service.shutdown()
 
 # Rate Limiting Setup
 app.state.limiter = limiter
@@ -105,6 +130,7 @@ app.add_exception_handler(RateLimitExceeded, lambda request, exc: JSONResponse(
 app.include_router(auth_router)
 app.include_router(profile_router)
 app.include_router(history_router)
+app.include_router(alerts_router)
 
 # Enable CORS for development
 origins = [
@@ -313,42 +339,28 @@ def retrieve(
 def get_market_data(request: Request, asset_id: str, force_live: bool = True):
     """
     Fast endpoint: Get only market data.
-    By default fetches live data from Yahoo Finance.
+    By default fetches a live quote (batched quote service, cached for a
+    few seconds) instead of running the full Scout pipeline.
     Falls back to demo cache if live fetch fails.
     """
-    from app.agents.scout import scout_agent
+    from app.services.quote_service import quote_service
     
     try:
-        # Always try live data first for real-time prices
-        data = scout_agent.collect_data(asset_id)
-        financials = data.get("financials", {})
-        
-        # Extract key market data with live prices
-        price = financials.get("current_price", 0)
-        prev_close = financials.get("previous_close", 0)
-        
-        # Calculate change percentage
-        if prev_close and prev_close > 0:
-            change_pct = ((price - prev_close) / prev_close) * 100
-        else:
-            change_pct = 0
-        
-        # Determine currency from ticker suffix
-        currency = financials.get("currency", "USD")
-        if asset_id.upper().endswith('.NS') or asset_id.upper().endswith('.BO'):
-            currency = "INR"
+        quote = quote_service.get_quote(asset_id)
+        if "error" in quote:
+            raise ValueError(quote["error"])
         
         return {
-            "price": price,
-            "change": round(change_pct, 2),
-            "volume": financials.get("volume") or data.get("technicals", {}).get("volume", 0),
-            "high52w": financials.get("52_week_high"),
-            "low52w": financials.get("52_week_low"),
-            "pe_ratio": financials.get("pe_ratio"),
-            "market_cap": financials.get("market_cap"),
-            "currency": currency,
-            "company_name": financials.get("company_name", asset_id),
-            "history": financials.get("history", []),
+            "price": quote["price"],
+            "change": quote["change"],
+            "volume": quote["volume"],
+            "high52w": quote["high52w"],
+            "low52w": quote["low52w"],
+            "pe_ratio": quote["pe_ratio"],
+            "market_cap": quote["market_cap"],
+            "currency": quote["currency"],
+            "company_name": quote["company_name"],
+            "history": [],
             "source": "live"
         }
     except Exception as e:
@@ -372,12 +384,105 @@ def get_market_data(request: Request, asset_id: str, force_live: bool = True):
         }
 
 
+@app.get("/api/quotes")
+@limiter.limit(RATE_LIMITS["market_data"])
+def get_quotes(request: Request, tickers: str):
+    """
+    Quotes for many tickers in one call (comma-separated, e.g.
+    ?tickers=RELIANCE.NS,TCS.NS,AAPL), fetched as one upstream batch.
+    """
+    from app.services.quote_service import quote_service
+    
+    symbols = [t for t in tickers.split(",") if t.strip()]
+    if not symbols:
+        raise HTTPException(status_code=400, detail="At least one ticker is required")
+    if len(symbols) > quote_service.MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"Too many tickers (max {quote_service.MAX_SYMBOLS})")
+    return {"quotes": quote_service.get_quotes(symbols)}
+
+
+@app.get("/api/quotes/stream")
+async def stream_quotes(tickers: str):
+    """
+    SSE stream of live quotes for comma-separated tickers. One shared poller
+    refreshes every subscribed symbol, so viewers don't multiply upstream calls.
+    """
+    from app.services.quote_stream_service import quote_stream_service
+    
+    symbols = [t for t in tickers.split(",") if t.strip()]
+    if not symbols:
+        raise HTTPException(status_code=400, detail="At least one ticker is required")
+    
+    async def generate():
+        subscriber = quote_stream_service.subscribe(symbols)
+        try:
+            yield f"data: {json.dumps({'type': 'subscribed', 'tickers': sorted(subscriber.symbols)})}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(event, default=str)}\n\n"
+        finally:
+            quote_stream_service.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive"
+        }
+    )
+
+
+@app.websocket("/ws/quotes")
+async def quotes_websocket(websocket: WebSocket, tickers: str = ""):
+    """
+    WebSocket quote stream. Optional initial ?tickers=A,B; then send
+    {"action": "subscribe" | "unsubscribe", "tickers": [...]} to change the set.
+    """
+    from app.services.quote_stream_service import quote_stream_service
+    
+    await websocket.accept()
+    subscriber = quote_stream_service.subscribe([t for t in tickers.split(",") if t.strip()])
+    
+    async def forward():
+        while True:
+            await websocket.send_json(await subscriber.queue.get())
+    
+    sender = asyncio.create_task(forward())
+    try:
+        while True:
+            message = await websocket.receive_json()
+            requested = message.get("tickers") or []
+            if not isinstance(requested, list):
+                # A bare string would otherwise be subscribed letter by letter
+                await websocket.send_json({"type": "error", "message": "tickers must be a list of symbols"})
+                continue
+            if message.get("action") == "unsubscribe":
+                quote_stream_service.remove_symbols(subscriber, requested)
+            else:
+                quote_stream_service.add_symbols(subscriber, requested)
+            await websocket.send_json({"type": "subscribed", "tickers": sorted(subscriber.symbols)})
+    except (WebSocketDisconnect, ValueError, AttributeError):
+        pass
+    finally:
+        sender.cancel()
+        quote_stream_service.unsubscribe(subscriber)
+
+
 @app.get("/analyze/{asset_id}")
 @limiter.limit(RATE_LIMITS["analysis"])
 def analyze_asset(
     request: Request,
     asset_id: str, 
+    background_tasks: BackgroundTasks,
     demo: bool = False,
+    deadline: Optional[float] = None,
+    mode: str = "full",
+    debug: bool = False,
     user_id: str = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
 ):
@@ -385,6 +490,12 @@ def analyze_asset(
     One-shot analysis: Ingest + Retrieve in a single call.
     Use demo=true for instant cached results (hackathon demo mode).
     Now supports company names (e.g., 'Reliance' → 'RELIANCE.NS')
+    deadline overrides the agent latency budget in seconds (0 disables it);
+    stages that miss it are listed in `degraded_stages`.
+    mode=instant returns a heuristic (no-LLM) result right away and runs the
+    full LLM analysis in the background; poll /analyze/status/{request_id}
+    or stream /analyze/events/{request_id} for the refined result.
+    debug=true attaches a per-stage timing summary (`timings`) from the trace.
     """
     # Smart ticker resolution: Convert company name to ticker
     from app.services.ticker_search_service import resolve_company_to_ticker
@@ -400,13 +511,37 @@ def analyze_asset(
     # Get user's InvestorDNA profile with ethical filters properly mapped
     profile = profile_service.get_investor_dna(db, user_id)
     
-    orchestrator.ingest_asset(asset_id)
-    
-    result = orchestrator.retrieve_context(
-        query="comprehensive analysis",
-        asset_id=asset_id,
-        investor_dna=profile
-    )
+    with start_trace("analyze", asset_id=asset_id, mode=mode) as trace:
+        if mode == "instant":
+            from app.agents.scout import scout_agent
+            from app.services.instant_analysis_service import instant_analysis_service
+            
+            asset_data = scout_agent.collect_data(asset_id)
+            result = instant_analysis_service.build_instant_result(asset_id, asset_data, profile)
+            request_id = instant_analysis_service.create_job(asset_id, result)
+            background_tasks.add_task(
+                instant_analysis_service.run_refinement,
+                request_id,
+                asset_id,
+                profile,
+                deadline
+            )
+            result["request_id"] = request_id
+            result["refined_status"] = "pending"
+            result["poll_url"] = f"/analyze/status/{request_id}"
+            result["events_url"] = f"/analyze/events/{request_id}"
+        else:
+            orchestrator.ingest_asset(asset_id)
+            
+            result = orchestrator.retrieve_context(
+                query="comprehensive analysis",
+                asset_id=asset_id,
+                investor_dna=profile,
+                deadline_seconds=deadline
+            )
+        
+        if debug and trace:
+            result["timings"] = trace.summary()
 
     # Auto-save disabled per user request - manual save only
     # try:
@@ -424,6 +559,51 @@ def analyze_asset(
     return result
 
 
+@app.get("/analyze/status/{request_id}")
+def get_analysis_status(request_id: str):
+    """Poll a two-tier analysis job: instant result plus refined result once ready."""
+    from app.services.instant_analysis_service import instant_analysis_service
+    job = instant_analysis_service.get_job(request_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Request not found")
+    return job
+
+
+@app.get("/analyze/events/{request_id}")
+async def analysis_events(request_id: str):
+    """
+    SSE stream for a two-tier analysis job.
+    Emits the instant result immediately, then the refined result when ready.
+    """
+    from app.services.instant_analysis_service import instant_analysis_service
+    
+    if not instant_analysis_service.get_job(request_id):
+        raise HTTPException(status_code=404, detail="Request not found")
+    
+    async def generate():
+        job = instant_analysis_service.get_job(request_id)
+        yield f"data: {json.dumps({'type': 'instant', 'request_id': request_id, 'result': job['instant']}, default=str)}\n\n"
+        
+        while job and job["status"] in ("pending", "processing"):
+            await asyncio.sleep(0.5)
+            job = instant_analysis_service.get_job(request_id)
+        
+        if job and job["status"] == "completed":
+            final_data = {"type": "refined", "request_id": request_id, "result": job["refined"]}
+        else:
+            final_data = {"type": "error", "request_id": request_id, "error": job["error"] if job else "Request expired"}
+        yield f"data: {json.dumps(final_data, default=str)}\n\n"
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive"
+        }
+    )
+
+
 @app.get("/api/demo/tickers")
 def get_demo_tickers():
     """Get list of available demo tickers for instant analysis."""
@@ -462,6 +642,34 @@ def get_ticker_suggestions(q: str, limit: int = 5):
     }
 
 
+class TickerMemoSeedRequest(BaseModel):
+    entries: Dict[str, Optional[str]]  # name -> ticker (null marks a name as unresolvable)
+
+
+@app.get("/api/ticker/memo")
+def get_ticker_memo(limit: int = 100):
+    """Inspect remembered name -> ticker resolutions (most hit first)."""
+    from app.services.ticker_memo import ticker_memo
+    return {
+        "stats": ticker_memo.get_stats(),
+        "entries": ticker_memo.entries(limit)
+    }
+
+
+@app.post("/api/ticker/memo")
+def seed_ticker_memo(req: TickerMemoSeedRequest):
+    """Seed name -> ticker resolutions (never expire)."""
+    from app.services.ticker_memo import ticker_memo
+    return {"status": "ok", "seeded": ticker_memo.seed(req.entries)}
+
+
+@app.delete("/api/ticker/memo")
+def clear_ticker_memo(name: Optional[str] = None):
+    """Forget one remembered name, or all of them."""
+    from app.services.ticker_memo import ticker_memo
+    return {"status": "ok", "removed": ticker_memo.forget(name)}
+
+
 @app.get("/api/chart/{ticker}")
 def get_chart_data(ticker: str, period: str = "1mo", interval: str = "1d"):
     """
@@ -475,7 +683,7 @@ def get_chart_data(ticker: str, period: str = "1mo", interval: str = "1d"):
     Returns:
         OHLC data array for candlestick/line charts
     """
-    from yahooquery import Ticker
+    from app.core.providers import Ticker
     from datetime import datetime
     
     try:
@@ -483,6 +691,21 @@ def get_chart_data(ticker: str, period: str = "1mo", interval: str = "1d"):
         from app.services.ticker_search_service import resolve_company_to_ticker
         resolved_ticker, _ = resolve_company_to_ticker(ticker)
         
+        # Daily bars come from the local price store (incrementally synced)
+        from app.services.price_store import price_store, period_start, chart_rows
+        start = period_start(period) if interval == "1d" else None
+        if start is not None:
+            bars = price_store.get_bars(resolved_ticker, start=start)
+            if len(bars):
+                chart_data = chart_rows(bars)
+                return {
+                    "ticker": resolved_ticker,
+                    "period": period,
+                    "interval": interval,
+                    "data_points": len(chart_data),
+                    "data": chart_data
+                }
+        
         # Fetch historical data using yahooquery
         stock = Ticker(resolved_ticker)
         hist = stock.history(period=period, interval=interval)
@@ -668,6 +891,97 @@ def get_rag_stats():
     return rag_service.get_stats()
 
 
+@app.get("/api/v1/macro/snapshots")
+def get_macro_snapshots():
+    """Get the shared per-region macro snapshots and their ages."""
+    from app.services.macro_snapshot_service import macro_snapshot_service, REGIONS
+    return {
+        "status": macro_snapshot_service.get_status(),
+        "snapshots": {region: macro_snapshot_service.peek(region) for region in REGIONS}
+    }
+
+
+@app.get("/api/v1/macro/rbi")
+def get_rbi_rates():
+    """Get the last known RBI policy rates with staleness metadata."""
+    from app.services.rbi_service import rbi_service
+    return rbi_service.get_status()
+
+
+@app.post("/api/v1/macro/rbi/refresh")
+def refresh_rbi_rates():
+    """Re-scrape RBI policy rates now."""
+    from app.services.rbi_service import rbi_service
+    return rbi_service.refresh()
+
+
+@app.get("/api/v1/cache/stats")
+def get_cache_stats():
+    """Get data cache statistics (hit rates, tier sizes, evictions)."""
+    from app.services.cache_service import tiered_cache
+    return tiered_cache.get_stats()
+
+
+@app.get("/api/v1/cache/quotes")
+def get_quote_cache_stats():
+    """Get quote cache statistics (hits, misses, upstream batch calls)."""
+    from app.services.quote_service import quote_service
+    return quote_service.get_stats()
+
+
+@app.get("/api/v1/quotes/stream")
+def get_quote_stream_status():
+    """Get live quote stream status (subscribers, symbols polled, events sent)."""
+    from app.services.quote_stream_service import quote_stream_service
+    return quote_stream_service.get_status()
+
+
+@app.get("/api/v1/indicators/state")
+def get_indicator_state_status():
+    """Get incremental indicator state statistics (symbols held, bars appended, rebuilds)."""
+    from app.services.indicator_state_service import indicator_states
+    return indicator_states.get_status()
+
+
+@app.get("/api/v1/cache/hot")
+def get_hot_tickers():
+    """Get the most-requested tickers kept warm by the background refresher."""
+    from app.services.hot_ticker_service import hot_ticker_service
+    return hot_ticker_service.get_status()
+
+
+@app.get("/api/v1/warmup")
+def get_warmup_status():
+    """Get the status and report of the last popular-ticker warm-up."""
+    from app.services.warmup_service import warmup_service
+    return warmup_service.get_status()
+
+
+@app.post("/api/v1/warmup")
+def trigger_warmup(background_tasks: BackgroundTasks, force: bool = False):
+    """Run a warm-up pass in the background (force=true refetches cached tickers)."""
+    from app.services.warmup_service import warmup_service
+    background_tasks.add_task(warmup_service.run, None, force)
+    return {"status": "scheduled"}
+
+
+@app.delete("/api/v1/cache")
+def invalidate_cache(asset_id: Optional[str] = None, namespace: Optional[str] = None):
+    """
+    Invalidate cached data.
+    asset_id drops that ticker's Scout data; namespace drops a whole cached
+    function (e.g. ScoutAgent._fetch_cached_data); neither clears everything.
+    """
+    from app.services.cache_service import tiered_cache
+    from app.agents.scout import ScoutAgent
+    
+    if asset_id:
+        removed = ScoutAgent._fetch_cached_data.invalidate(asset_id)
+    else:
+        removed = tiered_cache.invalidate(namespace)
+    return {"status": "ok", "removed": removed}
+
+
 class BacktestRequest(BaseModel):
     tickers: List[str]
     start_date: str
@@ -74,3 +74,54 @@ class PortfolioRequest(Base):
     results = Column(JSON, default=dict)
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
+
+
+class WatchlistItem(Base):
+    """Symbol on a user's watchlist (built-in alert rules apply to every item)."""
+    __tablename__ = "watchlist_items"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    symbol = Column(String(30), nullable=False)
+    alert_state = Column(JSON, default=dict)  # built-in rule key -> condition currently met
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_watchlist_user_symbol', 'user_id', 'symbol', unique=True),
+    )
+
+
+class AlertRule(Base):
+    """User-defined price alert rule."""
+    __tablename__ = "alert_rules"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    symbol = Column(String(30), nullable=False)
+    kind = Column(String(30), nullable=False)  # price_above, change_below, rsi_above, high_52w, ...
+    threshold = Column(Float, nullable=True)
+    window = Column(Integer, default=1)  # bars, for change_* rules
+    enabled = Column(Boolean, default=True)
+    triggered = Column(Boolean, default=False)  # condition met at the last evaluation
+    last_triggered_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AlertEvent(Base):
+    """Fired alert notification (one per user, symbol, rule and bar)."""
+    __tablename__ = "alert_events"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    rule_id = Column(Integer, ForeignKey("alert_rules.id"), nullable=True)  # None for built-in rules
+    rule_key = Column(String(60), nullable=False)
+    symbol = Column(String(30), nullable=False)
+    message = Column(Text)
+    value = Column(Float, nullable=True)
+    bar_date = Column(String(10))
+    read = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_alert_events_user', 'user_id', 'created_at'),
+    )
@@ -1,5 +1,6 @@
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Optional, Dict, Any, List, Tuple
 
 from app.agents.scout import scout_agent
@@ -14,9 +15,16 @@ from app.models.investor_dna import InvestorDNA, DEFAULT_INVESTOR_DNA
 from app.core.logging import get_logger
 from app.core.exceptions import OrchestrationException, AgentException, DataFetchException
 from app.services.score_labels import get_score_label
+from app.core.config import settings
+from app.core.deadline import Deadline, deadline_scope, degradation_scope
+from app.core.tracing import trace_span, propagate_context
 
 logger = get_logger("orchestrator")
 
+# Share of the remaining request budget given to the parallel agent stage.
+# The rest is kept for match scoring and Coach synthesis.
+AGENT_STAGE_SHARE = 0.75
+
 
 class FinancialOrchestrator:
     """
@@ -96,16 +104,26 @@ class FinancialOrchestrator:
         self, 
         query: str, 
         asset_id: str,
-        investor_dna: Optional[InvestorDNA] = None
+        investor_dna: Optional[InvestorDNA] = None,
+        deadline_seconds: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Phase 2: Centralized Retrieval & Agent Orchestration with Match Score
+        
+        deadline_seconds is the latency budget for this request (defaults to
+        settings.ANALYSIS_DEADLINE_SECONDS, 0 disables it). Agents and Coach
+        that miss their stage deadline degrade to their rule-based fallbacks.
         """
         try:
             # Use default DNA if not provided
             if investor_dna is None:
                 investor_dna = DEFAULT_INVESTOR_DNA
             
+            if deadline_seconds is None:
+                deadline_seconds = settings.ANALYSIS_DEADLINE_SECONDS
+            deadline = Deadline(deadline_seconds) if deadline_seconds and deadline_seconds > 0 else None
+            degraded_stages: List[str] = []
+            
             # 1. Centralized Retrieval - Get asset-specific AND global data
             logger.info(f"Retrieving context for {asset_id}...")
             
@@ -211,9 +229,9 @@ class FinancialOrchestrator:
 
             # 2. Invoke Analysis Agents (PARALLEL Execution for speed)
             logger.info("Invoking agents in PARALLEL...")
-            import time
             
             start_time = time.time()
+            agent_deadline = deadline.sub_deadline(AGENT_STAGE_SHARE) if deadline else None
             
             # Agents list for parallel execution
             agents: List[Tuple] = [
@@ -228,9 +246,11 @@ class FinancialOrchestrator:
                 agent, agent_name = agent_tuple
                 try:
                     logger.debug(f"Starting {agent_name.upper()} Agent...")
-                    result = agent.run(global_context)
+                    with deadline_scope(agent_deadline), degradation_scope() as fallbacks, \
+                            trace_span(f"agent.{agent_name}"):
+                        result = agent.run(global_context)
                     logger.info(f"[OK] Agent {agent_name.upper()} completed")
-                    return agent_name, result
+                    return agent_name, self._flag_fallbacks(result, fallbacks)
                 except Exception as e:
                     logger.error(f"[ERROR] Agent {agent_name.upper()} failed: {e}")
                     return agent_name, {
@@ -240,12 +260,31 @@ class FinancialOrchestrator:
                         "confidence": 0
                     }
             
-            # Run all agents in parallel using ThreadPoolExecutor
+            # Run all agents in parallel; stragglers past the stage deadline are
+            # abandoned (not joined) and replaced by their rule-based fallback.
+            # Each task carries the request context so its spans join the trace.
+            finished = {}
+            executor = ThreadPoolExecutor(max_workers=4)
+            try:
+                futures = {executor.submit(propagate_context(run_single_agent), a): a for a in agents}
+                done, not_done = wait(futures, timeout=agent_deadline.remaining() if agent_deadline else None)
+                for future in done:
+                    agent_name, result = future.result()
+                    finished[agent_name] = result
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+            
             agent_results = {}
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                futures = list(executor.map(run_single_agent, agents))
-                for agent_name, result in futures:
-                    agent_results[agent_name] = result
+            for agent, agent_name in agents:
+                if agent_name in finished:
+                    agent_results[agent_name] = finished[agent_name]
+                    if finished[agent_name].get("degraded"):
+                        # Answered in time, but from its fallback (LLM timeout/failure)
+                        degraded_stages.append(agent_name)
+                else:
+                    logger.warning(f"[DEADLINE] Agent {agent_name.upper()} missed its deadline, degrading to fallback")
+                    agent_results[agent_name] = self._run_degraded(agent, agent_name, global_context)
+                    degraded_stages.append(agent_name)
 
             elapsed = time.time() - start_time
             logger.info(f"Agent analysis completed in {elapsed:.2f} seconds (parallel)")
@@ -258,11 +297,12 @@ class FinancialOrchestrator:
             if not asset_data:
                 asset_data = self._reconstruct_asset_data(global_context)
             
-            match_result = match_score_service.calculate_match_score(
-                agent_results=agent_results,
-                asset_data=asset_data,
-                investor_dna=investor_dna
-            )
+            with trace_span("match_score"):
+                match_result = match_score_service.calculate_match_score(
+                    agent_results=agent_results,
+                    asset_data=asset_data,
+                    investor_dna=investor_dna
+                )
             
             logger.info(f"Match Score = {match_result.match_score}%")
             
@@ -295,9 +335,11 @@ class FinancialOrchestrator:
                  for doc in coach_context_raw['documents'][0]:
                      coach_context.append({"content": doc, "metadata": {"type": "agent_insight"}})
 
-            # 6. Coach Synthesis
+            # 6. Coach Synthesis (gets whatever budget the earlier stages left)
             logger.info("Invoking Coach for final synthesis...")
-            coach_result = coach_agent.run(coach_context)
+            coach_result, coach_degraded = self._run_coach(coach_context, deadline)
+            if coach_degraded:
+                degraded_stages.append("coach")
             
             # Enrich agent results with score labels
             for agent_name, result in agent_results.items():
@@ -319,32 +361,21 @@ class FinancialOrchestrator:
                 
                 # Match Score
                 "match_score": match_result.match_score,
-                "match_result": {
-                    "score": match_result.match_score,
-                    "score_label": match_result.score_label,
-                    "score_grade": match_result.score_grade,
-                    "score_emoji": match_result.score_emoji,
-                    "score_color": match_result.score_color,
-                    "recommendation": match_result.recommendation,
-                    "action_if_owned": match_result.action_if_owned,
-                    "action_if_not_owned": match_result.action_if_not_owned,
-                    "fit_reasons": match_result.fit_reasons,
-                    "concern_reasons": match_result.concern_reasons,
-                    "summary": match_result.summary,
-                    "breakdown": {
-                        "fundamental": match_result.breakdown.fundamental_score,
-                        "macro": match_result.breakdown.macro_score,
-                        "philosophy": match_result.breakdown.philosophy_score,
-                        "risk": match_result.breakdown.risk_score,
-                        "dna_match": match_result.breakdown.dna_match_score
-                    }
-                },
+                "match_result": self.format_match_result(match_result),
                 
                 # Coach Verdict
                 "coach_verdict": coach_result,
                 
                 # Market Data for charts
-                "market_data": asset_data.get("technicals", {})
+                "market_data": asset_data.get("technicals", {}),
+                
+                # Latency budget: which stages fell back to rule-based output
+                "degraded": bool(degraded_stages),
+                "degraded_stages": degraded_stages,
+                "latency": {
+                    "budget_seconds": deadline.budget_seconds if deadline else None,
+                    "elapsed_seconds": round(deadline.elapsed(), 3) if deadline else None
+                }
             }
             
         except Exception as e:
@@ -352,6 +383,86 @@ class FinancialOrchestrator:
             traceback.print_exc()
             raise e
     
+    @staticmethod
+    def format_match_result(match_result) -> Dict[str, Any]:
+        """Serialize a MatchResult into the API response shape."""
+        return {
+            "score": match_result.match_score,
+            "score_label": match_result.score_label,
+            "score_grade": match_result.score_grade,
+            "score_emoji": match_result.score_emoji,
+            "score_color": match_result.score_color,
+            "recommendation": match_result.recommendation,
+            "action_if_owned": match_result.action_if_owned,
+            "action_if_not_owned": match_result.action_if_not_owned,
+            "fit_reasons": match_result.fit_reasons,
+            "concern_reasons": match_result.concern_reasons,
+            "summary": match_result.summary,
+            "breakdown": {
+                "fundamental": match_result.breakdown.fundamental_score,
+                "macro": match_result.breakdown.macro_score,
+                "philosophy": match_result.breakdown.philosophy_score,
+                "risk": match_result.breakdown.risk_score,
+                "dna_match": match_result.breakdown.dna_match_score
+            }
+        }
+
+    @staticmethod
+    def _flag_fallbacks(result: Any, fallbacks: List[str]) -> Any:
+        """Mark a stage result degraded if any of its LLM calls fell back."""
+        if fallbacks and isinstance(result, dict):
+            result["degraded"] = True
+            result["degraded_reason"] = fallbacks[0]
+        return result
+
+    def _run_degraded(self, agent, agent_name: str, context: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Re-run an agent under an already-expired deadline so it skips every
+        LLM provider and answers from its rule-based fallback.
+        """
+        try:
+            with deadline_scope(Deadline(0)), trace_span(f"agent.{agent_name}.degraded"):
+                result = agent.run(context)
+        except Exception as e:
+            logger.error(f"[ERROR] Degraded {agent_name.upper()} fallback failed: {e}")
+            result = {
+                "error": str(e),
+                "analysis": f"Analysis failed: {str(e)}",
+                "score": 50,
+                "confidence": 0
+            }
+        result["degraded"] = True
+        result["degraded_reason"] = "deadline_exceeded"
+        return result
+
+    def _run_coach(self, coach_context: List[Dict[str, Any]], deadline: Optional[Deadline]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run Coach synthesis within the remaining budget.
+        Returns (coach_result, degraded).
+        """
+        if deadline is None:
+            with degradation_scope() as fallbacks, trace_span("agent.coach"):
+                result = self._flag_fallbacks(coach_agent.run(coach_context), fallbacks)
+            return result, bool(result.get("degraded"))
+        
+        if not deadline.expired():
+            def run_coach():
+                with deadline_scope(deadline), degradation_scope() as fallbacks, trace_span("agent.coach"):
+                    return self._flag_fallbacks(coach_agent.run(coach_context), fallbacks)
+            
+            executor = ThreadPoolExecutor(max_workers=1)
+            try:
+                future = executor.submit(propagate_context(run_coach))
+                done, _ = wait([future], timeout=deadline.remaining())
+                if done:
+                    result = future.result()
+                    return result, bool(result.get("degraded"))
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+        
+        logger.warning("[DEADLINE] Coach missed its deadline, degrading to heuristic synthesis")
+        return self._run_degraded(coach_agent, "coach", coach_context), True
+
     def _reconstruct_asset_data(self, context: list) -> Dict[str, Any]:
         """Reconstruct asset data from RAG context."""
         import ast
@@ -1,5 +1,6 @@
 """Routers package."""
 from app.routers.profile import router as profile_router
 from app.routers.history import router as history_router
+from app.routers.alerts import router as alerts_router
 
-__all__ = ["profile_router", "history_router"]
+__all__ = ["profile_router", "history_router", "alerts_router"]
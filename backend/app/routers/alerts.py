@@ -0,0 +1,128 @@
+"""
+Watchlist and price alert router.
+"""
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from pydantic import BaseModel
+
+from app.database import get_db
+from app.auth.auth import get_current_user_id
+from app.services.alert_service import alert_service
+
+router = APIRouter(prefix="/api/v1/alerts", tags=["alerts"])
+
+
+def _user_id_int(user_id: str) -> int:
+    try:
+        return int(user_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid user ID")
+
+
+class WatchlistUpdate(BaseModel):
+    symbols: List[str]
+
+
+class AlertRuleCreate(BaseModel):
+    symbol: str
+    kind: str  # price_above/below, change_above/below, rsi_above/below, high_52w, low_52w
+    threshold: Optional[float] = None
+    window: int = 1  # bars, for change_* rules
+
+
+class MarkReadRequest(BaseModel):
+    ids: Optional[List[int]] = None  # None marks everything read
+
+
+# ============== Notifications ==============
+
+@router.get("")
+def get_alerts(
+    unread_only: bool = False,
+    limit: int = 50,
+    user_id: str = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Get the user's alert notifications, newest first."""
+    return {"alerts": alert_service.get_events(db, _user_id_int(user_id), unread_only, limit)}
+
+
+@router.post("/read")
+def mark_alerts_read(
+    request: MarkReadRequest,
+    user_id: str = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Mark notifications read."""
+    return {"updated": alert_service.mark_read(db, _user_id_int(user_id), request.ids)}
+
+
+# ============== Watchlist ==============
+
+@router.get("/watchlist")
+def get_watchlist(user_id: str = Depends(get_current_user_id), db: Session = Depends(get_db)):
+    """Get the user's watchlist (built-in move alerts apply to every symbol)."""
+    return {"symbols": alert_service.get_watchlist(db, _user_id_int(user_id))}
+
+
+@router.post("/watchlist")
+def add_to_watchlist(
+    update: WatchlistUpdate,
+    user_id: str = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Add symbols to the user's watchlist."""
+    return {"added": alert_service.add_to_watchlist(db, _user_id_int(user_id), update.symbols)}
+
+
+@router.delete("/watchlist/{symbol}")
+def remove_from_watchlist(symbol: str, user_id: str = Depends(get_current_user_id), db: Session = Depends(get_db)):
+    """Remove a symbol from the user's watchlist."""
+    if not alert_service.remove_from_watchlist(db, _user_id_int(user_id), symbol):
+        raise HTTPException(status_code=404, detail="Symbol not on watchlist")
+    return {"status": "deleted"}
+
+
+# ============== Rules ==============
+
+@router.get("/rules")
+def get_rules(user_id: str = Depends(get_current_user_id), db: Session = Depends(get_db)):
+    """Get the user's alert rules."""
+    return {"rules": alert_service.list_rules(db, _user_id_int(user_id))}
+
+
+@router.post("/rules")
+def create_rule(
+    rule: AlertRuleCreate,
+    user_id: str = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Create an alert rule."""
+    try:
+        return alert_service.add_rule(db, _user_id_int(user_id), rule.symbol, rule.kind, rule.threshold, rule.window)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/rules/{rule_id}")
+def delete_rule(rule_id: int, user_id: str = Depends(get_current_user_id), db: Session = Depends(get_db)):
+    """Delete an alert rule."""
+    if not alert_service.delete_rule(db, _user_id_int(user_id), rule_id):
+        raise HTTPException(status_code=404, detail="Rule not found")
+    return {"status": "deleted"}
+
+
+# ============== Engine ==============
+
+@router.get("/engine")
+def get_alert_engine_status():
+    """Get the alert engine status and last evaluation cycle."""
+    return alert_service.get_status()
+
+
+@router.post("/engine/run")
+def run_alert_engine(background_tasks: BackgroundTasks):
+    """Run an evaluation cycle in the background."""
+    background_tasks.add_task(alert_service.run_cycle)
+    return {"status": "scheduled"}
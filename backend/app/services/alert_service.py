@@ -0,0 +1,355 @@
+"""
+Alert Service - Watchlist price alerts.
+Built-in rules (Scout's price_alert moves: +/-5% over 5 days, +/-3% in a
+day) apply to every watchlist symbol, and users add their own price, move,
+RSI and 52-week rules. Each cycle bulk-refreshes the price store, lines up
+the last year of closes for every watched symbol in one matrix and
+evaluates all rules in a single vectorised pass. Alerts are edge-triggered
+(fire when a condition becomes true, re-arm once it clears) and
+de-duplicated per user, symbol, rule and bar; rule state and notifications
+are kept in the database.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.tracing import trace_span
+from app.database import SessionLocal
+from app.models.db_models import AlertEvent, AlertRule, WatchlistItem
+from app.services import indicators
+from app.services.price_store import price_store
+
+logger = get_logger("alerts")
+
+ABOVE_KINDS = ("price_above", "change_above", "rsi_above")
+BELOW_KINDS = ("price_below", "change_below", "rsi_below")
+RANGE_KINDS = ("high_52w", "low_52w")
+RULE_KINDS = ABOVE_KINDS + BELOW_KINDS + RANGE_KINDS
+
+# Built-in rules (kind, threshold %, window in bars), as in Scout's price_alert
+BUILTIN_RULES = (
+    ("change_below", -5.0, 5),
+    ("change_above", 5.0, 5),
+    ("change_below", -3.0, 1),
+    ("change_above", 3.0, 1),
+)
+
+# Bars per symbol in the evaluation matrix (52 weeks plus the latest bar)
+LOOKBACK_BARS = indicators.TRADING_DAYS + 1
+
+
+def rule_key(kind: str, threshold: Optional[float], window: int = 1) -> str:
+    """Identity of a rule's condition; equal keys are the same alert."""
+    if kind in RANGE_KINDS:
+        return kind
+    if kind.startswith("change_"):
+        return f"{kind}:{threshold:g}:{window}"
+    return f"{kind}:{threshold:g}"
+
+
+def describe(symbol: str, kind: str, threshold: Optional[float], window: int, value: float) -> str:
+    if kind == "price_above":
+        return f"{symbol} rose above {threshold:g} (now {value:.2f})"
+    if kind == "price_below":
+        return f"{symbol} fell below {threshold:g} (now {value:.2f})"
+    if kind.startswith("change_"):
+        span = "today" if window == 1 else f"in the last {window} days"
+        return f"{symbol} {'surged' if value >= 0 else 'dropped'} {abs(value):.1f}% {span}"
+    if kind.startswith("rsi_"):
+        return f"{symbol} RSI(14) at {value:.1f} ({'above' if kind == 'rsi_above' else 'below'} {threshold:g})"
+    return f"{symbol} made a new 52-week {'high' if kind == 'high_52w' else 'low'} at {value:.2f}"
+
+
+def close_matrix(symbols: Sequence[str]) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """
+    Last LOOKBACK_BARS closes per symbol from the local price store as a
+    (symbols x bars) matrix NaN-padded on the left, plus each row's latest
+    bar date (None if the store has nothing).
+    """
+    matrix = np.full((len(symbols), LOOKBACK_BARS), np.nan)
+    bar_dates: List[Optional[str]] = []
+    for i, symbol in enumerate(symbols):
+        bars = price_store.get_bars(symbol, sync=False)[-LOOKBACK_BARS:]
+        if len(bars):
+            matrix[i, -len(bars):] = bars["close"]
+        bar_dates.append(str(bars["date"][-1]) if len(bars) else None)
+    return matrix, bar_dates
+
+
+def evaluate(
+    matrix: np.ndarray,
+    rows: Sequence[int],
+    kinds: Sequence[str],
+    thresholds: Sequence[Optional[float]],
+    windows: Sequence[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate every rule against a close matrix at once; rule i reads row
+    rows[i]. Returns (condition met, observed value) arrays, one per rule.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    kinds = np.asarray(kinds, dtype=str)
+    thresholds = np.array([np.nan if t is None else t for t in thresholds], dtype=np.float64)
+    windows = np.clip(np.asarray(windows, dtype=np.int64), 1, matrix.shape[1] - 1)
+
+    last = matrix[:, -1]
+    prior_high = np.fmax.reduce(matrix[:, :-1], axis=1)
+    prior_low = np.fmin.reduce(matrix[:, :-1], axis=1)
+    rsi = indicators.rsi_latest(matrix)
+
+    price = last[rows]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (price / matrix[rows, matrix.shape[1] - 1 - windows] - 1.0) * 100
+        value = np.where(
+            np.char.startswith(kinds, "change_"), change,
+            np.where(np.char.startswith(kinds, "rsi_"), rsi[rows], price)
+        )
+        met = np.where(
+            np.isin(kinds, ABOVE_KINDS), value >= thresholds,
+            np.where(np.isin(kinds, BELOW_KINDS), value <= thresholds, False)
+        )
+        met |= (kinds == "high_52w") & (price > prior_high[rows])
+        met |= (kinds == "low_52w") & (price < prior_low[rows])
+    return met & np.isfinite(value), value
+
+
+class AlertService:
+    """
+    Watchlists, user rules and notifications (per request DB session), plus
+    the background evaluation loop (own sessions).
+    """
+
+    def __init__(self, interval_seconds: float, session_factory: Callable[[], Session] = SessionLocal,
+                 refresh_prices: bool = True):
+        self.interval_seconds = interval_seconds
+        self.session_factory = session_factory
+        self.refresh_prices = refresh_prices
+        self._cycle_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_cycle: Dict[str, Any] = {}
+
+    # ============== Watchlists ==============
+
+    def get_watchlist(self, db: Session, user_id: int) -> List[str]:
+        items = db.query(WatchlistItem).filter(WatchlistItem.user_id == user_id)\
+            .order_by(WatchlistItem.created_at).all()
+        return [item.symbol for item in items]
+
+    def add_to_watchlist(self, db: Session, user_id: int, symbols: List[str]) -> List[str]:
+        """Add symbols (upper-cased); returns the ones not already watched."""
+        existing = set(self.get_watchlist(db, user_id))
+        added = []
+        for symbol in dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()):
+            if symbol not in existing:
+                db.add(WatchlistItem(user_id=user_id, symbol=symbol, alert_state={}))
+                added.append(symbol)
+        db.commit()
+        return added
+
+    def remove_from_watchlist(self, db: Session, user_id: int, symbol: str) -> bool:
+        removed = db.query(WatchlistItem)\
+            .filter(WatchlistItem.user_id == user_id, WatchlistItem.symbol == symbol.upper())\
+            .delete()
+        db.commit()
+        return bool(removed)
+
+    # ============== Rules ==============
+
+    @staticmethod
+    def _rule_view(rule: AlertRule) -> Dict[str, Any]:
+        return {
+            "id": rule.id,
+            "symbol": rule.symbol,
+            "kind": rule.kind,
+            "threshold": rule.threshold,
+            "window": rule.window,
+            "enabled": rule.enabled,
+            "triggered": rule.triggered,
+            "last_triggered_at": rule.last_triggered_at.isoformat() if rule.last_triggered_at else None,
+        }
+
+    def list_rules(self, db: Session, user_id: int) -> List[Dict[str, Any]]:
+        rules = db.query(AlertRule).filter(AlertRule.user_id == user_id).order_by(AlertRule.id).all()
+        return [self._rule_view(rule) for rule in rules]
+
+    def add_rule(self, db: Session, user_id: int, symbol: str, kind: str,
+                 threshold: Optional[float] = None, window: int = 1) -> Dict[str, Any]:
+        """Create a rule; raises ValueError for unknown kinds or a missing threshold."""
+        if kind not in RULE_KINDS:
+            raise ValueError(f"Unknown alert kind '{kind}'. Use one of: {', '.join(RULE_KINDS)}")
+        if kind not in RANGE_KINDS and threshold is None:
+            raise ValueError(f"Alert kind '{kind}' needs a threshold")
+        if not 1 <= window < LOOKBACK_BARS:
+            raise ValueError(f"Window must be between 1 and {LOOKBACK_BARS - 1} bars")
+        rule = AlertRule(
+            user_id=user_id,
+            symbol=symbol.strip().upper(),
+            kind=kind,
+            threshold=None if kind in RANGE_KINDS else threshold,
+            window=window,
+            enabled=True,
+            triggered=False,
+        )
+        db.add(rule)
+        db.commit()
+        db.refresh(rule)
+        return self._rule_view(rule)
+
+    def delete_rule(self, db: Session, user_id: int, rule_id: int) -> bool:
+        removed = db.query(AlertRule).filter(AlertRule.id == rule_id, AlertRule.user_id == user_id).delete()
+        db.commit()
+        return bool(removed)
+
+    # ============== Notifications ==============
+
+    def get_events(self, db: Session, user_id: int, unread_only: bool = False, limit: int = 50) -> List[Dict[str, Any]]:
+        query = db.query(AlertEvent).filter(AlertEvent.user_id == user_id)
+        if unread_only:
+            query = query.filter(AlertEvent.read.is_(False))
+        events = query.order_by(AlertEvent.created_at.desc(), AlertEvent.id.desc()).limit(limit).all()
+        return [
+            {
+                "id": event.id,
+                "symbol": event.symbol,
+                "rule_id": event.rule_id,
+                "rule": event.rule_key,
+                "message": event.message,
+                "value": event.value,
+                "bar_date": event.bar_date,
+                "read": event.read,
+                "created_at": event.created_at.isoformat(),
+            }
+            for event in events
+        ]
+
+    def mark_read(self, db: Session, user_id: int, event_ids: Optional[List[int]] = None) -> int:
+        """Mark the given (or all) notifications read. Returns the number updated."""
+        query = db.query(AlertEvent).filter(AlertEvent.user_id == user_id, AlertEvent.read.is_(False))
+        if event_ids is not None:
+            query = query.filter(AlertEvent.id.in_(event_ids))
+        updated = query.update({AlertEvent.read: True}, synchronize_session=False)
+        db.commit()
+        return updated
+
+    # ============== Evaluation ==============
+
+    def run_cycle(self) -> Dict[str, Any]:
+        """
+        Refresh prices for every watched symbol, evaluate all rules in one
+        pass and record new notifications. Returns a cycle summary.
+        """
+        with self._cycle_lock:
+            start = time.time()
+            db = self.session_factory()
+            try:
+                summary = self._evaluate_all(db)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Alert cycle failed: {e}")
+                summary = {"error": str(e)}
+            finally:
+                db.close()
+            self._last_cycle = {"at": time.time(), **summary, "duration_ms": round((time.time() - start) * 1000, 1)}
+            return self._last_cycle
+
+    def _evaluate_all(self, db: Session) -> Dict[str, Any]:
+        items = db.query(WatchlistItem).all()
+        rules = db.query(AlertRule).filter(AlertRule.enabled.is_(True)).all()
+        symbols = list(dict.fromkeys([item.symbol for item in items] + [rule.symbol for rule in rules]))
+        if not symbols:
+            return {"symbols": 0, "rules": 0, "fired": 0}
+
+        if self.refresh_prices:
+            price_store.sync_many(symbols)
+        with trace_span("alerts.evaluate", symbols=len(symbols)):
+            matrix, bar_dates = close_matrix(symbols)
+            row_of = {symbol: i for i, symbol in enumerate(symbols)}
+            # (user rule or None, watchlist item or None, kind, threshold, window)
+            specs = [(rule, None, rule.kind, rule.threshold, rule.window or 1) for rule in rules]
+            specs += [(None, item, kind, threshold, window) for item in items for kind, threshold, window in BUILTIN_RULES]
+            owners = [rule or item for rule, item, *_ in specs]
+            met, values = evaluate(
+                matrix,
+                [row_of[owner.symbol] for owner in owners],
+                [spec[2] for spec in specs],
+                [spec[3] for spec in specs],
+                [spec[4] for spec in specs],
+            )
+
+        seen = {
+            (event.user_id, event.symbol, event.rule_key, event.bar_date)
+            for event in db.query(AlertEvent).filter(AlertEvent.bar_date.in_({d for d in bar_dates if d}))
+        }
+        now = datetime.utcnow()
+        states = {item.id: dict(item.alert_state or {}) for item in items}
+        fired = 0
+        for (rule, item, kind, threshold, window), owner, is_met, value in zip(specs, owners, met.tolist(), values.tolist()):
+            bar_date = bar_dates[row_of[owner.symbol]]
+            if bar_date is None:
+                continue  # No prices yet; keep the previous state
+            key = rule_key(kind, threshold, window)
+            was_met = rule.triggered if rule else states[item.id].get(key, False)
+            dedupe_key = (owner.user_id, owner.symbol, key, bar_date)
+            if is_met and not was_met and dedupe_key not in seen:
+                seen.add(dedupe_key)
+                db.add(AlertEvent(
+                    user_id=owner.user_id,
+                    rule_id=rule.id if rule else None,
+                    rule_key=key,
+                    symbol=owner.symbol,
+                    message=describe(owner.symbol, kind, threshold, window, value),
+                    value=round(value, 4),
+                    bar_date=bar_date,
+                    read=False,
+                    created_at=now,
+                ))
+                fired += 1
+                if rule:
+                    rule.last_triggered_at = now
+            if rule:
+                rule.triggered = is_met
+            else:
+                states[item.id][key] = is_met
+        for item in items:
+            item.alert_state = states[item.id]
+        db.commit()
+
+        if fired:
+            logger.info(f"Fired {fired} price alerts across {len(symbols)} symbols")
+        return {"symbols": len(symbols), "rules": len(specs), "fired": fired}
+
+    # ============== Background Evaluation ==============
+
+    def start(self):
+        """Evaluate alerts on an interval in the background (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="price-alerts", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            self.run_cycle()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "interval_seconds": self.interval_seconds,
+            "builtin_rules": [rule_key(*rule) for rule in BUILTIN_RULES],
+            "last_cycle": self._last_cycle,
+        }
+
+
+# Singleton instance
+alert_service = AlertService(interval_seconds=settings.ALERTS_INTERVAL_SECONDS)
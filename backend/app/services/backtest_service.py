@@ -11,6 +11,8 @@ from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field, asdict
 
 from app.services.score_labels import get_score_label
+from app.services import indicators
+from app.services.price_store import price_store
 from app.services.match_score_service import match_score_service
 from app.models.investor_dna import DEFAULT_INVESTOR_DNA, InvestorDNA
 from app.core.logging import get_logger
@@ -87,7 +89,7 @@ class BacktestService:
     def __init__(self):
         self._yahooquery_available = True
         try:
-            from yahooquery import Ticker
+            from app.core.providers import Ticker
         except ImportError:
             self._yahooquery_available = False
             logger.warning("yahooquery not installed — backtesting will not work")
@@ -175,7 +177,7 @@ class BacktestService:
         Analyze a stock using data available at a specific historical date.
         Uses rule-based analysis (no LLM) for speed and reproducibility.
         """
-        from yahooquery import Ticker as YQTicker
+        from app.core.providers import Ticker as YQTicker
         
         yq = YQTicker(ticker)
         
@@ -183,7 +185,10 @@ class BacktestService:
         hist_start = (analysis_date - timedelta(days=365)).strftime("%Y-%m-%d")
         hist_end = (analysis_date + timedelta(days=max(forward_days) + 10)).strftime("%Y-%m-%d")
         
-        history = yq.history(start=hist_start, end=hist_end)
+        # Local price store first; repeated test dates for a ticker reuse its bars
+        history = price_store.get_frame(ticker, hist_start, hist_end).reset_index()
+        if history.empty:
+            history = yq.history(start=hist_start, end=hist_end)
         
         if history is None or (hasattr(history, 'empty') and history.empty):
             logger.warning(f"No history data for {ticker}")
@@ -215,7 +220,7 @@ class BacktestService:
         technicals = self._calculate_technicals(pre_date_prices)
         
         # 4. Run heuristic agent analysis
-        agent_results = self._run_heuristic_agents(financials, technicals)
+        agent_results = self.run_heuristic_agents(financials, technicals)
         
         # 5. Calculate match score
         asset_data = {"financials": financials, "technicals": technicals}
@@ -333,41 +338,19 @@ class BacktestService:
     def _calculate_technicals(self, price_history) -> Dict:
         """Calculate basic technical indicators from price history."""
         try:
-            closes = price_history['close'].values
+            closes = indicators.as_array(price_history['close'].values)
             if len(closes) < 14:
                 return {}
             
-            # RSI (14-period)
-            deltas = [closes[i] - closes[i-1] for i in range(1, len(closes))]
-            gains = [d if d > 0 else 0 for d in deltas]
-            losses = [-d if d < 0 else 0 for d in deltas]
-            
-            avg_gain = sum(gains[-14:]) / 14
-            avg_loss = sum(losses[-14:]) / 14
-            
-            if avg_loss == 0:
-                rsi = 100
-            else:
-                rs = avg_gain / avg_loss
-                rsi = 100 - (100 / (1 + rs))
-            
-            # Simple moving averages
             current_price = float(closes[-1])
-            sma_20 = float(sum(closes[-20:])) / min(20, len(closes)) if len(closes) >= 20 else current_price
-            sma_50 = float(sum(closes[-50:])) / min(50, len(closes)) if len(closes) >= 50 else current_price
-            
-            # 52-week high/low
-            year_closes = closes[-252:] if len(closes) >= 252 else closes
-            high_52w = float(max(year_closes))
-            low_52w = float(min(year_closes))
-            pct_from_high = ((current_price - high_52w) / high_52w) * 100 if high_52w > 0 else 0
+            rsi = indicators.last(indicators.rsi(closes, 14))
+            sma_20 = indicators.last(indicators.sma(closes, 20)) or current_price
+            sma_50 = indicators.last(indicators.sma(closes, 50)) or current_price
+            range_info = indicators.range_52w(closes)
             
-            # Volatility (30-day std)
-            if len(closes) >= 30:
-                returns = [(closes[i] - closes[i-1]) / closes[i-1] for i in range(-30, 0) if closes[i-1] > 0]
-                volatility = (sum(r**2 for r in returns) / len(returns)) ** 0.5 if returns else 0.2
-            else:
-                volatility = 0.2
+            # Daily (not annualized) volatility over the last 30 returns -
+            # the heuristic thresholds are calibrated on this scale
+            volatility = indicators.volatility(closes, window=30, annualize=False) if len(closes) >= 31 else None
             
             # Trend signal
             if current_price > sma_20 > sma_50:
@@ -378,21 +361,21 @@ class BacktestService:
                 trend = "Neutral"
             
             return {
-                "rsi_14": round(rsi, 2),
+                "rsi_14": round(rsi, 2) if rsi is not None else 50.0,
                 "sma_20": round(sma_20, 2),
                 "sma_50": round(sma_50, 2),
                 "current_price": round(current_price, 2),
-                "52w_high": round(high_52w, 2),
-                "52w_low": round(low_52w, 2),
-                "pct_from_52w_high": round(pct_from_high, 2),
-                "volatility_raw": round(volatility, 4),
+                "52w_high": round(range_info["high"], 2),
+                "52w_low": round(range_info["low"], 2),
+                "pct_from_52w_high": round(range_info["pct_from_high"], 2),
+                "volatility_raw": round(volatility, 4) if volatility is not None else 0.2,
                 "trend_signal": trend,
             }
         except Exception as e:
             logger.error(f"Technical calculation error: {e}")
             return {}
     
-    def _run_heuristic_agents(self, financials: Dict, technicals: Dict) -> Dict[str, Any]:
+    def run_heuristic_agents(self, financials: Dict, technicals: Dict) -> Dict[str, Any]:
         """
         Run lightweight heuristic analysis for each agent role.
         No LLM calls — pure rule-based for speed and reproducibility.
@@ -1,25 +1,380 @@
+"""
+Tiered cache for expensive data fetches.
+An in-process LRU tier sits in front of a size-capped disk tier. Entries carry
+a real TTL; once expired they may still be served for a stale window while a
+single background refresh replaces them (stale-while-revalidate).
+"""
 import os
-import joblib
+import pickle
+import hashlib
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("cache")
 
 CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "cache")
 os.makedirs(CACHE_DIR, exist_ok=True)
 
-memory = joblib.Memory(CACHE_DIR, verbose=0)
+# Pickle at the highest protocol is the fastest stdlib codec for the nested
+# dict/list/float payloads Scout produces
+PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+class CacheEntry:
+    """A cached value with its freshness window."""
+
+    __slots__ = ("value", "created_at", "expires_at", "stale_until")
+
+    def __init__(self, value: Any, ttl: float, stale_ttl: float):
+        now = time.time()
+        self.value = value
+        self.created_at = now
+        self.expires_at = now + ttl
+        self.stale_until = self.expires_at + stale_ttl
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
 
-def cache_data(expire_seconds=3600):
+    def is_usable(self, now: float) -> bool:
+        """Fresh, or stale but still inside the revalidation window."""
+        return now < self.stale_until
+
+
+class TieredCache:
     """
-    Decorator to cache function results for a specific duration.
-    Note: joblib doesn't support expiration natively in a simple way, 
-    but for this MVP, persistent disk caching is sufficient to survive restarts
-    and prevent immediate re-fetches.
+    Memory LRU + disk cache with TTL, size caps and stale-while-revalidate.
+    Disk entries live at CACHE_DIR/<namespace>/<key>.pkl.
     """
+
+    def __init__(self, cache_dir: str, max_memory_entries: int, max_disk_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[tuple, CacheEntry]" = OrderedDict()  # (namespace, key) -> entry
+        self._lock = threading.RLock()
+        self._refreshing: set = set()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+        self._disk_bytes = self._scan_disk_bytes()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stale_served": 0,
+            "refreshes": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
+    # ============== Keys & Paths ==============
+
+    @staticmethod
+    def make_key(args: tuple, kwargs: dict) -> str:
+        raw = repr(args) + repr(sorted(kwargs.items()))
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _path(self, namespace: str, key: str) -> str:
+        return os.path.join(self.cache_dir, namespace, f"{key}.pkl")
+
+    # ============== Core API ==============
+
+    def get(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        """Look up a usable entry (memory first, then disk)."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get((namespace, key))
+            if entry is not None:
+                if entry.is_usable(now):
+                    self._memory.move_to_end((namespace, key))
+                    self._stats["memory_hits"] += 1
+                    return entry
+                del self._memory[(namespace, key)]
+
+        entry = self._read_disk(namespace, key)
+        if entry is not None and entry.is_usable(now):
+            with self._lock:
+                self._stats["disk_hits"] += 1
+                self._put_memory(namespace, key, entry)
+            return entry
+        if entry is not None:
+            self._delete_disk(namespace, key)
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float, stale_ttl: float = 0):
+        entry = CacheEntry(value, ttl, stale_ttl)
+        with self._lock:
+            self._put_memory(namespace, key, entry)
+        self._write_disk(namespace, key, entry)
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: float,
+        stale_ttl: float,
+        cache_if: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Cached value, computing (and storing) it on a miss. Values rejected by
+        cache_if are returned but not stored, so the next call recomputes.
+        """
+        entry = self.get(namespace, key)
+        if entry is not None:
+            if not entry.is_fresh(time.time()):
+                with self._lock:
+                    self._stats["stale_served"] += 1
+                self._schedule_refresh(namespace, key, compute, ttl, stale_ttl, cache_if)
+            return entry.value
+
+        value = compute()
+        if cache_if is None or cache_if(value):
+            self.set(namespace, key, value, ttl, stale_ttl)
+        return value
+
+    def _schedule_refresh(
+        self,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: float,
+        stale_ttl: float,
+        cache_if: Optional[Callable[[Any], bool]] = None
+    ):
+        """
+        Refresh a stale entry in the background (at most one refresh per key).
+        A value rejected by cache_if leaves the stale entry to run out.
+        """
+        with self._lock:
+            if (namespace, key) in self._refreshing:
+                return
+            self._refreshing.add((namespace, key))
+            self._stats["refreshes"] += 1
+
+        def refresh():
+            try:
+                value = compute()
+                if cache_if is None or cache_if(value):
+                    self.set(namespace, key, value, ttl, stale_ttl)
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {namespace}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard((namespace, key))
+
+        self._refresh_executor.submit(refresh)
+
+    # ============== Memory Tier ==============
+
+    def _put_memory(self, namespace: str, key: str, entry: CacheEntry):
+        """Insert into the LRU (caller holds the lock)."""
+        self._memory[(namespace, key)] = entry
+        self._memory.move_to_end((namespace, key))
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    # ============== Disk Tier ==============
+
+    def _read_disk(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        path = self._path(namespace, key)
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache file {path}: {e}")
+            self._delete_disk(namespace, key)
+            return None
+
+    def _write_disk(self, namespace: str, key: str, entry: CacheEntry):
+        path = self._path(namespace, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            payload = pickle.dumps(entry, protocol=PICKLE_PROTOCOL)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)  # Atomic, so readers never see partial files
+            with self._lock:
+                self._disk_bytes += len(payload) - previous
+                over_cap = self._disk_bytes > self.max_disk_bytes
+            if over_cap:
+                self._evict_disk()
+        except Exception as e:
+            logger.warning(f"Cache disk write failed for {namespace}: {e}")
+
+    def _delete_disk(self, namespace: str, key: str) -> bool:
+        path = self._path(namespace, key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return False
+        with self._lock:
+            self._disk_bytes -= size
+        return True
+
+    def _disk_files(self, namespace: Optional[str] = None):
+        """Yield (path, size, mtime) for every cache file (of one namespace, if given)."""
+        top = self.cache_dir if namespace is None else os.path.join(self.cache_dir, namespace)
+        for root, _, files in os.walk(top):
+            for name in files:
+                if name.endswith(".pkl"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(size for _, size, _ in self._disk_files())
+
+    def _evict_disk(self):
+        """Delete least-recently-written files until under 90% of the cap."""
+        target = int(self.max_disk_bytes * 0.9)
+        files = sorted(self._disk_files(), key=lambda f: f[2])
+        total = sum(size for _, size, _ in files)
+        evicted = 0
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except OSError:
+                continue
+        with self._lock:
+            self._disk_bytes = total
+            self._stats["disk_evictions"] += evicted
+
+    # ============== Stats & Invalidation ==============
+
+    def invalidate(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        """
+        Drop one entry (namespace + key), a whole namespace, or everything.
+        Returns the number of entries removed across both tiers.
+        """
+        if namespace is not None and key is not None:
+            # Single entry: both tiers are addressed directly by its key
+            with self._lock:
+                removed = int(self._memory.pop((namespace, key), None) is not None)
+            return removed + int(self._delete_disk(namespace, key))
+
+        removed = 0
+        with self._lock:
+            for mem_key in list(self._memory):
+                if (namespace is None or mem_key[0] == namespace) and (key is None or mem_key[1] == key):
+                    del self._memory[mem_key]
+                    removed += 1
+
+        for path, size, _ in list(self._disk_files(namespace)):
+            if key is None or os.path.basename(path)[:-len(".pkl")] == key:
+                try:
+                    os.remove(path)
+                    removed += 1
+                    with self._lock:
+                        self._disk_bytes -= size
+                except OSError:
+                    continue
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            namespaces: Dict[str, int] = {}
+            for namespace, _ in self._memory:
+                namespaces[namespace] = namespaces.get(namespace, 0) + 1
+            return {
+                **self._stats,
+                "hit_rate": round(hits / lookups, 3) if lookups else None,
+                "memory_entries": len(self._memory),
+                "memory_max_entries": self.max_memory_entries,
+                "memory_namespaces": namespaces,
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.max_disk_bytes,
+                "refreshing": len(self._refreshing),
+            }
+
+
+tiered_cache = TieredCache(
+    CACHE_DIR,
+    max_memory_entries=settings.CACHE_MEMORY_MAX_ENTRIES,
+    max_disk_bytes=settings.CACHE_DISK_MAX_MB * 1024 * 1024
+)
+
+
+def cache_data(
+    expire_seconds=3600,
+    stale_seconds: Optional[float] = None,
+    cache_if: Optional[Callable[[Any], bool]] = None
+):
+    """
+    Decorator to cache function results for expire_seconds.
+    Results for which cache_if returns False (e.g. fallback placeholders) are
+    returned but never stored, by calls, refreshes or prime().
+    After expiry the old value is served for up to stale_seconds (default:
+    another expire_seconds) while a background refresh runs; past that the
+    call blocks and recomputes. The wrapper exposes invalidate(*args, **kwargs)
+    and cache_key(*args, **kwargs) for targeted eviction, plus peek(*args)
+    (fresh value or None) and prime(value, *args) so batch fetchers can read
+    and fill the same entries, and ttl_remaining(*args) (seconds until expiry,
+    negative once stale, None if absent) for refresh-ahead schedulers.
+    Hits return the cached object itself, so callers must deep-copy before
+    mutating it.
+    """
+    stale_ttl = expire_seconds if stale_seconds is None else stale_seconds
+
     def decorator(func):
-        cached_func = memory.cache(func)
-        return cached_func
+        namespace = func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = TieredCache.make_key(args, kwargs)
+            return tiered_cache.get_or_compute(
+                namespace, key, lambda: func(*args, **kwargs), expire_seconds, stale_ttl, cache_if
+            )
+
+        def invalidate(*args, **kwargs) -> int:
+            return tiered_cache.invalidate(namespace, TieredCache.make_key(args, kwargs))
+
+        def peek(*args, **kwargs) -> Any:
+            entry = tiered_cache.get(namespace, TieredCache.make_key(args, kwargs))
+            return entry.value if entry is not None and entry.is_fresh(time.time()) else None
+
+        def prime(value: Any, *args, **kwargs):
+            if cache_if is not None and not cache_if(value):
+                return
+            tiered_cache.set(namespace, TieredCache.make_key(args, kwargs), value, expire_seconds, stale_ttl)
+
+        def ttl_remaining(*args, **kwargs) -> Optional[float]:
+            entry = tiered_cache.get(namespace, TieredCache.make_key(args, kwargs))
+            return entry.expires_at - time.time() if entry is not None else None
+
+        wrapper.cache_namespace = namespace
+        wrapper.cache_key = lambda *args, **kwargs: TieredCache.make_key(args, kwargs)
+        wrapper.invalidate = invalidate
+        wrapper.peek = peek
+        wrapper.prime = prime
+        wrapper.ttl_remaining = ttl_remaining
+        return wrapper
     return decorator
 
+
 def clear_cache():
-    memory.clear()
+    tiered_cache.invalidate()
     print("Cache cleared.")
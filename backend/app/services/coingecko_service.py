@@ -1,10 +1,50 @@
 """
 CoinGecko Service for Cryptocurrency Data
 Fetches real-time crypto data without API key (free tier).
+Quotes for many coins come from one /coins/markets call; quotes, coin
+metadata and price history are cached with their own TTLs, history is kept
+as NumPy arrays, and every request passes a token-bucket rate governor to
+stay under the free-tier limit.
 """
+import threading
+import time
 import requests
+import numpy as np
+from app.core.config import settings
+from app.core.providers import http_get
 from typing import Dict, Any, Optional, List
-from datetime import datetime
+from app.services import indicators
+from app.services.cache_service import tiered_cache
+
+
+class TokenBucket:
+    """
+    Token-bucket rate governor: `rate` tokens per second, up to `capacity`
+    banked for bursts. acquire() blocks until a token is free.
+    """
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take one token, waiting up to `timeout` seconds (None waits forever)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
 
 
 class CoinGeckoService:
@@ -33,11 +73,20 @@ class CoinGeckoService:
         "XLM": "stellar"
     }
     
-    def __init__(self):
+    # Cache TTLs: quotes move constantly, history is daily, metadata barely changes
+    MARKETS_TTL_SECONDS = 60
+    HISTORY_TTL_SECONDS = 3600
+    METADATA_TTL_SECONDS = 7 * 24 * 3600
+    
+    # Longest a call waits for a rate-limit token before giving up
+    RATE_LIMIT_WAIT_SECONDS = 10
+    
+    def __init__(self, rate_per_minute: float, burst: int):
         self.session = requests.Session()
         self.session.headers.update({
             "Accept": "application/json"
         })
+        self.governor = TokenBucket(rate_per_minute / 60.0, burst)
     
     def get_crypto_data(self, symbol: str) -> Dict[str, Any]:
         """
@@ -51,69 +100,76 @@ class CoinGeckoService:
         """
         # Normalize symbol
         clean_symbol = self._normalize_symbol(symbol)
-        coin_id = self.SYMBOL_MAP.get(clean_symbol.upper())
-        
-        if not coin_id:
-            # Try direct lookup by ID
-            coin_id = clean_symbol.lower()
+        coin_id = self.coin_id(symbol)
         
         try:
-            # Get current data
-            coin_data = self._get_coin_data(coin_id)
-            
-            if "error" in coin_data:
-                return coin_data
+            # Get current data (bulk markets endpoint; cached per coin)
+            market = self.get_markets([coin_id]).get(coin_id)
+            if market is None:
+                return {"error": f"Coin '{coin_id}' not found"}
+            if "error" in market:
+                return market
+            metadata = self._get_coin_metadata(coin_id)
             
             # Get price history for technicals
-            history = self._get_price_history(coin_id, days=365)
+            series = self._get_price_history(coin_id, days=365)
+            closes = series["prices"]
             
             return {
                 "source": "CoinGecko (Live)",
                 "asset_type": "cryptocurrency",
                 "symbol": clean_symbol.upper(),
                 "coin_id": coin_id,
-                "current_price": coin_data.get("current_price_usd"),
+                "current_price": market.get("current_price"),
                 "currency": "USD",
                 
                 # Market Data
-                "market_cap": self._format_large_number(coin_data.get("market_cap")),
-                "market_cap_raw": coin_data.get("market_cap"),
-                "total_volume_24h": self._format_large_number(coin_data.get("total_volume")),
-                "circulating_supply": coin_data.get("circulating_supply"),
-                "max_supply": coin_data.get("max_supply"),
+                "market_cap": self._format_large_number(market.get("market_cap")),
+                "market_cap_raw": market.get("market_cap"),
+                "total_volume_24h": self._format_large_number(market.get("total_volume")),
+                "circulating_supply": market.get("circulating_supply"),
+                "max_supply": market.get("max_supply"),
                 
                 # Price Changes
-                "price_change_24h": coin_data.get("price_change_24h"),
-                "price_change_percentage_24h": coin_data.get("price_change_percentage_24h"),
-                "price_change_percentage_7d": coin_data.get("price_change_percentage_7d"),
-                "price_change_percentage_30d": coin_data.get("price_change_percentage_30d"),
+                "price_change_24h": market.get("price_change_24h"),
+                "price_change_percentage_24h": market.get("price_change_percentage_24h"),
+                "price_change_percentage_7d": market.get("price_change_percentage_7d_in_currency"),
+                "price_change_percentage_30d": market.get("price_change_percentage_30d_in_currency"),
                 
                 # 52W / ATH
-                "52_week_high": coin_data.get("ath"),
-                "52_week_low": coin_data.get("atl"),
-                "ath": coin_data.get("ath"),
-                "ath_date": coin_data.get("ath_date"),
-                "atl": coin_data.get("atl"),
-                "atl_date": coin_data.get("atl_date"),
+                "52_week_high": market.get("ath"),
+                "52_week_low": market.get("atl"),
+                "ath": market.get("ath"),
+                "ath_date": market.get("ath_date"),
+                "atl": market.get("atl"),
+                "atl_date": market.get("atl_date"),
                 
                 # Rank
-                "market_cap_rank": coin_data.get("market_cap_rank"),
+                "market_cap_rank": market.get("market_cap_rank"),
                 
                 # Sector/Category
                 "sector": "Cryptocurrency",
-                "industry": coin_data.get("category", "Digital Asset"),
-                "company_name": coin_data.get("name", clean_symbol.upper()),
+                "industry": metadata.get("category", "Digital Asset"),
+                "company_name": market.get("name") or metadata.get("name") or clean_symbol.upper(),
                 
                 # Summary
-                "summary": coin_data.get("description", "Cryptocurrency asset")[:500] + "...",
+                "summary": (metadata.get("description") or "Cryptocurrency asset")[:500] + "...",
                 
                 # Historical data for charts
-                "price_history": history
+                "price_history": self._history_records(series),
+                
+                # Technical indicators over the daily closes
+                "indicators": indicators.compute_indicators(closes) if len(closes) else {}
             }
             
         except Exception as e:
             return {"error": str(e), "source": "CoinGecko"}
     
+    def coin_id(self, symbol: str) -> str:
+        """CoinGecko ID for a symbol (known symbols mapped, otherwise used as an ID)."""
+        clean_symbol = self._normalize_symbol(symbol)
+        return self.SYMBOL_MAP.get(clean_symbol.upper(), clean_symbol.lower())
+    
     def _normalize_symbol(self, symbol: str) -> str:
         """Normalize crypto symbol input."""
         # Handle various formats: BTC, BTC-USD, CRYPTO:BTC, bitcoin
@@ -126,91 +182,130 @@ class CoinGeckoService:
             symbol = symbol.replace("-INR", "")
         return symbol
     
-    def _get_coin_data(self, coin_id: str) -> Dict[str, Any]:
-        """Fetch current coin data."""
+    # ============== Bulk Quotes ==============
+    
+    def get_markets(self, coin_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Market data for many coins. Fresh cached quotes are reused and all
+        others come from one /coins/markets call. Unknown coins are absent
+        from the result; if the call fails, stale quotes are served (or an
+        error entry when there is none).
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        stale: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        now = time.time()
+        for coin_id in dict.fromkeys(coin_ids):
+            entry = tiered_cache.get("coingecko.markets", coin_id)
+            if entry is not None and entry.is_fresh(now):
+                results[coin_id] = entry.value
+            else:
+                if entry is not None:
+                    stale[coin_id] = entry.value
+                missing.append(coin_id)
+        
+        if not missing:
+            return results
+        
+        try:
+            response = self._get(f"{self.BASE_URL}/coins/markets", {
+                "vs_currency": "usd",
+                "ids": ",".join(missing),
+                "price_change_percentage": "24h,7d,30d",
+                "per_page": 250,
+            }, timeout=10)
+            response.raise_for_status()
+            for market in response.json():
+                tiered_cache.set("coingecko.markets", market["id"], market,
+                                 ttl=self.MARKETS_TTL_SECONDS, stale_ttl=self.HISTORY_TTL_SECONDS)
+                results[market["id"]] = market
+        except Exception as e:
+            print(f"[CoinGecko] Markets request failed: {e}")
+            for coin_id in missing:
+                results[coin_id] = stale.get(coin_id) or {"error": f"API request failed: {e}"}
+        
+        return results
+    
+    # ============== Cached Metadata & History ==============
+    
+    def _get_coin_metadata(self, coin_id: str) -> Dict[str, Any]:
+        """Name, category and description (market data excluded); cached for a week."""
+        entry = tiered_cache.get("coingecko.meta", coin_id)
+        if entry is not None:
+            return entry.value
         try:
-            # Simple price endpoint for speed
-            url = f"{self.BASE_URL}/coins/{coin_id}"
-            params = {
+            response = self._get(f"{self.BASE_URL}/coins/{coin_id}", {
                 "localization": "false",
                 "tickers": "false",
-                "market_data": "true",
+                "market_data": "false",
                 "community_data": "false",
                 "developer_data": "false"
-            }
-            
-            response = self.session.get(url, params=params, timeout=10)
-            
-            if response.status_code == 404:
-                return {"error": f"Coin '{coin_id}' not found"}
-            
+            }, timeout=10)
             response.raise_for_status()
             data = response.json()
-            
-            market_data = data.get("market_data", {})
-            
-            return {
-                "name": data.get("name"),
-                "symbol": data.get("symbol", "").upper(),
-                "category": data.get("categories", ["Digital Asset"])[0] if data.get("categories") else "Digital Asset",
-                "description": (data.get("description", {}).get("en", "") or "")[:500],
-                
-                # Price
-                "current_price_usd": market_data.get("current_price", {}).get("usd"),
-                
-                # Market
-                "market_cap": market_data.get("market_cap", {}).get("usd"),
-                "market_cap_rank": market_data.get("market_cap_rank"),
-                "total_volume": market_data.get("total_volume", {}).get("usd"),
-                
-                # Supply
-                "circulating_supply": market_data.get("circulating_supply"),
-                "max_supply": market_data.get("max_supply"),
-                
-                # Price Changes
-                "price_change_24h": market_data.get("price_change_24h"),
-                "price_change_percentage_24h": market_data.get("price_change_percentage_24h"),
-                "price_change_percentage_7d": market_data.get("price_change_percentage_7d_in_currency", {}).get("usd"),
-                "price_change_percentage_30d": market_data.get("price_change_percentage_30d_in_currency", {}).get("usd"),
-                
-                # ATH/ATL
-                "ath": market_data.get("ath", {}).get("usd"),
-                "ath_date": market_data.get("ath_date", {}).get("usd"),
-                "atl": market_data.get("atl", {}).get("usd"),
-                "atl_date": market_data.get("atl_date", {}).get("usd")
-            }
-            
-        except requests.exceptions.RequestException as e:
-            return {"error": f"API request failed: {e}"}
+        except Exception as e:
+            print(f"[CoinGecko] Metadata error for {coin_id}: {e}")
+            return {}
+        
+        metadata = {
+            "name": data.get("name"),
+            "symbol": data.get("symbol", "").upper(),
+            "category": data.get("categories", ["Digital Asset"])[0] if data.get("categories") else "Digital Asset",
+            "description": (data.get("description", {}).get("en", "") or "")[:500],
+        }
+        tiered_cache.set("coingecko.meta", coin_id, metadata, ttl=self.METADATA_TTL_SECONDS)
+        return metadata
     
-    def _get_price_history(self, coin_id: str, days: int = 365) -> List[Dict]:
-        """Fetch historical price data for charts."""
+    def _get_price_history(self, coin_id: str, days: int = 365) -> Dict[str, np.ndarray]:
+        """
+        Daily price history as NumPy arrays (timestamps in ms, prices,
+        volumes); cached for an hour.
+        """
+        cache_key = f"{coin_id}:{days}"
+        entry = tiered_cache.get("coingecko.history", cache_key)
+        if entry is not None and entry.is_fresh(time.time()):
+            return entry.value
         try:
-            url = f"{self.BASE_URL}/coins/{coin_id}/market_chart"
-            params = {"vs_currency": "usd", "days": days}
-            
-            response = self.session.get(url, params=params, timeout=15)
+            response = self._get(f"{self.BASE_URL}/coins/{coin_id}/market_chart",
+                                 {"vs_currency": "usd", "days": days}, timeout=15)
             response.raise_for_status()
             data = response.json()
-            
-            prices = data.get("prices", [])
-            volumes = data.get("total_volumes", [])
-            
-            history = []
-            for i, (timestamp, price) in enumerate(prices):
-                date = datetime.fromtimestamp(timestamp / 1000).strftime("%Y-%m-%d")
-                volume = volumes[i][1] if i < len(volumes) else 0
-                history.append({
-                    "Date": date,
-                    "Close": price,
-                    "Volume": volume
-                })
-            
-            return history
-            
         except Exception as e:
             print(f"[CoinGecko] Price history error: {e}")
-            return []
+            return entry.value if entry is not None else self._empty_history()
+        
+        prices = np.asarray(data.get("prices") or [], dtype=np.float64).reshape(-1, 2)
+        volumes = np.asarray(data.get("total_volumes") or [], dtype=np.float64).reshape(-1, 2)
+        series = {
+            "timestamps": prices[:, 0].astype(np.int64),
+            "prices": prices[:, 1].copy(),
+            "volumes": np.zeros(len(prices)),
+        }
+        n = min(len(prices), len(volumes))
+        series["volumes"][:n] = volumes[:n, 1]
+        
+        tiered_cache.set("coingecko.history", cache_key, series,
+                         ttl=self.HISTORY_TTL_SECONDS, stale_ttl=self.HISTORY_TTL_SECONDS)
+        return series
+    
+    @staticmethod
+    def _empty_history() -> Dict[str, np.ndarray]:
+        return {"timestamps": np.array([], dtype=np.int64), "prices": np.array([]), "volumes": np.array([])}
+    
+    @staticmethod
+    def _history_records(series: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """Chart rows ({Date, Close, Volume}) from the history arrays, dates in UTC."""
+        dates = series["timestamps"].astype("datetime64[ms]").astype("datetime64[D]").astype(str).tolist()
+        return [
+            {"Date": d, "Close": p, "Volume": v}
+            for d, p, v in zip(dates, series["prices"].tolist(), series["volumes"].tolist())
+        ]
+    
+    def _get(self, url: str, params: Dict[str, Any], timeout: float):
+        """GET through the rate-limit governor."""
+        if not self.governor.acquire(self.RATE_LIMIT_WAIT_SECONDS):
+            raise RuntimeError("CoinGecko rate limit budget exhausted")
+        return http_get(url, params=params, timeout=timeout, session=self.session, provider="coingecko")
     
     def _format_large_number(self, value: Optional[float]) -> str:
         """Format large numbers with B/M suffix."""
@@ -231,4 +326,7 @@ class CoinGeckoService:
 
 
 # Singleton instance
-coingecko_service = CoinGeckoService()
+coingecko_service = CoinGeckoService(
+    rate_per_minute=settings.COINGECKO_RATE_PER_MINUTE,
+    burst=settings.COINGECKO_BURST
+)
@@ -1,9 +1,22 @@
 """
 Data Validation and Anomaly Detection Service
 Detects and corrects common data quality issues.
+Stateless (safe to share across Scout threads). Single assets are checked
+with plain Python; validate_batch() checks many assets in one vectorised pass.
 """
+import math
 from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+def _number(value: Any) -> float:
+    """Numeric value or NaN (like pd.to_numeric(errors="coerce"))."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
 
 
 class DataValidator:
@@ -40,10 +53,6 @@ class DataValidator:
         "moderate": 0.03,   # 3%+ worth noting
     }
     
-    def __init__(self):
-        self.anomalies: List[Dict] = []
-        self.corrections: List[Dict] = []
-    
     def validate_and_enrich(
         self, 
         financials: Dict[str, Any],
@@ -54,173 +63,248 @@ class DataValidator:
         Validate and enrich financial data.
         Returns: (corrected_financials, corrected_technicals, anomalies)
         """
-        self.anomalies = []
-        self.corrections = []
+        return self._apply(asset_id, financials, technicals, self.check_row(asset_id, financials, technicals))
+    
+    def validate_batch(
+        self,
+        assets: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]]
+    ) -> Dict[str, Tuple[Dict, Dict, List[Dict]]]:
+        """
+        Validate many assets at once: {asset_id: (financials, technicals)} ->
+        {asset_id: (corrected_financials, corrected_technicals, anomalies)}.
+        All checks run as one vectorised pass over a frame of the fields.
+        """
+        if not assets:
+            return {}
+        flags = self.scan(self.to_frame(assets)).to_dict("index")
+        return {
+            asset_id: self._apply(asset_id, financials, technicals, flags[asset_id])
+            for asset_id, (financials, technicals) in assets.items()
+        }
+    
+    def _apply(
+        self,
+        asset_id: str,
+        financials: Dict[str, Any],
+        technicals: Dict[str, Any],
+        row: Dict[str, Any]
+    ) -> Tuple[Dict, Dict, List[Dict]]:
+        """Corrected copies and anomalies for one asset from its checked row."""
+        financials, technicals = dict(financials), dict(technicals)
+        anomalies: List[Dict] = []
+        corrections: List[Dict] = []
         
         # 1. Fix currency mismatch
-        financials = self._fix_currency(financials, asset_id)
+        if row["currency_mismatch"]:
+            corrections.append({
+                "field": "currency",
+                "original": row["currency"],
+                "corrected": row["expected_currency"],
+                "reason": f"Asset suffix indicates {row['expected_currency']} market"
+            })
+            financials["currency"] = row["expected_currency"]
+            financials["currency_corrected"] = True
+            financials["currency_original"] = row["currency"]
         
-        # 2. Detect abnormal price movements
-        price_anomaly = self._detect_price_anomaly(technicals, asset_id)
-        if price_anomaly:
-            self.anomalies.append(price_anomaly)
+        # 2. Abnormal price movements
+        if row["price_severity"]:
+            anomalies.append(self._price_anomaly(asset_id, row))
         
-        # 3. Validate market cap sanity
-        cap_anomaly = self._validate_market_cap(financials)
-        if cap_anomaly:
-            self.anomalies.append(cap_anomaly)
+        # 3. Market cap sanity
+        if row["suspicious_cap"]:
+            anomalies.append(self._market_cap_anomaly(row))
         
-        # 4. Cross-validate price consistency
-        price_mismatch = self._check_price_consistency(financials, technicals)
-        if price_mismatch:
-            self.anomalies.append(price_mismatch)
+        # 4. Price consistency between financials and technicals
+        if row["price_mismatch"]:
+            anomalies.append(self._price_mismatch_anomaly(row))
         
         # Add anomaly flags to data
-        financials["_anomalies"] = [a for a in self.anomalies if a.get("category") == "financial"]
-        technicals["_anomalies"] = [a for a in self.anomalies if a.get("category") == "technical"]
-        technicals["_corrections"] = self.corrections
+        financials["_anomalies"] = [a for a in anomalies if a.get("category") == "financial"]
+        technicals["_anomalies"] = [a for a in anomalies if a.get("category") == "technical"]
+        technicals["_corrections"] = corrections
         
-        return financials, technicals, self.anomalies
+        return financials, technicals, anomalies
     
-    def _fix_currency(self, financials: Dict, asset_id: str) -> Dict:
-        """
-        Detect and fix currency label based on market suffix.
-        """
-        detected_currency = None
+    @staticmethod
+    def _fields(financials: Dict[str, Any], technicals: Dict[str, Any]) -> Dict[str, Any]:
+        """The fields the checks need, as reported."""
+        history = technicals.get("history") or []
+        has_pair = len(history) >= 2
+        return {
+            "currency": financials.get("currency", "USD"),
+            "market_cap": financials.get("market_cap", ""),
+            "financial_price": financials.get("current_price"),
+            "technical_price": technicals.get("current_price"),
+            "latest_price": history[-1].get("price", 0) if has_pair else None,
+            "previous_price": history[-2].get("price", 0) if has_pair else None,
+            "latest_date": history[-1].get("date") if has_pair else None,
+        }
+    
+    def check_row(self, asset_id: str, financials: Dict[str, Any], technicals: Dict[str, Any]) -> Dict[str, Any]:
+        """The checks of scan() for a single asset, without building a frame."""
+        row = self._fields(financials, technicals)
+        currency = "USD" if row["currency"] is None else row["currency"]
         
-        # Detect from asset suffix
-        for suffix, currency in self.MARKET_CURRENCIES.items():
-            if asset_id.upper().endswith(suffix):
-                detected_currency = currency
-                break
+        # Currency from market suffix (first matching suffix wins)
+        upper_id = asset_id.upper()
+        expected = next((c for suffix, c in self.MARKET_CURRENCIES.items() if upper_id.endswith(suffix)), "")
+        mismatch = expected != "" and expected != currency
+        effective_currency = expected if mismatch else currency
         
-        reported_currency = financials.get("currency", "USD")
+        # Single-session move
+        latest, previous = _number(row["latest_price"]), _number(row["previous_price"])
+        change = (latest - previous) / previous if previous != 0 else math.nan
+        thresholds = self.VOLATILITY_THRESHOLDS
+        severity = ""
+        if abs(change) >= thresholds["extreme"]:
+            severity = "EXTREME"
+        elif abs(change) >= thresholds["high"]:
+            severity = "HIGH"
+        elif abs(change) >= thresholds["moderate"]:
+            severity = "MODERATE"
         
-        # If mismatch detected
-        if detected_currency and detected_currency != reported_currency:
-            self.corrections.append({
-                "field": "currency",
-                "original": reported_currency,
-                "corrected": detected_currency,
-                "reason": f"Asset suffix indicates {detected_currency} market"
-            })
-            financials["currency"] = detected_currency
-            financials["currency_corrected"] = True
-            financials["currency_original"] = reported_currency
+        # Trillion-scale caps labelled USD (likely INR mislabeled as USD)
+        cap_str = "" if row["market_cap"] is None else str(row["market_cap"])
+        cap = _number(cap_str.replace("T", "").replace(",", "")) if "T" in cap_str else math.nan
+        
+        # Financial vs technical price (both present and non-zero)
+        fin = _number(row["financial_price"])
+        tech = _number(row["technical_price"])
+        fin, tech = (0.0 if math.isnan(fin) else fin), (0.0 if math.isnan(tech) else tech)
+        diff_pct = abs(fin - tech) / max(fin, tech) * 100 if fin != 0 and tech != 0 else math.nan
         
-        return financials
+        row.update({
+            "expected_currency": expected,
+            "currency_mismatch": mismatch,
+            "daily_change": change,
+            "price_severity": severity,
+            "market_cap_trillions": cap,
+            "effective_currency": effective_currency,
+            "suspicious_cap": effective_currency == "USD" and cap > 3.5,
+            "price_diff_pct": diff_pct,
+            "price_mismatch": diff_pct > 5,
+        })
+        return row
+    
+    @classmethod
+    def to_frame(cls, assets: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]]) -> pd.DataFrame:
+        """One row per asset with the fields the checks need."""
+        rows = {asset_id: cls._fields(financials, technicals) for asset_id, (financials, technicals) in assets.items()}
+        # Object columns keep reported values as-is for anomaly details
+        return pd.DataFrame(list(rows.values()), index=list(rows), dtype=object)
     
-    def _detect_price_anomaly(self, technicals: Dict, asset_id: str) -> Optional[Dict]:
+    def scan(self, frame: pd.DataFrame) -> pd.DataFrame:
         """
-        Detect abnormal price movements that require explanation.
+        Vectorised checks over a frame indexed by asset_id (see to_frame),
+        for batches; check_row() is the single-asset equivalent.
+        Returns the frame plus flag columns ("" when no flag): expected_currency,
+        currency_mismatch, daily_change, price_severity, market_cap_trillions,
+        suspicious_cap, price_diff_pct, price_mismatch.
         """
-        history = technicals.get("history", [])
-        if len(history) < 2:
-            return None
+        out = frame.copy()
+        ids = pd.Series(frame.index.astype(str).str.upper(), index=frame.index)
+        currency = frame["currency"].fillna("USD")
         
-        # Get recent prices
-        latest = history[-1].get("price", 0)
-        previous = history[-2].get("price", 0)
+        # Currency from market suffix (first matching suffix wins)
+        suffixes = list(self.MARKET_CURRENCIES.items())
+        expected = np.select(
+            [ids.str.endswith(suffix).to_numpy() for suffix, _ in suffixes],
+            [c for _, c in suffixes],
+            default=""
+        )
+        out["expected_currency"] = expected
+        out["currency_mismatch"] = (expected != "") & (expected != currency.to_numpy())
+        effective_currency = np.where(out["currency_mismatch"], expected, currency.to_numpy())
         
-        if previous == 0:
-            return None
+        # Single-session move
+        latest = pd.to_numeric(frame["latest_price"], errors="coerce").to_numpy(dtype=float)
+        previous = pd.to_numeric(frame["previous_price"], errors="coerce").to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = np.where(previous != 0, (latest - previous) / previous, np.nan)
+        abs_change = np.abs(change)
+        thresholds = self.VOLATILITY_THRESHOLDS
+        out["daily_change"] = change
+        severity = np.select(
+            [abs_change >= thresholds["extreme"], abs_change >= thresholds["high"], abs_change >= thresholds["moderate"]],
+            ["EXTREME", "HIGH", "MODERATE"],
+            default=""
+        )
+        out["price_severity"] = severity
         
-        daily_change = (latest - previous) / previous
-        abs_change = abs(daily_change)
+        # Trillion-scale caps labelled USD (likely INR mislabeled as USD)
+        cap_str = frame["market_cap"].fillna("").astype(str)
+        cap = pd.to_numeric(cap_str.str.replace("T", "").str.replace(",", ""), errors="coerce").astype(float)
+        cap = cap.where(cap_str.str.contains("T"))
+        out["market_cap_trillions"] = cap
+        out["effective_currency"] = effective_currency
+        out["suspicious_cap"] = ((effective_currency == "USD") & (cap.to_numpy() > 3.5))
         
-        # Determine severity
-        severity = None
-        requires_news = False
+        # Financial vs technical price (both present and non-zero)
+        fin = pd.to_numeric(frame["financial_price"], errors="coerce").fillna(0).to_numpy(dtype=float)
+        tech = pd.to_numeric(frame["technical_price"], errors="coerce").fillna(0).to_numpy(dtype=float)
+        both = (fin != 0) & (tech != 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            diff_pct = np.where(both, np.abs(fin - tech) / np.maximum(fin, tech) * 100, np.nan)
+        out["price_diff_pct"] = diff_pct
+        out["price_mismatch"] = diff_pct > 5  # More than 5% difference
         
-        if abs_change >= self.VOLATILITY_THRESHOLDS["extreme"]:
-            severity = "EXTREME"
-            requires_news = True
-        elif abs_change >= self.VOLATILITY_THRESHOLDS["high"]:
-            severity = "HIGH"
-            requires_news = True
-        elif abs_change >= self.VOLATILITY_THRESHOLDS["moderate"]:
-            severity = "MODERATE"
-        
-        if severity:
-            direction = "crash" if daily_change < 0 else "surge"
-            return {
-                "category": "technical",
-                "type": "abnormal_price_movement",
-                "severity": severity,
-                "message": f"{severity} {direction}: {daily_change:.1%} in single session",
-                "details": {
-                    "previous_price": previous,
-                    "current_price": latest,
-                    "change_percent": round(daily_change * 100, 2),
-                    "requires_news_search": requires_news,
-                    "suggested_query": f"{asset_id} stock {direction} reason today" if requires_news else None,
-                    "date": history[-1].get("date")
-                }
+        return out
+    
+    @staticmethod
+    def _price_anomaly(asset_id: str, row: Dict[str, Any]) -> Dict:
+        """Abnormal price movement that requires explanation."""
+        severity = row["price_severity"]
+        daily_change = row["daily_change"]
+        requires_news = severity in ("EXTREME", "HIGH")
+        direction = "crash" if daily_change < 0 else "surge"
+        return {
+            "category": "technical",
+            "type": "abnormal_price_movement",
+            "severity": severity,
+            "message": f"{severity} {direction}: {daily_change:.1%} in single session",
+            "details": {
+                "previous_price": row["previous_price"],
+                "current_price": row["latest_price"],
+                "change_percent": round(daily_change * 100, 2),
+                "requires_news_search": requires_news,
+                "suggested_query": f"{asset_id} stock {direction} reason today" if requires_news else None,
+                "date": row["latest_date"]
             }
-        
-        return None
+        }
     
-    def _validate_market_cap(self, financials: Dict) -> Optional[Dict]:
-        """
-        Validate market cap is reasonable for the currency.
-        """
-        market_cap_str = financials.get("market_cap", "")
-        currency = financials.get("currency", "USD")
-        
-        # Parse market cap
-        if "T" in market_cap_str:
-            try:
-                cap_value = float(market_cap_str.replace("T", "").replace(",", ""))
-                
-                bounds = self.MARKET_CAP_BOUNDS.get(currency, {})
-                max_trillion = bounds.get("max_trillion", 10)
-                
-                if currency == "USD" and cap_value > 3.5:
-                    # Suspicious - might be INR labeled as USD
-                    return {
-                        "category": "financial",
-                        "type": "suspicious_market_cap",
-                        "severity": "HIGH",
-                        "message": f"Market cap {cap_value}T {currency} exceeds world's largest companies",
-                        "details": {
-                            "reported_value": market_cap_str,
-                            "currency": currency,
-                            "suspicion": "Likely INR mislabeled as USD"
-                        }
-                    }
-            except:
-                pass
-        
-        return None
+    @staticmethod
+    def _market_cap_anomaly(row: Dict[str, Any]) -> Dict:
+        """Market cap too large for the currency."""
+        cap_value = row["market_cap_trillions"]
+        currency = row["effective_currency"]
+        return {
+            "category": "financial",
+            "type": "suspicious_market_cap",
+            "severity": "HIGH",
+            "message": f"Market cap {cap_value}T {currency} exceeds world's largest companies",
+            "details": {
+                "reported_value": row["market_cap"],
+                "currency": currency,
+                "suspicion": "Likely INR mislabeled as USD"
+            }
+        }
     
-    def _check_price_consistency(
-        self, 
-        financials: Dict, 
-        technicals: Dict
-    ) -> Optional[Dict]:
-        """
-        Check if financial and technical prices are consistent.
-        """
-        fin_price = financials.get("current_price", 0)
-        tech_price = technicals.get("current_price", 0)
-        
-        if fin_price and tech_price:
-            diff_pct = abs(fin_price - tech_price) / max(fin_price, tech_price) * 100
-            
-            if diff_pct > 5:  # More than 5% difference
-                return {
-                    "category": "data_consistency",
-                    "type": "price_mismatch",
-                    "severity": "MODERATE",
-                    "message": f"Price mismatch: financials={fin_price}, technicals={tech_price}",
-                    "details": {
-                        "financial_price": fin_price,
-                        "technical_price": tech_price,
-                        "difference_percent": round(diff_pct, 2)
-                    }
-                }
-        
-        return None
+    @staticmethod
+    def _price_mismatch_anomaly(row: Dict[str, Any]) -> Dict:
+        """Financial and technical prices disagree."""
+        fin_price = row["financial_price"]
+        tech_price = row["technical_price"]
+        return {
+            "category": "data_consistency",
+            "type": "price_mismatch",
+            "severity": "MODERATE",
+            "message": f"Price mismatch: financials={fin_price}, technicals={tech_price}",
+            "details": {
+                "financial_price": fin_price,
+                "technical_price": tech_price,
+                "difference_percent": round(row["price_diff_pct"], 2)
+            }
+        }
     
     def get_news_search_query(self, anomalies: List[Dict], asset_id: str) -> Optional[str]:
         """
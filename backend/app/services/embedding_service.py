@@ -0,0 +1,283 @@
+"""
+Embedding Service - Shared sentence-embedding encoder for RAG.
+The sentence-transformers model is loaded on first use or by the warm-up
+job, not at import, so the API starts serving immediately. Encode requests
+from all callers are micro-batched by one dispatcher thread. With
+EMBEDDING_WORKERS > 0 batches are encoded in a pool of worker processes
+(each holding its own model) and the vectors come back through shared
+memory, keeping model CPU time off the request threads' GIL.
+Without sentence-transformers, deterministic mock embeddings are used. If
+the library is installed but the model can't be loaded (offline, missing
+files), encodes fail and the load is retried after a backoff; mock vectors
+must never end up in a store next to real ones.
+"""
+import hashlib
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("embeddings")
+
+# Vector size of all-MiniLM-L6-v2 (also used for mock embeddings)
+MOCK_DIMENSIONS = 384
+
+
+def mock_embeddings(texts: Sequence[str]) -> np.ndarray:
+    """Deterministic hash-based vectors for running without a model."""
+    vectors = np.empty((len(texts), MOCK_DIMENSIONS), dtype=np.float32)
+    divisors = np.arange(1, MOCK_DIMENSIONS + 1)
+    for i, text in enumerate(texts):
+        hash_val = int(hashlib.sha256(text.encode()).hexdigest(), 16)
+        vectors[i] = [(hash_val % d) / d for d in divisors.tolist()]
+    return vectors
+
+
+# ============== Worker Processes ==============
+
+_worker_model = None
+
+
+def _init_worker(model_name: str):
+    global _worker_model
+    from sentence_transformers import SentenceTransformer
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_in_worker(texts: List[str], batch_size: int) -> Tuple[str, Tuple[int, ...]]:
+    """Encode in a worker; returns the shared-memory block holding the vectors."""
+    vectors = np.ascontiguousarray(_worker_model.encode(texts, batch_size=batch_size), dtype=np.float32)
+    block = shared_memory.SharedMemory(create=True, size=max(vectors.nbytes, 1))
+    np.ndarray(vectors.shape, dtype=np.float32, buffer=block.buf)[:] = vectors
+    block.close()
+    return block.name, vectors.shape
+
+
+def _from_shared(name: str, shape: Tuple[int, ...]) -> np.ndarray:
+    """Copy vectors out of a worker's shared-memory block and free it."""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype=np.float32, buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+
+
+class EmbeddingService:
+    """
+    Lazily loaded encoder behind a micro-batching dispatcher.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int,
+        batch_wait_ms: float,
+        workers: int,
+        load_retry_seconds: float = 60
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.batch_wait_seconds = batch_wait_ms / 1000
+        self.workers = workers
+        self.load_retry_seconds = load_retry_seconds
+        self.backend = "unloaded"  # sentence-transformers | worker-pool | mock
+        self.library_missing = False  # True once mock embeddings are in use for lack of the library
+        self._load_failed_at: Optional[float] = None
+        self._model = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Optional[threading.Semaphore] = None
+        self._load_lock = threading.Lock()
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._dispatcher_lock = threading.Lock()
+        self._stats = {"requests": 0, "texts": 0, "batches": 0, "load_ms": None, "load_error": None}
+
+    # ============== Loading ==============
+
+    def load(self) -> "EmbeddingService":
+        """
+        Load the model (or start the worker pool) once; thread-safe. Raises
+        if the model failed to load less than load_retry_seconds ago.
+        """
+        if self.backend != "unloaded":
+            return self
+        with self._load_lock:
+            if self.backend == "unloaded":
+                if self._load_failed_at is not None:
+                    remaining = self.load_retry_seconds - (time.monotonic() - self._load_failed_at)
+                    if remaining > 0:
+                        raise RuntimeError(
+                            f"Embedding model {self.model_name} unavailable (retrying in {remaining:.0f}s): "
+                            f"{self._stats['load_error']}"
+                        )
+                start = time.monotonic()
+                self._load_locked()
+                self._stats["load_ms"] = round((time.monotonic() - start) * 1000, 1)
+                logger.info(f"Embeddings ready ({self.backend}) in {self._stats['load_ms']}ms")
+        return self
+
+    def _load_locked(self):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            logger.warning("sentence-transformers not available; using mock embeddings")
+            self.library_missing = True
+            self.backend = "mock"
+            return
+
+        try:
+            self._start_backend(SentenceTransformer)
+        except Exception as e:
+            # No mock fallback: its vectors would be persisted next to real ones
+            logger.warning(
+                f"Could not load embedding model {self.model_name} ({e}); "
+                f"retrying in {self.load_retry_seconds:g}s"
+            )
+            self._stats["load_error"] = str(e)
+            self._load_failed_at = time.monotonic()
+            raise
+        self._load_failed_at = None
+        self._stats["load_error"] = None
+
+    def _start_backend(self, model_cls: type):
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name,)
+            )
+            self._in_flight = threading.Semaphore(self.workers)
+            try:
+                # Load the model in every worker before taking traffic
+                warm = [self._pool.submit(_encode_in_worker, ["warm-up"], 1) for _ in range(self.workers)]
+                for future in warm:
+                    _from_shared(*future.result())
+            except Exception:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+                raise
+            self.backend = "worker-pool"
+        else:
+            self._model = model_cls(self.model_name)
+            self.backend = "sentence-transformers"
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ============== Encoding ==============
+
+    def encode(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed texts (batched with other callers' requests); blocks until done."""
+        texts = list(texts)
+        if not texts:
+            return []
+        future: Future = Future()
+        self._queue.put((texts, future))
+        self._ensure_dispatcher()
+        return future.result()
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher and self._dispatcher.is_alive():
+            return
+        with self._dispatcher_lock:
+            if not (self._dispatcher and self._dispatcher.is_alive()):
+                self._dispatcher = threading.Thread(target=self._dispatch, name="embedding-dispatch", daemon=True)
+                self._dispatcher.start()
+
+    def _dispatch(self):
+        """Collect requests for up to batch_wait_seconds / batch_size texts, then encode them together."""
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0][0])
+            deadline = time.monotonic() + self.batch_wait_seconds
+            while size < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                size += len(batch[-1][0])
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[Tuple[List[str], Future]]):
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        self._stats["requests"] += len(batch)
+        self._stats["texts"] += len(texts)
+        self._stats["batches"] += 1
+        try:
+            self.load()
+            if self.backend == "worker-pool":
+                # Hand off and keep collecting; the pool bounds concurrency
+                self._in_flight.acquire()
+                try:
+                    submitted = self._pool.submit(_encode_in_worker, texts, self.batch_size)
+                except Exception:
+                    self._in_flight.release()
+                    raise
+                submitted.add_done_callback(lambda f: self._finish_worker_batch(f, batch))
+                return
+            if self.backend == "mock":
+                vectors = mock_embeddings(texts)
+            else:
+                vectors = self._model.encode(texts, batch_size=self.batch_size)
+        except Exception as e:
+            self._fail(batch, e)
+            return
+        self._resolve(batch, vectors)
+
+    def _finish_worker_batch(self, submitted: Future, batch: List[Tuple[List[str], Future]]):
+        self._in_flight.release()
+        try:
+            vectors = _from_shared(*submitted.result())
+        except Exception as e:
+            self._fail(batch, e)
+            return
+        self._resolve(batch, vectors)
+
+    @staticmethod
+    def _resolve(batch: List[Tuple[List[str], Future]], vectors: np.ndarray):
+        rows = np.asarray(vectors, dtype=np.float32).tolist()
+        offset = 0
+        for texts, future in batch:
+            future.set_result(rows[offset:offset + len(texts)])
+            offset += len(texts)
+
+    @staticmethod
+    def _fail(batch: List[Tuple[List[str], Future]], error: Exception):
+        logger.warning(f"Embedding batch failed: {error}")
+        for _, future in batch:
+            future.set_exception(error)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "workers": self.workers,
+            "batch_size": self.batch_size,
+            "batch_wait_ms": self.batch_wait_seconds * 1000,
+            "queued": self._queue.qsize(),
+            **self._stats,
+        }
+
+
+# Singleton (nothing is loaded until the first encode or warm-up)
+embedding_service = EmbeddingService(
+    model_name=settings.EMBEDDING_MODEL,
+    batch_size=settings.EMBEDDING_BATCH_SIZE,
+    batch_wait_ms=settings.EMBEDDING_BATCH_WAIT_MS,
+    workers=settings.EMBEDDING_WORKERS,
+    load_retry_seconds=settings.EMBEDDING_LOAD_RETRY_SECONDS
+)
@@ -1,10 +1,18 @@
 """
 FRED (Federal Reserve Economic Data) Service
-Fetches US economic indicators for macro analysis.
+Fetches US and India economic indicators for macro analysis.
+All series are fetched concurrently over one pooled session; observations and
+series metadata are cached separately (memory + disk, so they survive
+restarts) with their own TTLs.
 """
 import requests
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from app.core.providers import http_get
+from app.core.tracing import trace_span, propagate_context
+from app.services.cache_service import tiered_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from datetime import datetime
 import os
 
 
@@ -37,11 +45,21 @@ class FREDService:
         "INDIA_REPO_RATE": "IRSTCB01INM156N",  # Central Bank Policy Rate
     }
     
+    # Observations (latest values) vs. series metadata (titles, units, notes)
+    OBSERVATIONS_TTL_SECONDS = 3600
+    METADATA_TTL_SECONDS = 7 * 24 * 3600
+    MAX_WORKERS = 16
+    
+    # Key indicators for investment decisions
+    SUMMARY_INDICATORS = ["FED_FUNDS", "TREASURY_10Y", "TREASURY_2Y", "UNEMPLOYMENT", "INFLATION"]
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.environ.get("FRED_API_KEY")
-        self._cache = {}
-        self._cache_time = {}
-        self._cache_duration = 3600  # 1 hour cache
+        # Pooled keep-alive connections shared by all concurrent fetches
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.MAX_WORKERS)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS, thread_name_prefix="fred")
     
     def get_indicator(self, indicator_name: str) -> Dict[str, Any]:
         """
@@ -50,27 +68,40 @@ class FREDService:
         series_id = self.INDICATORS.get(indicator_name.upper())
         if not series_id:
             return {"error": f"Unknown indicator: {indicator_name}"}
+        return self.get_series([series_id])[series_id]
+    
+    def get_series(self, series_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch several series at once. Metadata and observations for every
+        series are requested concurrently (cached ones are skipped), so a cold
+        call costs one round of parallel requests.
+        """
+        if not self.api_key:
+            return {series_id: self._get_mock_data(series_id) for series_id in series_ids}
+        
+        futures = {
+            series_id: (
+                self._executor.submit(propagate_context(self._get_metadata), series_id),
+                self._executor.submit(propagate_context(self._get_observations), series_id)
+            )
+            for series_id in series_ids
+        }
         
-        # Check cache
-        cache_key = f"indicator_{series_id}"
-        if self._is_cached(cache_key):
-            return self._cache[cache_key]
-        
-        try:
-            data = self._fetch_series(series_id)
-            self._cache[cache_key] = data
-            self._cache_time[cache_key] = datetime.now()
-            return data
-        except Exception as e:
-            return {"error": str(e), "series_id": series_id}
+        results = {}
+        for series_id, (meta_future, obs_future) in futures.items():
+            try:
+                results[series_id] = self._build_series(series_id, meta_future.result(), obs_future.result())
+            except Exception as e:
+                results[series_id] = {"error": str(e), "series_id": series_id}
+        return results
     
     def get_macro_summary(self) -> Dict[str, Any]:
         """
         Get a summary of key macro indicators.
         """
-        cache_key = "macro_summary"
-        if self._is_cached(cache_key):
-            return self._cache[cache_key]
+        us_ids = {self.INDICATORS[name]: name for name in self.SUMMARY_INDICATORS}
+        india_ids = {series_id: name for name, series_id in self.INDIA_INDICATORS.items()}
+        series = self.get_series(list(us_ids) + list(india_ids))
         
         summary = {
             "source": "FRED API" if self.api_key else "FRED Mock (No API Key)",
@@ -78,11 +109,8 @@ class FREDService:
             "indicators": {}
         }
         
-        # Key indicators for investment decisions
-        key_indicators = ["FED_FUNDS", "TREASURY_10Y", "TREASURY_2Y", "UNEMPLOYMENT", "INFLATION"]
-        
-        for indicator in key_indicators:
-            data = self.get_indicator(indicator)
+        for series_id, indicator in us_ids.items():
+            data = series[series_id]
             if "error" not in data:
                 summary["indicators"][indicator.lower()] = {
                     "value": data.get("value"),
@@ -90,15 +118,12 @@ class FREDService:
                     "change": data.get("change"),
                     "description": data.get("description")
                 }
-
-        # Add India Indicators (FRED)
-        for name, series_id in self.INDIA_INDICATORS.items():
-            # Special handling: get_indicator expects key in INDICATORS, but these are in INDIA_INDICATORS
-            # We can just fetch directly using series_id if we bypass get_indicator logic or update get_indicator
-            # Simpler: use _fetch_series directly
-            data = self._fetch_series(series_id)
+        
+        # India Indicators (FRED)
+        for series_id, name in india_ids.items():
+            data = series[series_id]
             if "error" not in data:
-                 summary["indicators"][name.lower()] = {
+                summary["indicators"][name.lower()] = {
                     "value": data.get("value"),
                     "date": data.get("date"),
                     "description": data.get("title", name)
@@ -114,44 +139,46 @@ class FREDService:
                     "spread": round(spread, 2),
                     "status": "Inverted (Recession Signal)" if spread < 0 else "Normal"
                 }
-        except:
+        except (TypeError, ValueError):
             pass
         
-        self._cache[cache_key] = summary
-        self._cache_time[cache_key] = datetime.now()
         return summary
     
-    def _fetch_series(self, series_id: str) -> Dict[str, Any]:
-        """
-        Fetch series data from FRED API.
-        """
-        if not self.api_key:
-            return self._get_mock_data(series_id)
-        
-        # Get series info
-        url = f"{self.BASE_URL}/series"
+    # ============== Cached Fetches ==============
+    
+    def _get_metadata(self, series_id: str) -> Dict[str, Any]:
+        """Series info (title, units, notes) - rarely changes, cached for a week."""
+        return tiered_cache.get_or_compute(
+            "fred.series", series_id,
+            lambda: self._request("series", series_id).get("seriess", [{}])[0],
+            self.METADATA_TTL_SECONDS, self.METADATA_TTL_SECONDS
+        )
+    
+    def _get_observations(self, series_id: str) -> List[Dict[str, Any]]:
+        """Latest two observations, cached for an hour (served stale while refreshing)."""
+        return tiered_cache.get_or_compute(
+            "fred.observations", series_id,
+            lambda: self._request("series/observations", series_id, sort_order="desc", limit=2).get("observations", []),
+            self.OBSERVATIONS_TTL_SECONDS, self.OBSERVATIONS_TTL_SECONDS
+        )
+    
+    def _request(self, endpoint: str, series_id: str, **extra) -> Dict[str, Any]:
+        """GET a FRED endpoint; raises on HTTP errors so failures are never cached."""
         params = {
-            "series_id": series_id,
-            "api_key": self.api_key,
-            "file_type": "json"
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        series_info = response.json().get("seriess", [{}])[0]
-        
-        # Get latest observations
-        obs_url = f"{self.BASE_URL}/series/observations"
-        obs_params = {
             "series_id": series_id,
             "api_key": self.api_key,
             "file_type": "json",
-            "sort_order": "desc",
-            "limit": 2
+            **extra
         }
-        
-        obs_response = requests.get(obs_url, params=obs_params, timeout=10)
-        observations = obs_response.json().get("observations", [])
-        
+        with trace_span(f"fred.{endpoint}", series_id=series_id):
+            response = http_get(f"{self.BASE_URL}/{endpoint}", params=params, timeout=10,
+                                session=self.session, provider="fred")
+        response.raise_for_status()
+        return response.json()
+    
+    @staticmethod
+    def _build_series(series_id: str, series_info: Dict[str, Any], observations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine metadata and observations into the indicator payload."""
         if not observations:
             return {"error": "No data available", "series_id": series_id}
         
@@ -174,7 +201,7 @@ class FREDService:
                 curr_val = float(latest["value"])
                 result["change"] = round(curr_val - prev_val, 3)
                 result["change_pct"] = round((curr_val - prev_val) / prev_val * 100, 2) if prev_val else 0
-            except:
+            except (TypeError, ValueError):
                 pass
         
         return result
@@ -205,15 +232,6 @@ class FREDService:
             "units": data.get("units", ""),
             "source": "Mock Data (No FRED API Key)"
         }
-    
-    def _is_cached(self, key: str) -> bool:
-        """Check if cache is valid."""
-        if key not in self._cache:
-            return False
-        cache_time = self._cache_time.get(key)
-        if not cache_time:
-            return False
-        return (datetime.now() - cache_time).seconds < self._cache_duration
 
 
 # Singleton instance
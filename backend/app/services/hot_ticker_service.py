@@ -0,0 +1,156 @@
+"""
+Hot Ticker Service - Keeps the most-requested tickers' Scout data warm.
+Every Scout collection bumps an exponentially decaying popularity score. A
+background loop takes the top-N tickers and re-collects the ones whose cached
+payload is missing or close to expiry, a few per cycle, so requests for
+popular tickers are served from cache instead of paying a cold fetch.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("hot_tickers")
+
+# Tickers served from static demo data never need warming
+SKIP_TICKERS = {"DEMO", "DEMO.NS", "ELIDA.NS"}
+
+
+class HotTickerService:
+    """
+    Popularity tracking plus refresh-ahead of the Scout cache under an
+    upstream budget (max tickers refetched per cycle).
+    """
+
+    # Bound on tracked tickers; the least popular are dropped beyond this
+    MAX_TRACKED = 500
+
+    def __init__(self, top_n: int, refresh_seconds: float, budget: int, half_life_seconds: float):
+        self.top_n = top_n
+        self.refresh_seconds = refresh_seconds
+        self.budget = budget
+        self.half_life_seconds = half_life_seconds
+        self._scores: Dict[str, float] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_cycle: Dict[str, Any] = {}
+
+    # ============== Popularity ==============
+
+    def _decayed(self, symbol: str, now: float) -> float:
+        """Score decayed to `now` (caller holds the lock)."""
+        age = now - self._updated_at[symbol]
+        return self._scores[symbol] * 0.5 ** (age / self.half_life_seconds)
+
+    def record(self, asset_id: str):
+        """Count one request for a ticker."""
+        if not asset_id or asset_id in SKIP_TICKERS:
+            return
+        now = time.time()
+        with self._lock:
+            score = self._decayed(asset_id, now) if asset_id in self._scores else 0.0
+            self._scores[asset_id] = score + 1.0
+            self._updated_at[asset_id] = now
+            if len(self._scores) > self.MAX_TRACKED:
+                coldest = min(self._scores, key=lambda s: self._decayed(s, now))
+                del self._scores[coldest]
+                del self._updated_at[coldest]
+
+    def top(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most popular tickers, highest score first."""
+        now = time.time()
+        with self._lock:
+            ranked = sorted(
+                ((symbol, self._decayed(symbol, now)) for symbol in self._scores),
+                key=lambda item: item[1],
+                reverse=True
+            )
+        return [
+            {"asset_id": symbol, "score": round(score, 3)}
+            for symbol, score in ranked[:n or self.top_n]
+        ]
+
+    # ============== Refresh-Ahead ==============
+
+    def due_for_refresh(self) -> List[str]:
+        """
+        Hot tickers whose Scout payload is missing or expires before the next
+        cycle has a chance to refresh it, most popular first, capped by budget.
+        """
+        from app.agents.scout import ScoutAgent
+
+        due = []
+        for item in self.top():
+            remaining = ScoutAgent._fetch_cached_data.ttl_remaining(item["asset_id"])
+            if remaining is None or remaining < self.refresh_seconds * 2:
+                due.append(item["asset_id"])
+            if len(due) >= self.budget:
+                break
+        return due
+
+    def refresh_cycle(self) -> List[str]:
+        """
+        Re-collect due tickers with one bulk Scout batch. Returns the refreshed
+        tickers; ones that only got fallback data are not cached and are retried
+        next cycle.
+        """
+        from app.agents.scout import scout_agent
+
+        due = self.due_for_refresh()
+        start = time.time()
+        refreshed = []
+        if due:
+            try:
+                collected = scout_agent.collect_batch(due, force=True)
+                refreshed = [s for s, data in collected.items() if not data.get("fallback_sources")]
+            except Exception as e:
+                logger.warning(f"Hot ticker refresh failed: {e}")
+        self._last_cycle = {
+            "at": time.time(),
+            "due": due,
+            "refreshed": refreshed,
+            "duration_ms": round((time.time() - start) * 1000, 1)
+        }
+        if refreshed:
+            logger.info(f"Refreshed {len(refreshed)} hot tickers: {', '.join(refreshed)}")
+        return refreshed
+
+    # ============== Background Refresh ==============
+
+    def start(self):
+        """Start the background refresher (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="hot-tickers", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.refresh_seconds):
+            self.refresh_cycle()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "top_n": self.top_n,
+            "refresh_seconds": self.refresh_seconds,
+            "budget_per_cycle": self.budget,
+            "hot": self.top(),
+            "last_cycle": self._last_cycle,
+        }
+
+
+# Singleton instance
+hot_ticker_service = HotTickerService(
+    top_n=settings.HOT_TICKER_TOP_N,
+    refresh_seconds=settings.HOT_TICKER_REFRESH_SECONDS,
+    budget=settings.HOT_TICKER_REFRESH_BUDGET,
+    half_life_seconds=settings.HOT_TICKER_HALF_LIFE_SECONDS
+)
@@ -0,0 +1,149 @@
+"""
+Indicator State Service - Per-symbol incremental indicator states.
+Each symbol's IndicatorState is kept in memory and persisted as JSON
+(data/indicator_state/<SYMBOL>.json). A sync only feeds bars newer than the
+last committed date, so refreshing technicals costs O(new bars) instead of a
+full recompute, and live ticks are evaluated in O(1) against the committed
+state for the quote stream and alerting.
+"""
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.indicators import IndicatorState
+
+logger = get_logger("indicator_state")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+
+class IndicatorStateStore:
+    """
+    Symbol -> IndicatorState. The latest bar of a history is never committed
+    (it may be an intraday partial); it is evaluated as a tick instead.
+    A per-symbol lock serializes syncs, live snapshots and saves of a symbol;
+    the store lock only guards the shared dicts and stats.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._states: Dict[str, IndicatorState] = {}
+        self._lock = threading.Lock()
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        self._stats = {"syncs": 0, "bars_appended": 0, "rebuilds": 0, "live_snapshots": 0}
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9.\-]", "_", symbol.upper()) + ".json")
+
+    def _lock_for(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def get(self, symbol: str) -> Optional[IndicatorState]:
+        """Committed state for a symbol (loaded from disk on first use), or None."""
+        symbol = symbol.upper()
+        with self._lock:
+            state = self._states.get(symbol)
+            if state is None:
+                state = self._load(symbol)
+                if state is not None:
+                    self._states[symbol] = state
+            return state
+
+    # ============== Sync ==============
+
+    def sync(self, symbol: str, dates: Sequence[Any], closes: Sequence[float]) -> Dict[str, Any]:
+        """
+        Bring a symbol's state up to `closes` (oldest first, dates aligned)
+        and return the indicator snapshot with the last close as the latest
+        bar. Bars after the committed date are appended; if the history no
+        longer agrees with the committed close (split, adjusted-close
+        revision, different source) the state is rebuilt from it.
+        """
+        symbol = symbol.upper()
+        days = [str(d)[:10] for d in dates]
+        values = np.asarray(closes, dtype=float)
+        if not len(values):
+            return {}
+
+        committed = len(values) - 1
+        # Held across resume, append and save so concurrent syncs can't append twice
+        with self._lock_for(symbol):
+            state = self.get(symbol)
+            start = self._resume_index(state, days, values)
+            if start is None:
+                state = IndicatorState.from_closes(values[:committed], days[committed - 1] if committed else None)
+            else:
+                for i in range(start, committed):
+                    state.add_bar(values[i], days[i])
+            with self._lock:
+                self._states[symbol] = state
+                self._stats["syncs"] += 1
+                if start is None:
+                    self._stats["rebuilds"] += 1
+                else:
+                    self._stats["bars_appended"] += max(committed - start, 0)
+            if start is None or start < committed:
+                self._save(symbol, state)
+            return state.snapshot(values[-1])
+
+    @staticmethod
+    def _resume_index(state: Optional[IndicatorState], days: list, values: np.ndarray) -> Optional[int]:
+        """Index of the first bar to append, or None if the state must be rebuilt."""
+        if state is None or not state.count or state.last_date not in days:
+            return None
+        i = days.index(state.last_date)
+        if not np.isclose(values[i], state.last_close, rtol=1e-9):
+            return None
+        return i + 1
+
+    def live(self, symbol: str, price: Optional[float]) -> Optional[Dict[str, Any]]:
+        """Snapshot with a live price as the latest bar, or None if no state is held."""
+        if not price:
+            return None
+        with self._lock_for(symbol.upper()):
+            state = self.get(symbol)
+            if state is None:
+                return None
+            with self._lock:
+                self._stats["live_snapshots"] += 1
+            return state.snapshot(price)
+
+    # ============== Persistence ==============
+
+    def _load(self, symbol: str) -> Optional[IndicatorState]:
+        try:
+            with open(self._path(symbol)) as f:
+                return IndicatorState.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save(self, symbol: str, state: IndicatorState):
+        """Persist a state (caller holds the symbol lock, so it can't change mid-dump)."""
+        path = self._path(symbol)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state.to_dict(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not persist indicator state for {symbol}: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "root": self.root,
+                "symbols": sorted(self._states),
+                **self._stats,
+            }
+
+
+# Singleton
+indicator_states = IndicatorStateStore(os.path.join(BACKEND_DIR, settings.INDICATOR_STATE_DIR))
@@ -0,0 +1,586 @@
+"""
+Technical Indicators - NumPy implementations shared by Scout, CoinGecko and
+the backtest service.
+Every function takes a 1-D array of closes (oldest first) and works over the
+whole array at once; series functions return arrays aligned with the input
+(NaN until enough data), scalar helpers return plain floats.
+IndicatorState is the streaming counterpart: the same snapshot, updated in
+O(1) per new bar or live tick, and serializable.
+"""
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TRADING_DAYS = 252
+
+# Block length for closed-form smoothing; decay^-64 stays finite for any
+# decay >= _MIN_BLOCK_DECAY, smaller decays use the plain recurrence
+_SMOOTH_BLOCK = 64
+_MIN_BLOCK_DECAY = 0.01
+
+
+def as_array(values: Sequence[float]) -> np.ndarray:
+    """Convert closes (list, Series or array) to a float64 array."""
+    return np.asarray(values, dtype=np.float64).ravel()
+
+
+# ============== Moving Averages ==============
+
+def sma(values: Sequence[float], window: int) -> np.ndarray:
+    """Simple moving average via a cumulative sum (one pass)."""
+    x = as_array(values)
+    out = np.full(x.shape, np.nan)
+    if window <= 0 or len(x) < window:
+        return out
+    csum = np.cumsum(np.insert(x, 0, 0.0))
+    out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def _smooth(x: np.ndarray, alpha: float, seed_window: int) -> np.ndarray:
+    """
+    Exponential smoothing seeded with the mean of the first seed_window values
+    (the standard seeding for both EMA and Wilder averages).
+    The recurrence y[j] = decay * y[j-1] + alpha * x[j] is solved in closed
+    form, y[j] = decay^j * (y0 + alpha * cumsum(x[i] / decay^i)), over short
+    blocks so decay^-j stays well inside float range.
+    """
+    out = np.full(x.shape, np.nan)
+    if len(x) < seed_window:
+        return out
+    prev = x[:seed_window].mean()
+    out[seed_window - 1] = prev
+    decay = 1.0 - alpha
+    if decay < _MIN_BLOCK_DECAY:
+        for i in range(seed_window, len(x)):
+            prev = alpha * x[i] + decay * prev
+            out[i] = prev
+        return out
+
+    rest = x[seed_window:]
+    powers = decay ** np.arange(1, _SMOOTH_BLOCK + 1)
+    for start in range(0, len(rest), _SMOOTH_BLOCK):
+        block = rest[start:start + _SMOOTH_BLOCK]
+        p = powers[:len(block)]
+        values = p * (prev + alpha * np.cumsum(block / p))
+        out[seed_window + start:seed_window + start + len(block)] = values
+        prev = values[-1]
+    return out
+
+
+def ema(values: Sequence[float], span: int) -> np.ndarray:
+    """Exponential moving average (alpha = 2 / (span + 1)), SMA-seeded."""
+    return _smooth(as_array(values), 2.0 / (span + 1), span)
+
+
+# ============== Momentum ==============
+
+def rsi(values: Sequence[float], period: int = 14) -> np.ndarray:
+    """Wilder's RSI (smoothing alpha = 1 / period)."""
+    x = as_array(values)
+    out = np.full(x.shape, np.nan)
+    if len(x) <= period:
+        return out
+    delta = np.diff(x)
+    avg_gain = _smooth(np.clip(delta, 0, None), 1.0 / period, period)
+    avg_loss = _smooth(np.clip(-delta, 0, None), 1.0 / period, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        values_rsi = 100.0 - 100.0 / (1.0 + rs)
+    # No losses -> 100, flat price -> 50
+    values_rsi = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), values_rsi)
+    out[1:] = np.where(np.isnan(avg_gain), np.nan, values_rsi)
+    return out
+
+
+def rsi_latest(matrix: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    Latest Wilder RSI for every row of a (symbols x bars) close matrix whose
+    rows are NaN-padded on the left: one pass over the bar axis covers all
+    symbols. NaN where a row has `period` bars or fewer.
+    """
+    x = np.atleast_2d(np.asarray(matrix, dtype=np.float64))
+    delta = np.diff(x, axis=1)
+    gains, losses = np.clip(delta, 0, None), np.clip(-delta, 0, None)
+    avg_gain, avg_loss = np.zeros(len(x)), np.zeros(len(x))
+    count = np.zeros(len(x), dtype=np.int64)
+    alpha = 1.0 / period
+    for gain, loss in zip(gains.T, losses.T):
+        valid = ~np.isnan(gain)
+        seeding, smoothing = valid & (count < period), valid & (count >= period)
+        avg_gain = np.where(seeding, avg_gain + gain / period, np.where(smoothing, avg_gain + alpha * (gain - avg_gain), avg_gain))
+        avg_loss = np.where(seeding, avg_loss + loss / period, np.where(smoothing, avg_loss + alpha * (loss - avg_loss), avg_loss))
+        count += valid
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values_rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    values_rsi = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), values_rsi)
+    return np.where(count >= period, values_rsi, np.nan)
+
+
+def macd(
+    values: Sequence[float], fast: int = 12, slow: int = 26, signal: int = 9
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram."""
+    x = as_array(values)
+    macd_line = ema(x, fast) - ema(x, slow)
+    signal_line = np.full(x.shape, np.nan)
+    valid = ~np.isnan(macd_line)
+    if valid.sum() >= signal:
+        signal_line[valid] = ema(macd_line[valid], signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+# ============== Volatility & Range ==============
+
+def bollinger(
+    values: Sequence[float], window: int = 20, num_std: float = 2.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger bands (middle, upper, lower) using the population std."""
+    x = as_array(values)
+    middle = sma(x, window)
+    mean_sq = sma(x * x, window)
+    std = np.sqrt(np.clip(mean_sq - middle * middle, 0, None))
+    return middle, middle + num_std * std, middle - num_std * std
+
+
+def returns(values: Sequence[float]) -> np.ndarray:
+    """Simple period returns (length n - 1), ignoring non-positive prices."""
+    x = as_array(values)
+    if len(x) < 2:
+        return np.array([])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = x[1:] / x[:-1] - 1.0
+    return r[np.isfinite(r)]
+
+
+def volatility(values: Sequence[float], window: Optional[int] = None, annualize: bool = True) -> Optional[float]:
+    """
+    Standard deviation of daily returns over the last `window` returns
+    (all if None), annualized with sqrt(252) unless annualize=False.
+    """
+    r = returns(values)
+    if window:
+        r = r[-window:]
+    if len(r) < 2:
+        return None
+    vol = float(r.std(ddof=1))
+    return vol * np.sqrt(TRADING_DAYS) if annualize else vol
+
+
+def range_52w(values: Sequence[float], window: int = TRADING_DAYS) -> Dict[str, Optional[float]]:
+    """52-week high/low and the current distance from the high (%)."""
+    x = as_array(values)[-window:]
+    if len(x) == 0:
+        return {"high": None, "low": None, "pct_from_high": None}
+    high, low = float(x.max()), float(x.min())
+    pct = (float(x[-1]) - high) / high * 100 if high > 0 else 0.0
+    return {"high": high, "low": low, "pct_from_high": pct}
+
+
+def drawdown(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Maximum and current drawdown from the running peak (%, <= 0)."""
+    x = as_array(values)
+    if len(x) == 0:
+        return {"max_drawdown_pct": None, "current_drawdown_pct": None}
+    peaks = np.maximum.accumulate(x)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd = np.where(peaks > 0, x / peaks - 1.0, 0.0) * 100
+    return {"max_drawdown_pct": float(dd.min()), "current_drawdown_pct": float(dd[-1])}
+
+
+def pct_change(values: Sequence[float], periods: int) -> float:
+    """Percent change over the last `periods` bars (0 if not enough data)."""
+    x = as_array(values)
+    if len(x) <= periods or x[-1 - periods] == 0:
+        return 0.0
+    return float((x[-1] / x[-1 - periods] - 1.0) * 100)
+
+
+# ============== Signals & Serialization ==============
+
+def trend_from_sma(price: float, sma_50: Optional[float], sma_200: Optional[float]) -> str:
+    """Scout's SMA-50/SMA-200 trend label."""
+    if sma_200 is None or sma_50 is None:
+        return "Neutral (Insufficient history for 200-day SMA)"
+    if price > sma_50 > sma_200:
+        return "Strong Uptrend (Bullish)"
+    if price < sma_50 < sma_200:
+        return "Strong Downtrend (Bearish)"
+    if sma_50 > sma_200:
+        return "Uptrend (Golden Cross)"
+    return "Downtrend (Death Cross)"
+
+
+def rsi_status(value: float) -> str:
+    if value > 70:
+        return "Overbought"
+    if value < 30:
+        return "Oversold"
+    return "Neutral"
+
+
+def last(series: np.ndarray) -> Optional[float]:
+    """Last value of a series as a float, or None if it is NaN/empty."""
+    if len(series) == 0 or np.isnan(series[-1]):
+        return None
+    return float(series[-1])
+
+
+def _round_or_none(values: np.ndarray, decimals: int = 2) -> List[Optional[float]]:
+    rounded = np.round(values, decimals)
+    return [None if np.isnan(v) else v for v in rounded.tolist()]
+
+
+def history_records(dates: Sequence[Any], closes: Sequence[float], tail: int = 100, sma_window: int = 50) -> List[Dict[str, Any]]:
+    """
+    Chart history ({date, price, sma_50}) for the last `tail` bars, built from
+    whole arrays instead of per-row DataFrame iteration.
+    """
+    x = as_array(closes)
+    sma_values = sma(x, sma_window)[-tail:]
+    prices = np.round(x[-tail:], 2).tolist()
+    date_strs = [str(d)[:10] for d in list(dates)[-tail:]]
+    sma_key = f"sma_{sma_window}"
+    return [
+        {"date": d, "price": p, sma_key: s}
+        for d, p, s in zip(date_strs, prices, _round_or_none(sma_values))
+    ]
+
+
+def compute_indicators(closes: Sequence[float]) -> Dict[str, Any]:
+    """
+    Full indicator snapshot for a close series: SMA/EMA, Wilder RSI, MACD,
+    Bollinger, annualized volatility, 52-week range and drawdown.
+    """
+    x = as_array(closes)
+    if len(x) == 0:
+        return {}
+
+    price = float(x[-1])
+    sma_50 = last(sma(x, 50))
+    sma_200 = last(sma(x, 200))
+    rsi_value = last(rsi(x, 14))
+    rsi_value = 50.0 if rsi_value is None else rsi_value
+    macd_line, signal_line, hist = macd(x)
+    bb_mid, bb_upper, bb_lower = bollinger(x)
+    vol = volatility(x)
+    range_info = range_52w(x)
+    dd = drawdown(x)
+
+    return {
+        "current_price": price,
+        "sma_20": last(sma(x, 20)),
+        "sma_50": sma_50,
+        "sma_200": sma_200,
+        "ema_20": last(ema(x, 20)),
+        "trend_signal": trend_from_sma(price, sma_50, sma_200),
+        "rsi_14": rsi_value,
+        "rsi_status": rsi_status(rsi_value),
+        "macd": last(macd_line),
+        "macd_signal": last(signal_line),
+        "macd_histogram": last(hist),
+        "bollinger_upper": last(bb_upper),
+        "bollinger_middle": last(bb_mid),
+        "bollinger_lower": last(bb_lower),
+        "volatility_raw": vol if vol is not None else 0.0,
+        "high_52w": range_info["high"],
+        "low_52w": range_info["low"],
+        "pct_from_52w_high": range_info["pct_from_high"],
+        "max_drawdown_pct": dd["max_drawdown_pct"],
+        "current_drawdown_pct": dd["current_drawdown_pct"],
+        "price_change_1d": pct_change(x, 1),
+        "price_change_5d": pct_change(x, 5),
+    }
+
+
+# ============== Incremental State ==============
+
+def _ema_state() -> Dict[str, Any]:
+    return {"value": None, "seed": 0.0, "count": 0}
+
+
+def _ema_step(state: Dict[str, Any], x: float, span: int, alpha: Optional[float] = None) -> Dict[str, Any]:
+    """One step of an SMA-seeded exponential average (same seeding as ema())."""
+    alpha = 2.0 / (span + 1) if alpha is None else alpha
+    count = state["count"] + 1
+    if state["value"] is not None:
+        return {"value": alpha * x + (1.0 - alpha) * state["value"], "seed": state["seed"], "count": count}
+    seed = state["seed"] + x
+    return {"value": seed / span if count == span else None, "seed": seed, "count": count}
+
+
+class IndicatorState:
+    """
+    Streaming indicator state for one symbol: rolling SMA sums, EMA/MACD and
+    Wilder RSI recurrences, Welford variance of daily returns over a rolling
+    year, monotonic queues for the 52-week range and the running drawdown.
+    add_bar() commits a closed bar in O(1); snapshot(price) evaluates a live
+    tick against the committed bars without changing them. snapshot() matches
+    compute_indicators() over the bars added (volatility over the last
+    TRADING_DAYS returns). to_dict()/from_dict() round-trip through JSON.
+    """
+
+    VERSION = 1
+    SMA_WINDOWS = (20, 50, 200)
+    EMA_SPANS = (12, 20, 26)
+    RSI_PERIOD = 14
+    BOLLINGER_WINDOW = 20
+    # Rolling sums are recomputed exactly this often to shed float drift
+    RESYNC_BARS = 1024
+
+    def __init__(self):
+        self.count = 0
+        self.last_date: Optional[str] = None
+        self._closes: deque = deque(maxlen=TRADING_DAYS)
+        self._sums = {w: 0.0 for w in self.SMA_WINDOWS}
+        self._sum_sq = 0.0
+        self._ema = {span: _ema_state() for span in self.EMA_SPANS}
+        self._signal = _ema_state()
+        self._gain = _ema_state()
+        self._loss = _ema_state()
+        self._returns: deque = deque(maxlen=TRADING_DAYS)
+        self._welford = [0, 0.0, 0.0]  # n, mean, M2
+        self._highs: deque = deque()  # (bar index, close), decreasing
+        self._lows: deque = deque()   # (bar index, close), increasing
+        self._peak: Optional[float] = None
+        self._max_dd = 0.0
+
+    @classmethod
+    def from_closes(cls, closes: Sequence[float], last_date: Optional[str] = None) -> "IndicatorState":
+        state = cls()
+        for close in as_array(closes).tolist():
+            state.add_bar(close)
+        state.last_date = last_date
+        return state
+
+    @property
+    def last_close(self) -> Optional[float]:
+        return self._closes[-1] if self._closes else None
+
+    # ============== Updates ==============
+
+    def _step(self, close: float) -> Dict[str, Any]:
+        """Scalar state after appending `close` (pure; deques are read only)."""
+        closes = self._closes
+        prev = closes[-1] if closes else None
+        step: Dict[str, Any] = {"sums": {}}
+        for w in self.SMA_WINDOWS:
+            leaving = closes[-w] if len(closes) >= w else 0.0
+            step["sums"][w] = self._sums[w] + close - leaving
+        leaving = closes[-self.BOLLINGER_WINDOW] if len(closes) >= self.BOLLINGER_WINDOW else 0.0
+        step["sum_sq"] = self._sum_sq + close * close - leaving * leaving
+
+        step["ema"] = {span: _ema_step(self._ema[span], close, span) for span in self.EMA_SPANS}
+        fast, slow = step["ema"][12]["value"], step["ema"][26]["value"]
+        step["macd"] = fast - slow if fast is not None and slow is not None else None
+        step["signal"] = _ema_step(self._signal, step["macd"], 9) if step["macd"] is not None else self._signal
+
+        step["gain"], step["loss"], step["return"] = self._gain, self._loss, None
+        step["welford"] = self._welford
+        if prev is not None:
+            delta = close - prev
+            alpha = 1.0 / self.RSI_PERIOD
+            step["gain"] = _ema_step(self._gain, max(delta, 0.0), self.RSI_PERIOD, alpha)
+            step["loss"] = _ema_step(self._loss, max(-delta, 0.0), self.RSI_PERIOD, alpha)
+            if prev > 0:
+                step["return"] = close / prev - 1.0
+                n, mean, m2 = self._welford
+                if len(self._returns) == self._returns.maxlen:
+                    n, mean, m2 = self._welford_remove(n, mean, m2, self._returns[0])
+                step["welford"] = self._welford_add(n, mean, m2, step["return"])
+
+        peak = close if self._peak is None else max(self._peak, close)
+        step["peak"] = peak
+        step["drawdown"] = (close / peak - 1.0) * 100 if peak > 0 else 0.0
+        step["max_dd"] = min(self._max_dd, step["drawdown"]) if self.count else step["drawdown"]
+        return step
+
+    @staticmethod
+    def _welford_add(n: int, mean: float, m2: float, x: float) -> List:
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        return [n, mean, m2 + delta * (x - mean)]
+
+    @staticmethod
+    def _welford_remove(n: int, mean: float, m2: float, x: float) -> List:
+        if n <= 1:
+            return [0, 0.0, 0.0]
+        n -= 1
+        delta = x - mean
+        mean -= delta / n
+        return [n, mean, max(m2 - delta * (x - mean), 0.0)]
+
+    def add_bar(self, close: float, date: Optional[str] = None):
+        """Commit a closed bar."""
+        close = float(close)
+        step = self._step(close)
+        self._sums = step["sums"]
+        self._sum_sq = step["sum_sq"]
+        self._ema = step["ema"]
+        self._signal = step["signal"]
+        self._gain, self._loss = step["gain"], step["loss"]
+        if step["return"] is not None:
+            self._returns.append(step["return"])
+            self._welford = step["welford"]
+        self._peak, self._max_dd = step["peak"], step["max_dd"]
+
+        index = self.count
+        while self._highs and self._highs[-1][1] <= close:
+            self._highs.pop()
+        self._highs.append((index, close))
+        while self._lows and self._lows[-1][1] >= close:
+            self._lows.pop()
+        self._lows.append((index, close))
+        for queue in (self._highs, self._lows):
+            while queue[0][0] <= index - TRADING_DAYS:
+                queue.popleft()
+
+        self._closes.append(close)
+        self.count += 1
+        if date is not None:
+            self.last_date = date
+        if self.count % self.RESYNC_BARS == 0:
+            self._resync()
+
+    def _resync(self):
+        """Recompute the rolling sums and variance exactly from the buffers."""
+        closes = list(self._closes)
+        self._sums = {w: float(sum(closes[-w:])) if len(closes) >= w else float(sum(closes)) for w in self.SMA_WINDOWS}
+        self._sum_sq = float(sum(c * c for c in closes[-self.BOLLINGER_WINDOW:]))
+        r = np.asarray(self._returns)
+        self._welford = [len(r), float(r.mean()), float(((r - r.mean()) ** 2).sum())] if len(r) else [0, 0.0, 0.0]
+
+    # ============== Snapshot ==============
+
+    def _window_extreme(self, queue: deque, index: int) -> Optional[float]:
+        """Committed extreme still inside the 52-week window ending at `index`."""
+        for i, value in queue:
+            if i > index - TRADING_DAYS:
+                return value
+        return None
+
+    def snapshot(self, price: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Indicator snapshot (compute_indicators() keys) for the committed bars,
+        or with `price` as a provisional latest bar (a live tick).
+        """
+        if price is None:
+            if not self.count:
+                return {}
+            price = self._closes[-1]
+            step = {
+                "sums": self._sums, "sum_sq": self._sum_sq, "ema": self._ema,
+                "macd": self._macd_value(), "signal": self._signal, "gain": self._gain,
+                "loss": self._loss, "welford": self._welford, "peak": self._peak,
+                "drawdown": (price / self._peak - 1.0) * 100 if self._peak and self._peak > 0 else 0.0,
+                "max_dd": self._max_dd,
+            }
+            n, prior = self.count, list(self._closes)[-6:-1]
+            high = self._window_extreme(self._highs, n - 1)
+            low = self._window_extreme(self._lows, n - 1)
+        else:
+            price = float(price)
+            step = self._step(price)
+            n, prior = self.count + 1, list(self._closes)[-5:]
+            high = max(price, self._window_extreme(self._highs, n - 1) or price)
+            low = min(price, self._window_extreme(self._lows, n - 1) or price)
+
+        def mean(window: int) -> Optional[float]:
+            return step["sums"][window] / window if n >= window else None
+
+        sma_20, sma_50, sma_200 = mean(20), mean(50), mean(200)
+        bb_upper = bb_lower = None
+        if sma_20 is not None:
+            std = np.sqrt(max(step["sum_sq"] / 20 - sma_20 * sma_20, 0.0))
+            bb_upper, bb_lower = sma_20 + 2.0 * std, sma_20 - 2.0 * std
+
+        gain, loss = step["gain"]["value"], step["loss"]["value"]
+        if gain is None:
+            rsi_value = 50.0
+        elif loss == 0:
+            rsi_value = 50.0 if gain == 0 else 100.0
+        else:
+            rsi_value = 100.0 - 100.0 / (1.0 + gain / loss)
+
+        vol_n, _, m2 = step["welford"]
+        vol = float(np.sqrt(m2 / (vol_n - 1)) * np.sqrt(TRADING_DAYS)) if vol_n >= 2 else 0.0
+
+        macd_value, signal_value = step["macd"], step["signal"]["value"]
+
+        def change(periods: int) -> float:
+            if len(prior) < periods or prior[-periods] == 0:
+                return 0.0
+            return float((price / prior[-periods] - 1.0) * 100)
+
+        return {
+            "current_price": price,
+            "sma_20": sma_20,
+            "sma_50": sma_50,
+            "sma_200": sma_200,
+            "ema_20": step["ema"][20]["value"],
+            "trend_signal": trend_from_sma(price, sma_50, sma_200),
+            "rsi_14": rsi_value,
+            "rsi_status": rsi_status(rsi_value),
+            "macd": macd_value,
+            "macd_signal": signal_value,
+            "macd_histogram": macd_value - signal_value if macd_value is not None and signal_value is not None else None,
+            "bollinger_upper": bb_upper,
+            "bollinger_middle": sma_20,
+            "bollinger_lower": bb_lower,
+            "volatility_raw": vol,
+            "high_52w": high,
+            "low_52w": low,
+            "pct_from_52w_high": (price - high) / high * 100 if high and high > 0 else 0.0,
+            "max_drawdown_pct": step["max_dd"],
+            "current_drawdown_pct": step["drawdown"],
+            "price_change_1d": change(1),
+            "price_change_5d": change(5),
+        }
+
+    def _macd_value(self) -> Optional[float]:
+        fast, slow = self._ema[12]["value"], self._ema[26]["value"]
+        return fast - slow if fast is not None and slow is not None else None
+
+    # ============== Serialization ==============
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.VERSION,
+            "count": self.count,
+            "last_date": self.last_date,
+            "closes": list(self._closes),
+            "sums": {str(w): v for w, v in self._sums.items()},
+            "sum_sq": self._sum_sq,
+            "ema": {str(span): state for span, state in self._ema.items()},
+            "signal": self._signal,
+            "gain": self._gain,
+            "loss": self._loss,
+            "returns": list(self._returns),
+            "welford": self._welford,
+            "highs": [list(item) for item in self._highs],
+            "lows": [list(item) for item in self._lows],
+            "peak": self._peak,
+            "max_dd": self._max_dd,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IndicatorState":
+        if data.get("version") != cls.VERSION:
+            raise ValueError(f"Unsupported indicator state version: {data.get('version')}")
+        state = cls()
+        state.count = data["count"]
+        state.last_date = data.get("last_date")
+        state._closes.extend(data["closes"])
+        state._sums = {int(w): v for w, v in data["sums"].items()}
+        state._sum_sq = data["sum_sq"]
+        state._ema = {int(span): s for span, s in data["ema"].items()}
+        state._signal = data["signal"]
+        state._gain, state._loss = data["gain"], data["loss"]
+        state._returns.extend(data["returns"])
+        state._welford = list(data["welford"])
+        state._highs.extend(tuple(item) for item in data["highs"])
+        state._lows.extend(tuple(item) for item in data["lows"])
+        state._peak, state._max_dd = data["peak"], data["max_dd"]
+        return state
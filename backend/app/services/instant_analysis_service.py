@@ -0,0 +1,178 @@
+"""
+Instant Analysis Service - Two-tier "instant then refined" analysis.
+Tier 1 answers immediately from the deterministic backtest heuristics plus
+Match Score (no LLM). Tier 2 runs the full LLM pipeline in the background and
+is delivered later under the same request ID (polling or SSE).
+"""
+import math
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from app.models.investor_dna import InvestorDNA, DEFAULT_INVESTOR_DNA
+from app.services.backtest_service import backtest_service
+from app.services.match_score_service import match_score_service
+from app.services.score_labels import get_score_label
+from app.services import indicators
+from app.core.logging import get_logger
+from app.core.tracing import start_trace
+
+logger = get_logger("instant_analysis")
+
+
+class InstantAnalysisService:
+    """
+    Builds heuristic instant results and tracks background refinement jobs.
+    """
+
+    # Finished jobs are kept this long for polling clients
+    JOB_TTL_SECONDS = 1800
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def build_instant_result(
+        self,
+        asset_id: str,
+        asset_data: Dict[str, Any],
+        investor_dna: Optional[InvestorDNA] = None
+    ) -> Dict[str, Any]:
+        """
+        Score an asset with the rule-based heuristic agents and Match Score.
+        Pure CPU work on already-collected Scout data (a few milliseconds).
+        """
+        from app.orchestrator import FinancialOrchestrator
+
+        if investor_dna is None:
+            investor_dna = DEFAULT_INVESTOR_DNA
+
+        start_time = time.time()
+        financials = asset_data.get("financials", {})
+        technicals = asset_data.get("technicals", {})
+
+        agent_results = backtest_service.run_heuristic_agents(
+            financials, self._to_heuristic_technicals(technicals)
+        )
+        for result in agent_results.values():
+            result["score_label"] = get_score_label(int(result.get("score", 50)))
+            result["fallback_used"] = True
+            result["analysis"] = "Instant heuristic estimate (refined LLM analysis pending)"
+
+        match_result = match_score_service.calculate_match_score(
+            agent_results=agent_results,
+            asset_data=asset_data,
+            investor_dna=investor_dna
+        )
+
+        return {
+            "orchestration_id": "instant_heuristic",
+            "tier": "instant",
+            "asset_id": asset_id,
+            "results": agent_results,
+            "match_score": match_result.match_score,
+            "match_result": FinancialOrchestrator.format_match_result(match_result),
+            "market_data": technicals,
+            "data_quality": asset_data.get("data_quality", {}),
+            "compute_ms": round((time.time() - start_time) * 1000, 2)
+        }
+
+    def _to_heuristic_technicals(self, technicals: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Adapt Scout technicals to the shape the backtest heuristics expect:
+        daily (not annualized) volatility and an SMA-20 derived from history.
+        """
+        adapted = dict(technicals)
+
+        volatility = technicals.get("volatility_raw")
+        if isinstance(volatility, (int, float)):
+            adapted["volatility_raw"] = volatility / math.sqrt(252)
+
+        prices = [h.get("price") or h.get("close") or h.get("Close") for h in technicals.get("history", [])]
+        prices = [p for p in prices if isinstance(p, (int, float))]
+        if len(prices) >= 20 and not adapted.get("sma_20"):
+            adapted["sma_20"] = indicators.last(indicators.sma(prices, 20))
+
+        return adapted
+
+    # ============== Refinement Jobs ==============
+
+    def create_job(self, asset_id: str, instant_result: Dict[str, Any]) -> str:
+        """Register a refinement job and return its request ID."""
+        request_id = str(uuid.uuid4())[:8]
+        with self._lock:
+            self._purge_expired()
+            self._jobs[request_id] = {
+                "request_id": request_id,
+                "asset_id": asset_id,
+                "status": "pending",
+                "instant": instant_result,
+                "refined": None,
+                "error": None,
+                "created_at": datetime.now().isoformat(),
+                "completed_at": None,
+                "_finished_at": None
+            }
+        return request_id
+
+    def run_refinement(
+        self,
+        request_id: str,
+        asset_id: str,
+        investor_dna: Optional[InvestorDNA] = None,
+        deadline_seconds: Optional[float] = None
+    ):
+        """Run the full LLM pipeline for a job (called off the request thread)."""
+        from app.orchestrator import orchestrator
+
+        self._update_job(request_id, status="processing")
+        try:
+            with start_trace("analyze.refine", asset_id=asset_id, request_id=request_id):
+                orchestrator.ingest_asset(asset_id)
+                refined = orchestrator.retrieve_context(
+                    query="comprehensive analysis",
+                    asset_id=asset_id,
+                    investor_dna=investor_dna,
+                    deadline_seconds=deadline_seconds
+                )
+            refined["tier"] = "refined"
+            refined["request_id"] = request_id
+            self._update_job(request_id, status="completed", refined=refined)
+            logger.info(f"Refined analysis ready for {asset_id} ({request_id})")
+        except Exception as e:
+            logger.error(f"Refined analysis failed for {asset_id} ({request_id}): {e}")
+            self._update_job(request_id, status="failed", error=str(e))
+
+    def get_job(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """Get the public view of a job, or None if unknown/expired."""
+        with self._lock:
+            job = self._jobs.get(request_id)
+            if not job:
+                return None
+            return {k: v for k, v in job.items() if not k.startswith("_")}
+
+    def _update_job(self, request_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(request_id)
+            if not job:
+                return
+            job.update(fields)
+            if fields.get("status") in ("completed", "failed"):
+                job["completed_at"] = datetime.now().isoformat()
+                job["_finished_at"] = time.time()
+
+    def _purge_expired(self):
+        """Drop finished jobs older than JOB_TTL_SECONDS (caller holds the lock)."""
+        now = time.time()
+        expired = [
+            rid for rid, job in self._jobs.items()
+            if job["_finished_at"] and now - job["_finished_at"] > self.JOB_TTL_SECONDS
+        ]
+        for rid in expired:
+            del self._jobs[rid]
+
+
+# Singleton instance
+instant_analysis_service = InstantAnalysisService()
@@ -0,0 +1,116 @@
+"""
+Macro Snapshot Service - Shared per-region macro indicators.
+Macro data (VIX, index moves, yields, FRED series, RBI rates) is identical for
+every asset in a region, so one US and one INDIA snapshot are kept in memory
+and refreshed on a schedule in the background instead of per analysis.
+"""
+import copy
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("macro_snapshot")
+
+REGIONS = ("US", "INDIA")
+
+
+def region_for_asset(asset_id: Optional[str]) -> str:
+    """Map an asset to its macro region (.NS/.BO -> INDIA, else US)."""
+    return "INDIA" if asset_id and asset_id.upper().endswith((".NS", ".BO")) else "US"
+
+
+class MacroSnapshotService:
+    """
+    Holds the latest macro snapshot per region with a background refresher.
+    Reads are a dict copy; a region with no usable snapshot is fetched inline
+    once (concurrent callers wait on the same fetch).
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        # Snapshots older than this are refetched inline rather than served
+        self.max_age_seconds = refresh_seconds * 3
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._region_locks = {region: threading.Lock() for region in REGIONS}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get_snapshot(self, region: str) -> Dict[str, Any]:
+        """Get the macro snapshot for a region (fetched inline if missing or too old)."""
+        region = region if region in REGIONS else "US"
+        snapshot = self.peek(region)
+        if snapshot is not None:
+            return snapshot
+
+        with self._region_locks[region]:
+            # Another caller may have refreshed while we waited
+            snapshot = self.peek(region)
+            if snapshot is not None:
+                return snapshot
+            return copy.deepcopy(self._refresh(region))
+
+    def peek(self, region: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of the current snapshot without fetching, or None."""
+        with self._lock:
+            snapshot = self._snapshots.get(region)
+            if snapshot is None or time.time() - self._fetched_at[region] > self.max_age_seconds:
+                return None
+            return copy.deepcopy(snapshot)
+
+    def refresh_all(self):
+        """Refresh every region (used by the background loop)."""
+        for region in REGIONS:
+            with self._region_locks[region]:
+                try:
+                    self._refresh(region)
+                except Exception as e:
+                    logger.warning(f"Macro refresh failed for {region}: {e}")
+
+    def _refresh(self, region: str) -> Dict[str, Any]:
+        from app.agents.scout import ScoutAgent
+
+        snapshot = ScoutAgent._fetch_macro_snapshot(region)
+        with self._lock:
+            self._snapshots[region] = snapshot
+            self._fetched_at[region] = time.time()
+        logger.info(f"Macro snapshot refreshed for {region}")
+        return snapshot
+
+    # ============== Background Refresh ==============
+
+    def start(self):
+        """Start the background refresher (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="macro-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.refresh_all()
+            self._stop_event.wait(self.refresh_seconds)
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            return {
+                "refresh_seconds": self.refresh_seconds,
+                "running": bool(self._thread and self._thread.is_alive()),
+                "regions": {
+                    region: {"age_seconds": round(now - self._fetched_at[region], 1)}
+                    for region in self._snapshots
+                }
+            }
+
+
+# Singleton instance
+macro_snapshot_service = MacroSnapshotService(settings.MACRO_REFRESH_SECONDS)
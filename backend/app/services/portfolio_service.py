@@ -74,6 +74,14 @@ class PortfolioService:
             
             results = {}
             from app.orchestrator import orchestrator
+            from app.agents.scout import scout_agent
+            
+            # Warm Scout's cache for every ticker with a few bulk calls, so the
+            # per-ticker ingestion below is served from cache
+            try:
+                scout_agent.collect_batch(tickers)
+            except Exception as e:
+                print(f"[Portfolio] [WARN] Batch collection failed, falling back to per-ticker: {e}")
             
             for ticker in tickers:
                 try:
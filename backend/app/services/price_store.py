@@ -0,0 +1,370 @@
+"""
+Price Store - Local daily OHLCV warehouse.
+Each symbol's bars live in one memory-mappable NumPy file
+(data/ohlcv/<SYMBOL>.npy, a structured array sorted by date). Reads map the
+file and copy out only the requested slice, so no mapping outlives the call
+and the file can be replaced (Windows refuses to replace a mapped file).
+Writes only fetch the part of the requested window that isn't stored yet and
+replace the file atomically, so repeated history reads cost disk I/O instead
+of HTTP calls.
+"""
+import json
+import os
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.tracing import trace_span
+
+logger = get_logger("price_store")
+
+BAR_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+DateLike = Union[str, date, datetime, np.datetime64, None]
+
+# yahooquery-style periods the store can serve (calendar days back from today)
+PERIOD_DAYS = {
+    "5d": 7, "1mo": 31, "3mo": 92, "6mo": 183,
+    "1y": 366, "2y": 731, "5y": 1827, "10y": 3653,
+}
+
+
+def _to_day(value: DateLike) -> Optional[np.datetime64]:
+    if value is None:
+        return None
+    return np.datetime64(str(value)[:10], "D")
+
+
+def period_start(period: str) -> Optional[date]:
+    """Start date for a daily chart period, or None if the store can't serve it."""
+    if period == "ytd":
+        return date(date.today().year, 1, 1)
+    days = PERIOD_DAYS.get(period)
+    return date.today() - timedelta(days=days) if days else None
+
+
+def chart_rows(bars: np.ndarray) -> List[Dict[str, Any]]:
+    """Candlestick rows ({date, timestamp, open, high, low, close, volume}) from bars."""
+    dates = bars["date"].astype(str).tolist()
+    timestamps = (bars["date"].astype("datetime64[ms]").astype(np.int64)).tolist()
+    prices = {field: np.round(bars[field], 2).tolist() for field in ("open", "high", "low", "close")}
+    volumes = np.nan_to_num(bars["volume"]).astype(np.int64).tolist()
+    return [
+        {"date": d, "timestamp": ts, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for d, ts, o, h, l, c, v in zip(
+            dates, timestamps, prices["open"], prices["high"], prices["low"], prices["close"], volumes
+        )
+    ]
+
+
+class PriceStore:
+    """
+    Per-symbol daily bar storage with incremental sync from yahooquery.
+    """
+
+    def __init__(self, root: str, refresh_seconds: float):
+        self.root = root
+        self.refresh_seconds = refresh_seconds
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    # ============== Reads ==============
+
+    def get_bars(self, symbol: str, start: DateLike = None, end: DateLike = None, sync: bool = True) -> np.ndarray:
+        """
+        Bars for [start, end], copied out of the memory-mapped file. Syncs
+        missing/stale parts of the window from upstream first unless
+        sync=False. Returns an empty array if nothing is available.
+        """
+        start_day, end_day = _to_day(start), _to_day(end)
+        if sync:
+            self.sync(symbol, start_day, end_day)
+
+        # Under the symbol lock so no writer replaces the file while it is mapped
+        with self._lock_for(symbol):
+            bars = self._load(symbol)
+            if bars is None:
+                return np.empty(0, dtype=BAR_DTYPE)
+            lo = 0 if start_day is None else int(np.searchsorted(bars["date"], start_day, side="left"))
+            hi = len(bars) if end_day is None else int(np.searchsorted(bars["date"], end_day, side="right"))
+            return np.array(bars[lo:hi])
+
+    def get_frame(self, symbol: str, start: DateLike = None, end: DateLike = None, sync: bool = True) -> pd.DataFrame:
+        """Bars as a DataFrame indexed by date (open/high/low/close/volume)."""
+        bars = self.get_bars(symbol, start, end, sync)
+        return pd.DataFrame(
+            {field: bars[field] for field in PRICE_FIELDS},
+            index=pd.DatetimeIndex(bars["date"].astype("datetime64[ns]"), name="date")
+        )
+
+    # ============== Sync ==============
+
+    def sync(self, symbol: str, start: Optional[np.datetime64] = None, end: Optional[np.datetime64] = None):
+        """
+        Make sure [start, end] is stored. The stored range is one contiguous
+        span, so only the missing prefix (start before it) and suffix (end
+        after it) are fetched. An open end means "up to today": the last
+        stored bar is refetched once the refresh interval has passed.
+        """
+        today = np.datetime64(date.today(), "D")
+        if start is None:
+            start = today - np.timedelta64(365, "D")
+        open_ended = end is None or end >= today
+        end = today if open_ended else end
+
+        with self._lock_for(symbol):
+            bars = self._load(symbol, copy=True)
+            meta = self._load_meta(symbol)
+            covered_from, covered_to = self._coverage(meta)
+
+            windows = []
+            if bars is None or len(bars) == 0 or covered_from is None:
+                windows.append((start, end))
+            else:
+                if start < covered_from:
+                    windows.append((start, covered_from))
+                if end > covered_to:
+                    windows.append((covered_to, end))
+                elif open_ended and time.time() - meta.get("synced_at", 0) > self.refresh_seconds:
+                    # Refetch the last stored bar too; it may have been a partial day
+                    windows.append((min(bars["date"][-1], covered_to), end))
+
+            if not windows:
+                return
+
+            fetched_any = False
+            for fetch_from, fetch_to in windows:
+                with trace_span("price_store.fetch", symbol=symbol):
+                    fetched = self._download(symbol, fetch_from, fetch_to)
+                if len(fetched):
+                    bars = self._merge(bars, fetched)
+                    fetched_any = True
+
+            if bars is None or len(bars) == 0:
+                return  # Unknown symbol or provider down; nothing to record
+            if fetched_any:
+                self._save(symbol, bars)
+                meta["requested_from"] = str(start if covered_from is None else min(start, covered_from))
+                meta["requested_to"] = str(end if covered_to is None else max(end, covered_to))
+            if open_ended:
+                meta["synced_at"] = time.time()
+            self._save_meta(symbol, meta)
+
+    @staticmethod
+    def _coverage(meta: Dict[str, Any]):
+        """(first, last) day of the stored span; older metadata only has synced_at."""
+        covered_from = _to_day(meta.get("requested_from"))
+        covered_to = _to_day(meta.get("requested_to"))
+        if covered_to is None and meta.get("synced_at"):
+            covered_to = np.datetime64(date.fromtimestamp(meta["synced_at"]), "D")
+        if covered_from is None or covered_to is None:
+            return None, None
+        return covered_from, covered_to
+
+    def sync_many(self, symbols: List[str], batch_size: int = 50) -> int:
+        """
+        Bring many symbols up to date with bulk history calls: a year for
+        symbols never stored, and for stale ones everything from their last
+        stored bar (one call per distinct start date, so a long gap is filled
+        rather than skipped). Returns the number of symbols merged.
+        """
+        from app.core.providers import Ticker
+
+        now = time.time()
+        backfill, stale = [], {}
+        for symbol in dict.fromkeys(symbols):
+            meta = self._load_meta(symbol)
+            if meta.get("requested_from") is None:
+                backfill.append(symbol)
+            elif now - meta.get("synced_at", 0) > self.refresh_seconds:
+                resume = self._resume_day(symbol, meta)
+                if resume is None:
+                    backfill.append(symbol)
+                else:
+                    stale.setdefault(str(resume), []).append(symbol)
+
+        # The provider's end date is exclusive
+        end = str(np.datetime64(date.today(), "D") + np.timedelta64(1, "D"))
+        requests = [({"period": "1y"}, backfill)]
+        requests += [({"start": start, "end": end}, group) for start, group in sorted(stale.items())]
+
+        merged = 0
+        for params, group in requests:
+            for i in range(0, len(group), batch_size):
+                chunk = group[i:i + batch_size]
+                try:
+                    with trace_span("price_store.bulk_fetch", symbols=len(chunk), **params):
+                        history = Ticker(chunk, asynchronous=True).history(interval="1d", **params)
+                except Exception as e:
+                    logger.warning(f"Bulk history download failed for {len(chunk)} symbols: {e}")
+                    continue
+                if not isinstance(history, pd.DataFrame) or history.empty or "symbol" not in history.index.names:
+                    continue
+                fetched = set(history.index.get_level_values("symbol"))
+                for symbol in chunk:
+                    if symbol in fetched:
+                        self.merge_frame(symbol, history.xs(symbol, level="symbol"))
+                        merged += 1
+        return merged
+
+    def _resume_day(self, symbol: str, meta: Dict[str, Any]) -> Optional[np.datetime64]:
+        """
+        First day to refetch when bringing a stored symbol up to date: its last
+        stored bar (possibly a partial day). None if nothing is stored.
+        """
+        covered_to = self._coverage(meta)[1]
+        with self._lock_for(symbol):
+            bars = self._load(symbol)
+            if bars is None or len(bars) == 0 or covered_to is None:
+                return None
+            return min(bars["date"][-1], covered_to)
+
+    def merge_frame(self, symbol: str, frame: pd.DataFrame):
+        """Merge an already-fetched daily history frame (e.g. from a bulk call)."""
+        fetched = self._frame_to_bars(frame)
+        if not len(fetched):
+            return
+        with self._lock_for(symbol):
+            merged = self._merge(self._load(symbol, copy=True), fetched)
+            self._save(symbol, merged)
+            meta = self._load_meta(symbol)
+            first, last = fetched["date"][0], fetched["date"][-1]
+            covered_from, covered_to = self._coverage(meta)
+            # Only extend the stored span (and count as synced) if the frame is
+            # contiguous with it; otherwise the gap must still be fetched
+            joined = covered_from is None or first <= covered_to
+            if covered_from is None:
+                meta["requested_from"], meta["requested_to"] = str(first), str(last)
+            elif joined:
+                meta["requested_from"] = str(min(first, covered_from))
+                meta["requested_to"] = str(max(last, covered_to))
+            if joined and last >= np.datetime64(date.today() - timedelta(days=3), "D"):
+                meta["synced_at"] = time.time()
+            self._save_meta(symbol, meta)
+
+    @staticmethod
+    def _merge(bars: Optional[np.ndarray], fetched: np.ndarray) -> Optional[np.ndarray]:
+        """Stored bars before the first fetched date, then the fetched bars."""
+        if bars is None or len(bars) == 0:
+            return fetched if len(fetched) else bars
+        if len(fetched) == 0:
+            return bars
+        first, last = fetched["date"][0], fetched["date"][-1]
+        before = bars[bars["date"] < first]
+        after = bars[bars["date"] > last]
+        return np.concatenate([before, fetched, after])
+
+    def _download(self, symbol: str, start: np.datetime64, end: np.datetime64) -> np.ndarray:
+        """Daily bars for [start, end] (inclusive)."""
+        from app.core.providers import Ticker
+
+        try:
+            # The provider's end date is exclusive
+            end_exclusive = str(end + np.timedelta64(1, "D"))
+            history = Ticker(symbol).history(start=str(start), end=end_exclusive, interval="1d")
+        except Exception as e:
+            logger.warning(f"History download failed for {symbol}: {e}")
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        if not isinstance(history, pd.DataFrame) or history.empty:
+            return np.empty(0, dtype=BAR_DTYPE)
+        if "symbol" in history.index.names:
+            history = history.xs(symbol, level="symbol") if symbol in history.index.get_level_values("symbol") else history.iloc[0:0]
+        return self._frame_to_bars(history)
+
+    @staticmethod
+    def _frame_to_bars(frame: pd.DataFrame) -> np.ndarray:
+        """Convert a yahooquery/yfinance daily frame into sorted, de-duplicated bars."""
+        if frame is None or frame.empty:
+            return np.empty(0, dtype=BAR_DTYPE)
+        columns = {c.lower(): c for c in frame.columns}
+        if "close" not in columns:
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        # Daily indexes mix date objects and tz-aware timestamps (today's bar)
+        days = np.array([str(d)[:10] for d in frame.index], dtype="datetime64[D]")
+        bars = np.empty(len(frame), dtype=BAR_DTYPE)
+        bars["date"] = days
+        close = frame[columns["close"]].to_numpy(dtype=float)
+        for field in PRICE_FIELDS:
+            source = columns.get(field)
+            if source:
+                bars[field] = frame[source].to_numpy(dtype=float)
+            else:
+                # Close-only frames: flat candles, no volume
+                bars[field] = 0.0 if field == "volume" else close
+
+        bars = bars[~np.isnan(bars["close"])]
+        # Keep the last bar per day, sorted by date
+        _, last_idx = np.unique(bars["date"][::-1], return_index=True)
+        return bars[len(bars) - 1 - last_idx]
+
+    # ============== Files ==============
+
+    def _path(self, symbol: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9.\-]", "_", symbol.upper())
+        return os.path.join(self.root, f"{safe}.npy")
+
+    def _lock_for(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(symbol.upper(), threading.Lock())
+
+    def _load(self, symbol: str, copy: bool = False) -> Optional[np.ndarray]:
+        """
+        The symbol's bars as a read-only memmap, or an in-memory array with
+        copy=True (required before the file is rewritten).
+        """
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path) if copy else np.load(path, mmap_mode="r")
+        except Exception as e:
+            logger.warning(f"Unreadable price file {path}: {e}")
+            return None
+
+    def _save(self, symbol: str, bars: np.ndarray):
+        path = self._path(symbol)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(bars, dtype=BAR_DTYPE))
+        # Atomic swap; callers never hold a mapping of the file across this
+        os.replace(tmp_path, path)
+
+    def _load_meta(self, symbol: str) -> Dict[str, Any]:
+        try:
+            with open(self._path(symbol)[:-len(".npy")] + ".json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_meta(self, symbol: str, meta: Dict[str, Any]):
+        path = self._path(symbol)[:-len(".npy")] + ".json"
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+price_store = PriceStore(
+    os.path.join(BACKEND_DIR, settings.PRICE_STORE_DIR),
+    settings.PRICE_STORE_REFRESH_SECONDS
+)
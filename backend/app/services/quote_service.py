@@ -0,0 +1,199 @@
+"""
+Quote Service - Lightweight multi-symbol quotes.
+Price, change, volume, 52-week range and P/E for any number of symbols from
+one batched yahooquery call (price + summaryDetail modules), with crypto
+symbols going through one CoinGecko /coins/markets call. Quotes are cached
+in memory for a few seconds (errors for a little longer, so pollers don't
+re-request invalid symbols every interval), and expired entries are evicted,
+so watchlists and polling clients don't run the full Scout pipeline or hit
+Yahoo per symbol.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.providers import Ticker
+from app.core.tracing import trace_span
+
+logger = get_logger("quotes")
+
+QUOTE_MODULES = ["price", "summaryDetail"]
+
+
+def _num(value: Any) -> Optional[float]:
+    """Yahoo fields are plain numbers or {"raw": ..., "fmt": ...} dicts."""
+    if isinstance(value, dict):
+        value = value.get("raw")
+    return value if isinstance(value, (int, float)) else None
+
+
+def format_market_cap(value: Optional[float]) -> str:
+    if not value:
+        return "N/A"
+    if value >= 1e12:
+        return f"{value / 1e12:.2f}T"
+    if value >= 1e9:
+        return f"{value / 1e9:.2f}B"
+    if value >= 1e6:
+        return f"{value / 1e6:.2f}M"
+    return str(value)
+
+
+class QuoteService:
+    """
+    Batched quote fetcher with a short in-memory TTL per symbol.
+    """
+
+    # Upper bound on symbols per request (one upstream batch)
+    MAX_SYMBOLS = 50
+    # Unknown symbols and failed batches are retried after this long
+    ERROR_TTL_SECONDS = 30
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._quotes: Dict[str, Dict[str, Any]] = {}
+        self._expires_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "upstream_calls": 0, "evictions": 0}
+
+    def get_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Quotes keyed by symbol (upper-cased, de-duplicated, in request order).
+        Symbols that can't be quoted map to {"symbol", "error"}.
+        """
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        now = time.time()
+        quotes: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for symbol in symbols:
+                if now < self._expires_at.get(symbol, 0):
+                    quotes[symbol] = self._quotes[symbol]
+            self._stats["hits"] += len(quotes)
+            self._stats["misses"] += len(symbols) - len(quotes)
+
+        missing = [s for s in symbols if s not in quotes]
+        if missing:
+            fetched = self._fetch(missing)
+            fetched_at = time.time()
+            with self._lock:
+                self._evict_expired(fetched_at)
+                for symbol, quote in fetched.items():
+                    ttl = self.ERROR_TTL_SECONDS if "error" in quote else self.ttl_seconds
+                    self._quotes[symbol] = quote
+                    self._expires_at[symbol] = fetched_at + ttl
+            quotes.update(fetched)
+
+        return {symbol: quotes[symbol] for symbol in symbols}
+
+    def _evict_expired(self, now: float):
+        """Drop expired quotes (caller holds the lock)."""
+        expired = [symbol for symbol, expires_at in self._expires_at.items() if expires_at <= now]
+        for symbol in expired:
+            del self._quotes[symbol], self._expires_at[symbol]
+        self._stats["evictions"] += len(expired)
+
+    def get_quote(self, symbol: str) -> Dict[str, Any]:
+        return next(iter(self.get_quotes([symbol]).values()))
+
+    def _fetch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        from app.services.coingecko_service import coingecko_service
+
+        crypto = [s for s in symbols if s.startswith("CRYPTO:") or coingecko_service.is_crypto(s)]
+        equities = [s for s in symbols if s not in crypto]
+        quotes: Dict[str, Dict[str, Any]] = {}
+        if equities:
+            quotes.update(self._fetch_equities(equities))
+        if crypto:
+            quotes.update(self._fetch_crypto(crypto))
+        return quotes
+
+    def _fetch_equities(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            self._stats["upstream_calls"] += 1
+        try:
+            with trace_span("quotes.yahooquery", symbols=len(symbols)):
+                modules = Ticker(symbols, asynchronous=True).get_modules(QUOTE_MODULES)
+        except Exception as e:
+            logger.warning(f"Quote batch failed for {len(symbols)} symbols: {e}")
+            return {s: {"symbol": s, "error": str(e)} for s in symbols}
+
+        quotes = {}
+        for symbol in symbols:
+            data = modules.get(symbol) if isinstance(modules, dict) else None
+            if not isinstance(data, dict) or not isinstance(data.get("price"), dict):
+                quotes[symbol] = {"symbol": symbol, "error": str(data) if data else "No quote data"}
+                continue
+            quotes[symbol] = self._equity_quote(symbol, data["price"], data.get("summaryDetail") or {})
+        return quotes
+
+    @staticmethod
+    def _equity_quote(symbol: str, price: Dict[str, Any], detail: Dict[str, Any]) -> Dict[str, Any]:
+        last = _num(price.get("regularMarketPrice"))
+        prev_close = _num(price.get("regularMarketPreviousClose")) or _num(detail.get("previousClose"))
+        change = ((last - prev_close) / prev_close) * 100 if last is not None and prev_close else 0
+        currency = price.get("currency") or detail.get("currency") or "USD"
+        if symbol.endswith((".NS", ".BO")):
+            currency = "INR"
+        market_time = price.get("regularMarketTime")
+        return {
+            "symbol": symbol,
+            "price": last if last is not None else 0,
+            "previous_close": prev_close,
+            "change": round(change, 2),
+            "volume": _num(price.get("regularMarketVolume")) or _num(detail.get("volume")) or 0,
+            "day_high": _num(price.get("regularMarketDayHigh")),
+            "day_low": _num(price.get("regularMarketDayLow")),
+            "high52w": _num(detail.get("fiftyTwoWeekHigh")),
+            "low52w": _num(detail.get("fiftyTwoWeekLow")),
+            "pe_ratio": _num(detail.get("trailingPE")),
+            "market_cap": format_market_cap(_num(price.get("marketCap")) or _num(detail.get("marketCap"))),
+            "currency": currency,
+            "company_name": price.get("longName") or price.get("shortName") or symbol,
+            "market_state": price.get("marketState"),
+            "market_time": str(market_time) if market_time is not None else None,
+        }
+
+    def _fetch_crypto(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        from app.services.coingecko_service import coingecko_service
+
+        with self._lock:
+            self._stats["upstream_calls"] += 1
+        ids = {symbol: coingecko_service.coin_id(symbol) for symbol in symbols}
+        markets = coingecko_service.get_markets(list(ids.values()))
+        quotes = {}
+        for symbol, coin_id in ids.items():
+            market = markets.get(coin_id)
+            if not market or "error" in market:
+                quotes[symbol] = {"symbol": symbol, "error": (market or {}).get("error", f"Coin '{coin_id}' not found")}
+                continue
+            quotes[symbol] = {
+                "symbol": symbol,
+                "price": market.get("current_price") or 0,
+                "previous_close": None,
+                "change": round(market.get("price_change_percentage_24h") or 0, 2),
+                "volume": market.get("total_volume") or 0,
+                "day_high": market.get("high_24h"),
+                "day_low": market.get("low_24h"),
+                # CoinGecko's markets call has no 52-week range, only all-time extremes
+                "high52w": None,
+                "low52w": None,
+                "all_time_high": market.get("ath"),
+                "all_time_low": market.get("atl"),
+                "pe_ratio": None,
+                "market_cap": format_market_cap(market.get("market_cap")),
+                "currency": "USD",
+                "company_name": market.get("name") or symbol,
+                "market_state": "REGULAR",
+                "market_time": market.get("last_updated"),
+            }
+        return quotes
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"ttl_seconds": self.ttl_seconds, "cached": len(self._quotes), **self._stats}
+
+
+# Singleton instance
+quote_service = QuoteService(ttl_seconds=settings.QUOTE_CACHE_SECONDS)
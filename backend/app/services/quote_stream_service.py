@@ -0,0 +1,228 @@
+"""
+Quote Stream Service - Live quote fan-out to WebSocket/SSE subscribers.
+Clients subscribe to symbols; one background poller refreshes the union of
+all subscribed symbols through the batched quote service on an interval and
+pushes changed quotes to every subscriber of that symbol. Upstream load
+scales with distinct symbols, not with the number of viewers.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("quote_stream")
+
+# Fields whose change triggers a push
+_CHANGE_FIELDS = ("price", "change", "volume", "error")
+
+# Live indicators attached to pushed quotes when the symbol has a state
+_LIVE_INDICATORS = ("rsi_14", "sma_50", "sma_200", "trend_signal", "pct_from_52w_high")
+
+
+class QuoteSubscriber:
+    """
+    One streaming client: its symbols and a bounded event queue owned by
+    the client's event loop (the poller thread hands events over safely).
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.symbols: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self._loop = loop
+
+    def push(self, event: Dict[str, Any]):
+        """Thread-safe enqueue; a slow client loses its oldest events, not the poller."""
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # Client's loop already closed
+
+    def _put(self, event: Dict[str, Any]):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class QuoteStreamService:
+    """
+    Subscription registry plus a single batched poller thread.
+    """
+
+    def __init__(self, interval_seconds: float, max_symbols_per_client: int, max_queue: int = 100):
+        self.interval_seconds = interval_seconds
+        self.max_symbols_per_client = max_symbols_per_client
+        self.max_queue = max_queue
+        self._subscribers: Set[QuoteSubscriber] = set()
+        self._by_symbol: Dict[str, Set[QuoteSubscriber]] = {}
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"polls": 0, "symbols_polled": 0, "events_sent": 0}
+
+    # ============== Subscriptions ==============
+
+    def subscribe(self, symbols: Iterable[str]) -> QuoteSubscriber:
+        """Register a client (call from its event loop) and start the poller if needed."""
+        subscriber = QuoteSubscriber(asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        self.add_symbols(subscriber, symbols)
+        self.start()
+        return subscriber
+
+    def add_symbols(self, subscriber: QuoteSubscriber, symbols: Iterable[str]) -> List[str]:
+        """
+        Subscribe to more symbols (capped per client). Last known quotes are
+        sent right away; unknown symbols trigger an immediate poll.
+        """
+        added = []
+        with self._lock:
+            for symbol in dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()):
+                if symbol in subscriber.symbols:
+                    continue
+                if len(subscriber.symbols) >= self.max_symbols_per_client:
+                    break
+                subscriber.symbols.add(symbol)
+                self._by_symbol.setdefault(symbol, set()).add(subscriber)
+                added.append(symbol)
+            snapshot = [self._last[s] for s in added if s in self._last]
+        for quote in snapshot:
+            subscriber.push({"type": "quote", "quote": quote})
+        if len(snapshot) < len(added):
+            self._wake.set()
+        return added
+
+    def remove_symbols(self, subscriber: QuoteSubscriber, symbols: Iterable[str]):
+        with self._lock:
+            for symbol in {s.strip().upper() for s in symbols if s}:
+                subscriber.symbols.discard(symbol)
+                self._detach(subscriber, symbol)
+
+    def unsubscribe(self, subscriber: QuoteSubscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            for symbol in subscriber.symbols:
+                self._detach(subscriber, symbol)
+            subscriber.symbols.clear()
+
+    def _detach(self, subscriber: QuoteSubscriber, symbol: str):
+        """Drop subscriber from a symbol (caller holds the lock)."""
+        watchers = self._by_symbol.get(symbol)
+        if watchers is not None:
+            watchers.discard(subscriber)
+            if not watchers:
+                del self._by_symbol[symbol]
+                self._last.pop(symbol, None)
+
+    # ============== Polling ==============
+
+    def poll_once(self) -> int:
+        """
+        Refresh every subscribed symbol with batched quote calls and push
+        changed quotes to their subscribers (with live indicators evaluated
+        against the symbol's incremental state, if any). Returns the number
+        of pushes.
+        """
+        from app.services.indicator_state_service import indicator_states
+        from app.services.quote_service import quote_service
+
+        with self._lock:
+            symbols = list(self._by_symbol)
+        if not symbols:
+            return 0
+
+        batch_size = quote_service.MAX_SYMBOLS
+        quotes: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(symbols), batch_size):
+            try:
+                quotes.update(quote_service.get_quotes(symbols[i:i + batch_size]))
+            except Exception as e:
+                logger.warning(f"Quote stream poll failed: {e}")
+
+        # Pick changed quotes and copy their watchers under the lock; live
+        # indicators are evaluated outside it so a slow symbol state never
+        # blocks subscribe/unsubscribe on the event loop
+        changed = []
+        with self._lock:
+            self._stats["polls"] += 1
+            self._stats["symbols_polled"] += len(symbols)
+            for symbol, quote in quotes.items():
+                watchers = self._by_symbol.get(symbol)
+                if not watchers:
+                    continue
+                previous = self._last.get(symbol)
+                if previous is not None and all(previous.get(f) == quote.get(f) for f in _CHANGE_FIELDS):
+                    continue
+                self._last[symbol] = quote
+                changed.append((symbol, quote, list(watchers)))
+
+        pushes = []
+        enriched = []
+        for symbol, quote, watchers in changed:
+            live = indicator_states.live(symbol, quote.get("price")) if "error" not in quote else None
+            if live:
+                with_indicators = {**quote, "indicators": {k: live[k] for k in _LIVE_INDICATORS}}
+                enriched.append((symbol, quote, with_indicators))
+                quote = with_indicators
+            event = {"type": "quote", "quote": quote}
+            pushes.extend((subscriber, event) for subscriber in watchers)
+
+        with self._lock:
+            for symbol, quote, with_indicators in enriched:
+                # Skip symbols dropped (or re-polled) meanwhile
+                if self._last.get(symbol) is quote:
+                    self._last[symbol] = with_indicators
+            self._stats["events_sent"] += len(pushes)
+
+        for subscriber, event in pushes:
+            subscriber.push(event)
+        return len(pushes)
+
+    def start(self):
+        """Start the poller (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="quote-stream", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            self._wake.clear()
+            self.poll_once()
+            remaining = self.interval_seconds - (time.monotonic() - started)
+            if remaining > 0:
+                self._wake.wait(remaining)
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": bool(self._thread and self._thread.is_alive()),
+                "interval_seconds": self.interval_seconds,
+                "subscribers": len(self._subscribers),
+                "symbols": len(self._by_symbol),
+                "dropped_events": sum(s.dropped for s in self._subscribers),
+                **self._stats,
+            }
+
+
+# Singleton instance
+quote_stream_service = QuoteStreamService(
+    interval_seconds=settings.QUOTE_STREAM_INTERVAL_SECONDS,
+    max_symbols_per_client=settings.QUOTE_STREAM_MAX_SYMBOLS
+)
@@ -5,35 +5,14 @@ from typing import List, Dict, Any, Optional
 import uuid
 import hashlib
 from datetime import datetime
+from app.core.tracing import trace_span
+from app.services.embedding_service import embedding_service
 
-# Try to import sentence_transformers, fall back to mock if missing/fails
-try:
-    from sentence_transformers import SentenceTransformer
-    class LocalHuggingFaceEmbeddingFunction(EmbeddingFunction):
-        def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
-            self.model = SentenceTransformer(model_name)
-        
-        def __call__(self, input: Documents) -> Embeddings:
-            # Convert numpy array to list for Chroma
-            return self.model.encode(input).tolist()
-    
-    HAS_REAL_EMBEDDINGS = True
-    print("RAG Service: [OK] Successfully loaded sentence-transformers.")
-except ImportError:
-    HAS_REAL_EMBEDDINGS = False
-    print("RAG Service: [WARN] sentence-transformers not found. Using Mock embeddings.")
+class ServiceEmbeddingFunction(EmbeddingFunction):
+    """Chroma embedding function backed by the shared (lazily loaded, batching) embedding service."""
 
-class MockEmbeddingFunction(EmbeddingFunction):
     def __call__(self, input: Documents) -> Embeddings:
-        # Create a deterministic mock embedding based on text hash
-        embeddings = []
-        for text in input:
-            # Simple hash to float list of size 384 (standard size)
-            hash_val = int(hashlib.sha256(text.encode()).hexdigest(), 16)
-            # Create a simple vector pattern
-            vector = [(hash_val % (i + 1)) / (i + 1) for i in range(384)]
-            embeddings.append(vector)
-        return embeddings
+        return embedding_service.encode(input)
 
 
 class RAGService:
@@ -44,11 +23,9 @@ class RAGService:
     def __init__(self, persist_directory: str = "./chroma_db"):
         self.client = chromadb.PersistentClient(path=persist_directory)
         
-        if HAS_REAL_EMBEDDINGS:
-            self.embedding_fn = LocalHuggingFaceEmbeddingFunction()
-        else:
-            self.embedding_fn = MockEmbeddingFunction()
-            
+        # The model itself loads on first encode (or during warm-up)
+        self.embedding_fn = ServiceEmbeddingFunction()
+
         self.collection = self.client.get_or_create_collection(
             name="financial_knowledge_base",
             embedding_function=self.embedding_fn
@@ -84,6 +61,9 @@ class RAGService:
         """
         if not documents:
             return []
+        if embedding_service.backend == "mock" and not embedding_service.library_missing:
+            # Mock vectors would be persisted next to the real model's
+            raise RuntimeError("Refusing to store mock embeddings while sentence-transformers is installed")
         
         # Add timestamp to metadata
         for meta in metadatas:
@@ -93,13 +73,14 @@ class RAGService:
         if deduplicate:
             new_docs = []
             new_metas = []
+            seen = set()
             
             for doc, meta in zip(documents, metadatas):
                 doc_hash = self._hash_document(doc)
-                if doc_hash not in self._document_hashes:
+                if doc_hash not in self._document_hashes and doc_hash not in seen:
                     new_docs.append(doc)
                     new_metas.append(meta)
-                    self._document_hashes.add(doc_hash)
+                    seen.add(doc_hash)
                 else:
                     print(f"RAG Service: Skipping duplicate document (type: {meta.get('type', 'unknown')})")
             
@@ -111,11 +92,14 @@ class RAGService:
             return []
         
         ids = [str(uuid.uuid4()) for _ in documents]
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        with trace_span("rag.add", documents=len(documents)):
+            self.collection.add(
+                documents=documents,
+                metadatas=metadatas,
+                ids=ids
+            )
+        # Only once stored, so documents whose embedding failed are retried
+        self._document_hashes.update(self._hash_document(doc) for doc in documents)
         print(f"RAG Service: Added {len(documents)} documents.")
         return ids
 
@@ -130,12 +114,13 @@ class RAGService:
         Query documents with optional filtering.
         """
         try:
-            results = self.collection.query(
-                query_texts=[query_text],
-                n_results=n_results,
-                where=where,
-                where_document=where_document
-            )
+            with trace_span("rag.query", n_results=n_results):
+                results = self.collection.query(
+                    query_texts=[query_text],
+                    n_results=n_results,
+                    where=where,
+                    where_document=where_document
+                )
             
             # Log query results
             doc_count = len(results['documents'][0]) if results and results.get('documents') else 0
@@ -208,7 +193,8 @@ class RAGService:
             return {
                 "total_documents": count,
                 "hash_count": len(self._document_hashes),
-                "has_real_embeddings": HAS_REAL_EMBEDDINGS
+                "has_real_embeddings": embedding_service.backend in ("sentence-transformers", "worker-pool"),
+                "embeddings": embedding_service.get_status()
             }
         except Exception as e:
             return {"error": str(e)}
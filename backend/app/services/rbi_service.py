@@ -1,6 +1,30 @@
-import requests
-from bs4 import BeautifulSoup
+"""
+RBI Service - Reserve Bank of India policy rates.
+The repo rate changes a few times a year, so the last known rates are kept
+with their fetch time in a local JSON store (data/rbi_rates.json), served
+instantly, and refreshed on a schedule, on demand, or in the background
+once they age past the refresh interval. After a failed scrape, callers get
+the last known (or error) result without a new scrape until the retry
+backoff has passed.
+"""
+import json
+import os
 import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from bs4 import BeautifulSoup
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.providers import http_get
+
+logger = get_logger("rbi")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
 
 class RBIService:
     """
@@ -8,7 +32,89 @@ class RBIService:
     """
     URL = "https://www.rbi.org.in/"
 
-    def get_real_time_rates(self):
+    def __init__(self, store_path: str, refresh_seconds: float, retry_backoff_seconds: float = 600):
+        self.store_path = store_path
+        self.refresh_seconds = refresh_seconds
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._rates: Optional[Dict[str, Any]] = self._load()
+        self._last_error: Optional[str] = None
+        self._last_attempt: Optional[float] = None
+        self._fetch_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get_real_time_rates(self) -> Dict[str, Any]:
+        """
+        Latest known Policy Repo Rate with staleness metadata.
+        Returns: {'repo_rate': float, 'as_of': str, 'age_seconds': float,
+                  'stale': bool} or {'error': str} if nothing was ever fetched.
+        Only the very first call (empty store) waits on the RBI site, and not
+        while backing off from a failed attempt.
+        """
+        if self._rates is None:
+            if not self._in_backoff():
+                with self._fetch_lock:
+                    # Another caller may have just scraped (or failed) while we waited
+                    if self._rates is None and not self._in_backoff():
+                        self._refresh_locked()
+            if self._rates is None:
+                return {"error": self._last_error or "RBI rates unavailable"}
+
+        view = self._view()
+        if view["stale"]:
+            self.refresh_async()
+        return view
+
+    def _in_backoff(self) -> bool:
+        """True if the last scrape failed less than retry_backoff_seconds ago."""
+        return (
+            self._last_error is not None
+            and self._last_attempt is not None
+            and time.time() - self._last_attempt < self.retry_backoff_seconds
+        )
+
+    def _view(self) -> Dict[str, Any]:
+        rates = self._rates
+        age = time.time() - rates["fetched_at"]
+        return {
+            "repo_rate": rates["repo_rate"],
+            "as_of": datetime.fromtimestamp(rates["fetched_at"]).isoformat(),
+            "age_seconds": round(age, 1),
+            "stale": age > self.refresh_seconds,
+        }
+
+    # ============== Refresh ==============
+
+    def refresh(self) -> Dict[str, Any]:
+        """Scrape the RBI site now (on demand); keeps the last known rates on failure."""
+        with self._fetch_lock:
+            self._refresh_locked()
+        return self.get_status()
+
+    def refresh_async(self):
+        """Refresh in the background unless one is running or a recent attempt failed."""
+        if self._fetch_lock.locked() or self._in_backoff():
+            return
+        threading.Thread(target=self._refresh_if_due, name="rbi-refresh", daemon=True).start()
+
+    def _refresh_if_due(self):
+        with self._fetch_lock:
+            if (self._rates is None or self._view()["stale"]) and not self._in_backoff():
+                self._refresh_locked()
+
+    def _refresh_locked(self):
+        self._last_attempt = time.time()
+        result = self._scrape()
+        if "repo_rate" in result:
+            self._rates = {"repo_rate": result["repo_rate"], "fetched_at": time.time()}
+            self._last_error = None
+            self._save(self._rates)
+            logger.info(f"RBI repo rate refreshed: {result['repo_rate']}%")
+        else:
+            self._last_error = result.get("error")
+            logger.warning(f"RBI refresh failed: {self._last_error}")
+
+    def _scrape(self) -> Dict[str, Any]:
         """
         Scrape RBI website for latest Policy Repo Rate.
         Returns: {'repo_rate': float} or {'error': str}
@@ -18,16 +124,16 @@ class RBIService:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
-            response = requests.get(self.URL, timeout=10, headers=headers)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
+            response = http_get(self.URL, headers=headers, timeout=10, provider="rbi")
+            soup = BeautifulSoup(response.content, 'lxml')
+
             # Strategy 1: Find "Policy Repo Rate" text and look for number in same row
             # The RBI site usually has a "Current Rates" section
-            
+
             target_text = "Policy Repo Rate"
             # Find element containing text
             elements = soup.find_all(string=re.compile(target_text))
-            
+
             for el in elements:
                 # Traverse up to a container (like TR or LI)
                 parent = el.find_parent(['tr', 'li', 'div'])
@@ -38,11 +144,65 @@ class RBIService:
                     match = re.search(r':?\s*(\d+\.\d+)\s*%', text)
                     if match:
                         return {"repo_rate": float(match.group(1))}
-            
+
             return {"error": "Could not parse Repo Rate. Site structure may have changed."}
-            
+
         except Exception as e:
             return {"error": f"Scraping failed: {e}"}
 
+    # ============== Persistence ==============
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.store_path) as f:
+                rates = json.load(f)
+            return rates if "repo_rate" in rates and "fetched_at" in rates else None
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, rates: Dict[str, Any]):
+        try:
+            os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+            tmp_path = f"{self.store_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(rates, f)
+            os.replace(tmp_path, self.store_path)
+        except OSError as e:
+            logger.warning(f"Could not persist RBI rates: {e}")
+
+    # ============== Scheduled Refresh ==============
+
+    def start(self):
+        """Refresh on a schedule in the background (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="rbi-schedule", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            if self._rates is None or self._view()["stale"]:
+                self.refresh()
+            self._stop_event.wait(min(self.refresh_seconds, 3600))
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "rates": self._view() if self._rates else None,
+            "refresh_seconds": self.refresh_seconds,
+            "scheduled": bool(self._thread and self._thread.is_alive()),
+            "last_attempt": datetime.fromtimestamp(self._last_attempt).isoformat() if self._last_attempt else None,
+            "last_error": self._last_error,
+            "retry_backoff_seconds": self.retry_backoff_seconds,
+        }
+
+
 # Singleton
-rbi_service = RBIService()
+rbi_service = RBIService(
+    os.path.join(BACKEND_DIR, settings.RBI_STORE_PATH),
+    settings.RBI_REFRESH_SECONDS,
+    settings.RBI_RETRY_BACKOFF_SECONDS
+)
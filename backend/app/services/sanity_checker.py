@@ -1,10 +1,25 @@
 """
 Financial Data Sanity Check Service
 Detects and flags impossible or suspicious financial metrics.
+Stateless (safe to share across Scout threads). Single assets are checked
+with plain Python; check_batch() checks many assets in one vectorised pass.
 """
-from typing import Dict, Any, List, Optional, Tuple
+import math
+import re
+from typing import Dict, Any, List, Tuple
 from dataclasses import dataclass
 
+import numpy as np
+import pandas as pd
+
+
+def _number(value: Any) -> float:
+    """Numeric value or NaN (like pd.to_numeric(errors="coerce"))."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
 
 @dataclass
 class SanityAlert:
@@ -46,8 +61,8 @@ class SanityChecker:
     # Market cap thresholds for sanity checks
     LARGE_CAP_THRESHOLD = 1e12  # 1 Trillion (in local currency)
     
-    def __init__(self):
-        self.alerts: List[SanityAlert] = []
+    # Numeric fields the checks read (missing/non-numeric become NaN)
+    NUMERIC_FIELDS = ("debt_to_equity", "pe_ratio", "profit_margins", "return_on_equity")
     
     def check_financials(
         self, 
@@ -58,55 +73,30 @@ class SanityChecker:
         Run sanity checks on financial data.
         Returns corrected financials and list of alerts.
         """
-        self.alerts = []
+        return self._apply(financials, self.check_row(asset_id, financials))
+    
+    def check_batch(
+        self,
+        assets: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Tuple[Dict[str, Any], List[SanityAlert]]]:
+        """
+        Run sanity checks on many assets at once ({asset_id: financials}),
+        as one vectorised pass. Returns {asset_id: (corrected, alerts)}.
+        """
+        if not assets:
+            return {}
+        flags = self.scan(self.to_frame(assets)).to_dict("index")
+        return {asset_id: self._apply(financials, flags[asset_id]) for asset_id, financials in assets.items()}
+    
+    def _apply(self, financials: Dict[str, Any], row: Dict[str, Any]) -> Tuple[Dict[str, Any], List[SanityAlert]]:
+        """Corrected copy and alerts for one asset from its checked row."""
         corrected = financials.copy()
+        alerts = self._alerts(row)
         
-        symbol = asset_id.split(".")[0].upper()
-        sector = financials.get("sector", "")
-        industry = financials.get("industry", "")
-        market_cap_str = str(financials.get("market_cap", ""))
-        
-        # Parse market cap
-        market_cap = self._parse_market_cap(market_cap_str)
-        is_large_cap = market_cap and market_cap >= self.LARGE_CAP_THRESHOLD
-        
-        # 1. Check Debt-to-Equity Ratio
-        de_ratio = financials.get("debt_to_equity")
-        if de_ratio is not None:
-            corrected_de = self._check_debt_to_equity(
-                de_ratio, symbol, sector, industry, is_large_cap
-            )
-            if corrected_de != de_ratio:
-                corrected["debt_to_equity"] = corrected_de
-                corrected["debt_to_equity_original"] = de_ratio
-                corrected["debt_to_equity_corrected"] = True
-        
-        # 2. Check P/E Ratio
-        pe_ratio = financials.get("pe_ratio")
-        if pe_ratio is not None:
-            self._check_pe_ratio(pe_ratio, sector)
-        
-        # 3. Check Profit Margins
-        margins = financials.get("profit_margins")
-        if margins is not None:
-            self._check_profit_margins(margins, sector)
-        
-        # 4. Check ROE
-        roe = financials.get("return_on_equity")
-        if roe is not None:
-            self._check_roe(roe)
-        
-        # 5. Cross-validation: High D/E + High Margins = Suspicious for IT
-        if de_ratio and de_ratio > 5 and margins and margins > 0.15:
-            if "technology" in sector.lower() or "software" in industry.lower():
-                self.alerts.append(SanityAlert(
-                    field="cross_validation",
-                    reported_value=f"D/E={de_ratio}, Margins={margins:.1%}",
-                    expected_range="IT companies rarely have high D/E with high margins",
-                    severity="CRITICAL",
-                    message="Data conflict: High-margin IT company with extreme leverage is unusual",
-                    suggested_action="Verify D/E ratio from multiple sources"
-                ))
+        if not math.isnan(row["de_corrected"]):
+            corrected["debt_to_equity"] = row["de_corrected"]
+            corrected["debt_to_equity_original"] = financials.get("debt_to_equity")
+            corrected["debt_to_equity_corrected"] = True
         
         # Add sanity check results to financials
         corrected["_sanity_alerts"] = [
@@ -115,26 +105,134 @@ class SanityChecker:
                 "severity": a.severity,
                 "message": a.message,
                 "action": a.suggested_action
-            } for a in self.alerts
+            } for a in alerts
         ]
         corrected["_sanity_checked"] = True
+        return corrected, alerts
+    
+    def _fields(self, asset_id: str, financials: Dict[str, Any]) -> Dict[str, Any]:
+        """The fields the checks need, as reported."""
+        return {
+            "symbol": asset_id.split(".")[0].upper(),
+            "sector": financials.get("sector") or "",
+            "industry": financials.get("industry") or "",
+            "market_cap": str(financials.get("market_cap", "")),
+            **{field: financials.get(field) for field in self.NUMERIC_FIELDS},
+        }
+    
+    def check_row(self, asset_id: str, financials: Dict[str, Any]) -> Dict[str, Any]:
+        """The checks of scan() for a single asset, without building a frame."""
+        row = self._fields(asset_id, financials)
+        de, pe, margins, roe = (_number(row[field]) for field in self.NUMERIC_FIELDS)
+        sector, industry = str(row["sector"]).lower(), str(row["industry"]).lower()
+        is_large_cap = self._parse_market_cap(row["market_cap"]) >= self.LARGE_CAP_THRESHOLD
         
-        return corrected, self.alerts
+        # 1. Debt-to-Equity: known low-debt names first (corrected, no further checks)
+        known_low_debt = row["symbol"] in self.KNOWN_LOW_DEBT_COMPANIES and de > 2
+        
+        bounds = self.SECTOR_DE_EXPECTATIONS.get(row["sector"]) or self.SECTOR_DE_EXPECTATIONS.get(row["industry"])
+        de_min, de_max = bounds if bounds else (math.nan, math.nan)
+        sector_high = not known_low_debt and de > de_max * 2
+        sector_corrected = sector_high and 5 < de < 100
+        large_cap_high = (
+            not known_low_debt and not sector_corrected and is_large_cap and de > 5
+            and "financial" not in sector and "bank" not in industry
+        )
+        
+        row.update({
+            "de_min": float(de_min),
+            "de_max": float(de_max),
+            "de_known_low_debt": known_low_debt,
+            "de_sector_high": sector_high,
+            "de_large_cap_high": large_cap_high,
+            # Common error: percentage shown as decimal (10.17% read as 10.17)
+            "de_corrected": de / 100 if known_low_debt or sector_corrected else math.nan,
+            # 2-4. P/E, margins, ROE ranges
+            "pe_negative": pe < 0,
+            "pe_extreme": pe > 100,
+            "margins_high": margins > 0.8,
+            "margins_negative": margins < -0.5,
+            "roe_high": roe > 1.0,
+            # 5. Cross-validation: High D/E + High Margins = Suspicious for IT
+            "it_leverage_conflict": (
+                de > 5 and margins > 0.15 and ("technology" in sector or "software" in industry)
+            ),
+        })
+        return row
     
-    def _check_debt_to_equity(
-        self,
-        de_ratio: float,
-        symbol: str,
-        sector: str,
-        industry: str,
-        is_large_cap: bool
-    ) -> float:
+    def to_frame(self, assets: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+        """One row per asset with the fields the checks need."""
+        return pd.DataFrame(
+            [self._fields(asset_id, financials) for asset_id, financials in assets.items()],
+            index=list(assets), dtype=object  # Reported values kept as-is for alerts
+        )
+    
+    def scan(self, frame: pd.DataFrame) -> pd.DataFrame:
         """
-        Validate and potentially correct D/E ratio.
+        Vectorised checks over a frame indexed by asset_id (see to_frame),
+        for batches; check_row() is the single-asset equivalent.
+        Adds boolean flag columns per check plus de_corrected (the D/E value
+        after percentage-error correction, NaN if unchanged) and the sector
+        D/E bounds.
         """
-        # Check if this is a known low-debt company
-        if symbol in self.KNOWN_LOW_DEBT_COMPANIES and de_ratio > 2:
-            self.alerts.append(SanityAlert(
+        out = frame.copy()
+        numeric = {
+            field: pd.to_numeric(frame[field], errors="coerce").astype(float).to_numpy()
+            for field in self.NUMERIC_FIELDS
+        }
+        de = numeric["debt_to_equity"]
+        margins = numeric["profit_margins"]
+        sector = frame["sector"].str.lower()
+        industry = frame["industry"].str.lower()
+        
+        market_cap = self._parse_market_caps(frame["market_cap"]).to_numpy()
+        is_large_cap = market_cap >= self.LARGE_CAP_THRESHOLD
+        
+        # 1. Debt-to-Equity: known low-debt names first (corrected, no further checks)
+        known_low_debt = frame["symbol"].isin(self.KNOWN_LOW_DEBT_COMPANIES).to_numpy() & (de > 2)
+        
+        bounds = frame["sector"].map(self.SECTOR_DE_EXPECTATIONS)
+        bounds = bounds.where(bounds.notna(), frame["industry"].map(self.SECTOR_DE_EXPECTATIONS))
+        out["de_min"] = bounds.map(lambda b: b[0] if isinstance(b, tuple) else np.nan).astype(float)
+        out["de_max"] = bounds.map(lambda b: b[1] if isinstance(b, tuple) else np.nan).astype(float)
+        sector_high = ~known_low_debt & (de > out["de_max"].to_numpy() * 2)
+        sector_corrected = sector_high & (de > 5) & (de < 100)
+        
+        large_cap_high = (
+            ~known_low_debt & ~sector_corrected & is_large_cap & (de > 5)
+            & ~sector.str.contains("financial", regex=False).to_numpy()
+            & ~industry.str.contains("bank", regex=False).to_numpy()
+        )
+        out["de_known_low_debt"] = known_low_debt
+        out["de_sector_high"] = sector_high
+        out["de_large_cap_high"] = large_cap_high
+        # Common error: percentage shown as decimal (10.17% read as 10.17)
+        out["de_corrected"] = np.where(known_low_debt | sector_corrected, de / 100, np.nan)
+        
+        # 2-4. P/E, margins, ROE ranges
+        pe = numeric["pe_ratio"]
+        out["pe_negative"] = pe < 0
+        out["pe_extreme"] = pe > 100
+        out["margins_high"] = margins > 0.8  # 80%+ margins is rare
+        out["margins_negative"] = margins < -0.5  # Losing 50%+ of revenue
+        out["roe_high"] = numeric["return_on_equity"] > 1.0  # 100%+ ROE
+        
+        # 5. Cross-validation: High D/E + High Margins = Suspicious for IT
+        out["it_leverage_conflict"] = (
+            (de > 5) & (margins > 0.15)
+            & (sector.str.contains("technology", regex=False) | industry.str.contains("software", regex=False)).to_numpy()
+        )
+        return out
+    
+    @staticmethod
+    def _alerts(row: Dict[str, Any]) -> List[SanityAlert]:
+        """Alerts for one scanned row, in check order."""
+        alerts: List[SanityAlert] = []
+        symbol, sector = row["symbol"], row["sector"]
+        de_ratio = row["debt_to_equity"]
+        
+        if row["de_known_low_debt"]:
+            alerts.append(SanityAlert(
                 field="debt_to_equity",
                 reported_value=de_ratio,
                 expected_range="0.0 - 0.5 (known low-debt company)",
@@ -142,45 +240,29 @@ class SanityChecker:
                 message=f"{symbol} is known to be a low-debt company but shows D/E of {de_ratio}",
                 suggested_action="D/E likely misread as percentage. Dividing by 100."
             ))
-            # Common error: percentage shown as decimal (10.17% read as 10.17)
-            if de_ratio > 1:
-                return de_ratio / 100
-        
-        # Check sector expectations
-        expected = self.SECTOR_DE_EXPECTATIONS.get(sector) or self.SECTOR_DE_EXPECTATIONS.get(industry)
-        if expected:
-            min_de, max_de = expected
-            if de_ratio > max_de * 2:  # More than 2x the expected max
-                self.alerts.append(SanityAlert(
-                    field="debt_to_equity",
-                    reported_value=de_ratio,
-                    expected_range=f"{min_de} - {max_de} for {sector}",
-                    severity="ERROR",
-                    message=f"D/E ratio {de_ratio} is unusually high for {sector} sector",
-                    suggested_action="Verify from company filings"
-                ))
-                # Attempt correction if it looks like a percentage error
-                if de_ratio > 5 and de_ratio < 100:
-                    return de_ratio / 100
-        
-        # Large-cap non-financial companies rarely have D/E > 5
-        if is_large_cap and de_ratio > 5:
-            if "financial" not in sector.lower() and "bank" not in industry.lower():
-                self.alerts.append(SanityAlert(
-                    field="debt_to_equity",
-                    reported_value=de_ratio,
-                    expected_range="0 - 3 for large-cap non-financial",
-                    severity="WARNING",
-                    message=f"Large-cap showing D/E of {de_ratio} is unusual outside financials",
-                    suggested_action="Cross-check with annual report"
-                ))
-        
-        return de_ratio
-    
-    def _check_pe_ratio(self, pe_ratio: float, sector: str):
-        """Validate P/E ratio."""
-        if pe_ratio < 0:
-            self.alerts.append(SanityAlert(
+        if row["de_sector_high"]:
+            min_de, max_de = row["de_min"], row["de_max"]
+            alerts.append(SanityAlert(
+                field="debt_to_equity",
+                reported_value=de_ratio,
+                expected_range=f"{min_de:g} - {max_de:g} for {sector}",
+                severity="ERROR",
+                message=f"D/E ratio {de_ratio} is unusually high for {sector} sector",
+                suggested_action="Verify from company filings"
+            ))
+        if row["de_large_cap_high"]:
+            alerts.append(SanityAlert(
+                field="debt_to_equity",
+                reported_value=de_ratio,
+                expected_range="0 - 3 for large-cap non-financial",
+                severity="WARNING",
+                message=f"Large-cap showing D/E of {de_ratio} is unusual outside financials",
+                suggested_action="Cross-check with annual report"
+            ))
+        
+        pe_ratio = row["pe_ratio"]
+        if row["pe_negative"]:
+            alerts.append(SanityAlert(
                 field="pe_ratio",
                 reported_value=pe_ratio,
                 expected_range="Positive (company should be profitable)",
@@ -188,8 +270,8 @@ class SanityChecker:
                 message="Negative P/E indicates losses",
                 suggested_action="Check if company recently turned profitable"
             ))
-        elif pe_ratio > 100:
-            self.alerts.append(SanityAlert(
+        elif row["pe_extreme"]:
+            alerts.append(SanityAlert(
                 field="pe_ratio",
                 reported_value=pe_ratio,
                 expected_range="5 - 50 for most sectors",
@@ -197,11 +279,10 @@ class SanityChecker:
                 message=f"P/E of {pe_ratio} is extremely high",
                 suggested_action="May be due to one-time earnings dip"
             ))
-    
-    def _check_profit_margins(self, margins: float, sector: str):
-        """Validate profit margins."""
-        if margins > 0.8:  # 80%+ margins is rare
-            self.alerts.append(SanityAlert(
+        
+        margins = row["profit_margins"]
+        if row["margins_high"]:
+            alerts.append(SanityAlert(
                 field="profit_margins",
                 reported_value=margins,
                 expected_range="0 - 50% for most industries",
@@ -209,8 +290,8 @@ class SanityChecker:
                 message=f"Profit margins of {margins:.1%} are unusually high",
                 suggested_action="Verify if this includes one-time gains"
             ))
-        elif margins < -0.5:  # Losing 50%+ of revenue
-            self.alerts.append(SanityAlert(
+        elif row["margins_negative"]:
+            alerts.append(SanityAlert(
                 field="profit_margins",
                 reported_value=margins,
                 expected_range="Above -25% for going concerns",
@@ -218,11 +299,10 @@ class SanityChecker:
                 message=f"Negative margins of {margins:.1%} indicate severe losses",
                 suggested_action="Check if company is in turnaround"
             ))
-    
-    def _check_roe(self, roe: float):
-        """Validate Return on Equity."""
-        if roe > 1.0:  # 100%+ ROE
-            self.alerts.append(SanityAlert(
+        
+        roe = row["return_on_equity"]
+        if row["roe_high"]:
+            alerts.append(SanityAlert(
                 field="return_on_equity",
                 reported_value=roe,
                 expected_range="5% - 40% for healthy companies",
@@ -230,19 +310,35 @@ class SanityChecker:
                 message=f"ROE of {roe:.1%} is unusually high - may indicate low equity base",
                 suggested_action="Check for recent share buybacks or negative equity"
             ))
+        
+        if row["it_leverage_conflict"]:
+            alerts.append(SanityAlert(
+                field="cross_validation",
+                reported_value=f"D/E={de_ratio}, Margins={margins:.1%}",
+                expected_range="IT companies rarely have high D/E with high margins",
+                severity="CRITICAL",
+                message="Data conflict: High-margin IT company with extreme leverage is unusual",
+                suggested_action="Verify D/E ratio from multiple sources"
+            ))
+        return alerts
+    
+    @staticmethod
+    def _parse_market_cap(cap: str) -> float:
+        """Scalar form of _parse_market_caps()."""
+        multiplier = next((m for unit, m in (("T", 1e12), ("B", 1e9), ("M", 1e6)) if unit in cap), 1.0)
+        return _number(re.sub(r"[TBM,]", "", cap)) * multiplier
     
-    def _parse_market_cap(self, cap_str: str) -> Optional[float]:
-        """Parse market cap string to number."""
-        try:
-            if "T" in cap_str:
-                return float(cap_str.replace("T", "").replace(",", "")) * 1e12
-            elif "B" in cap_str:
-                return float(cap_str.replace("B", "").replace(",", "")) * 1e9
-            elif "M" in cap_str:
-                return float(cap_str.replace("M", "").replace(",", "")) * 1e6
-            return float(cap_str.replace(",", ""))
-        except:
-            return None
+    @staticmethod
+    def _parse_market_caps(caps: pd.Series) -> pd.Series:
+        """Parse market cap strings ("1.2T", "350B", "900M", "12,345") to numbers."""
+        caps = caps.astype(str)
+        multiplier = np.select(
+            [caps.str.contains(unit, regex=False).to_numpy() for unit in ("T", "B", "M")],
+            [1e12, 1e9, 1e6],
+            default=1.0
+        )
+        numbers = pd.to_numeric(caps.str.replace(r"[TBM,]", "", regex=True), errors="coerce").astype(float)
+        return numbers * multiplier
 
 
 # Singleton instance
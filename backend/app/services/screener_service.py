@@ -6,11 +6,25 @@ Fetches India-specific financial metrics not available in Yahoo Finance:
 - Book Value (more accurate for Indian stocks)
 - Sales Growth (5yr, 10yr)
 - Profit Growth (5yr, 10yr)
+Pages are parsed with lxml (XPath over just the ratio, shareholding and
+growth sections) and cached locally; day-old entries are refetched in the
+background with conditional requests, and their price-driven fields are
+withheld until the refetch lands.
 """
 import requests
-from bs4 import BeautifulSoup
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from lxml import html as lxml_html
+from app.core.providers import http_get
+from app.services.cache_service import tiered_cache
 from typing import Dict, Any, Optional
-import re
+
+
+def _has_class(name: str) -> str:
+    """XPath predicate matching one class in a space-separated class attribute."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
 
 
 class ScreenerService:
@@ -19,6 +33,7 @@ class ScreenerService:
     """
     
     BASE_URL = "https://www.screener.in/company/{symbol}/"
+    CACHE_NAMESPACE = "screener"
     
     HEADERS = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
@@ -26,9 +41,26 @@ class ScreenerService:
         "Accept-Language": "en-US,en;q=0.9"
     }
     
+    # Price-driven ratios (market cap, P/E, yield) go stale daily; ROCE, ROE,
+    # shareholding and growth only change with quarterly results
+    DAILY_TTL_SECONDS = 24 * 3600
+    QUARTERLY_TTL_SECONDS = 90 * 24 * 3600
+    DAILY_FIELDS = ("screener_market_cap", "screener_pe", "screener_dividend_yield")
+    # Parse diagnostics, not metrics; a page yielding only these found nothing
+    ERROR_FIELDS = ("ratio_error", "shareholding_error", "growth_error")
+    
+    def __init__(self):
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="screener-refresh")
+    
     def get_data(self, symbol: str) -> Dict[str, Any]:
         """
         Fetch data from Screener.in for a given symbol.
+        Served from the local cache when fetched within the last day; older
+        entries (up to a quarter) are returned immediately, without the daily
+        fields (market cap, P/E, yield) and flagged stale, while a conditional
+        refetch runs in the background. "fetched_at" dates the page.
         
         Args:
             symbol: Stock symbol (e.g., "SUZLON" for SUZLON.NS)
@@ -39,37 +71,102 @@ class ScreenerService:
         # Convert Yahoo symbol to Screener format
         screener_symbol = self._convert_symbol(symbol)
         
+        entry = tiered_cache.get(self.CACHE_NAMESPACE, screener_symbol)
+        if entry is not None:
+            cached = entry.value
+            view = self._view(symbol, cached["data"], cached["fetched_at"])
+            if view["stale"]:
+                self._schedule_refresh(symbol, screener_symbol, cached)
+            return view
+        
+        return self._fetch(symbol, screener_symbol)
+    
+    def _view(self, symbol: str, data: Dict[str, Any], fetched_at: float) -> Dict[str, Any]:
+        """Cached data as returned to callers, dated and with day-old price fields removed."""
+        stale = time.time() - fetched_at > self.DAILY_TTL_SECONDS
+        view = {k: v for k, v in data.items() if not (stale and k in self.DAILY_FIELDS)}
+        view.update({
+            "symbol": symbol,
+            "fetched_at": datetime.fromtimestamp(fetched_at).isoformat(),
+            "stale": stale,
+        })
+        return view
+    
+    def _fetch(self, symbol: str, screener_symbol: str, cached: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Download (conditionally, if we hold validators) and parse the company page."""
+        headers = dict(self.HEADERS)
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        
         try:
             url = self.BASE_URL.format(symbol=screener_symbol)
-            response = requests.get(url, headers=self.HEADERS, timeout=10)
+            response = http_get(url, headers=headers, timeout=10, provider="screener")
+            
+            if response.status_code == 304 and cached:
+                fetched_at = self._store(screener_symbol, cached["data"], cached.get("etag"), cached.get("last_modified"))
+                return self._view(symbol, cached["data"], fetched_at)
             
             if response.status_code != 200:
                 return {"error": f"Failed to fetch: HTTP {response.status_code}"}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            data = {
+            data = self.parse_page(response.content)
+            if all(key in self.ERROR_FIELDS for key in data):
+                # Layout change, login wall or unknown company: retry next time
+                return {"error": "No metrics found on Screener.in page", "source": "Screener.in", **data}
+            data.update({
                 "source": "Screener.in",
-                "symbol": symbol,
                 "screener_symbol": screener_symbol,
-            }
-            
-            # Extract key ratios from the ratios section
-            data.update(self._extract_ratios(soup))
-            
-            # Extract shareholding pattern
-            data.update(self._extract_shareholding(soup))
-            
-            # Extract growth metrics
-            data.update(self._extract_growth(soup))
-            
-            return data
+            })
+            fetched_at = self._store(screener_symbol, data, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return self._view(symbol, data, fetched_at)
             
         except requests.exceptions.Timeout:
             return {"error": "Request timeout", "source": "Screener.in"}
         except Exception as e:
             return {"error": str(e), "source": "Screener.in"}
     
+    def _store(self, screener_symbol: str, data: Dict[str, Any], etag: Optional[str], last_modified: Optional[str]) -> float:
+        """Cache a parsed page; returns its fetch time."""
+        fetched_at = time.time()
+        tiered_cache.set(
+            self.CACHE_NAMESPACE,
+            screener_symbol,
+            {"data": data, "fetched_at": fetched_at, "etag": etag, "last_modified": last_modified},
+            ttl=self.QUARTERLY_TTL_SECONDS
+        )
+        return fetched_at
+    
+    def _schedule_refresh(self, symbol: str, screener_symbol: str, cached: Dict[str, Any]):
+        """Refetch a day-old entry in the background (one refresh per symbol)."""
+        with self._lock:
+            if screener_symbol in self._refreshing:
+                return
+            self._refreshing.add(screener_symbol)
+        
+        def refresh():
+            try:
+                self._fetch(symbol, screener_symbol, cached)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(screener_symbol)
+        
+        self._executor.submit(refresh)
+    
+    def parse_page(self, html: bytes) -> Dict[str, Any]:
+        """Extract ratios, shareholding and growth from a company page."""
+        doc = lxml_html.fromstring(html)
+        data = {}
+        # Extract key ratios from the ratios section
+        data.update(self._extract_ratios(doc))
+        # Extract shareholding pattern
+        data.update(self._extract_shareholding(doc))
+        # Extract growth metrics
+        data.update(self._extract_growth(doc))
+        return data
+    
     def _convert_symbol(self, yahoo_symbol: str) -> str:
         """Convert Yahoo symbol to Screener format."""
         # Remove exchange suffix (.NS, .BO)
@@ -77,97 +174,88 @@ class ScreenerService:
             return yahoo_symbol[:-3]
         return yahoo_symbol
     
-    def _extract_ratios(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    @staticmethod
+    def _text(element) -> str:
+        """Element text with each fragment stripped (like BeautifulSoup's get_text(strip=True))."""
+        return "".join(fragment.strip() for fragment in element.itertext())
+    
+    def _extract_ratios(self, doc) -> Dict[str, Any]:
         """Extract key financial ratios."""
         ratios = {}
         
         try:
-            # Find the ratios section
-            ratio_list = soup.find('ul', {'id': 'top-ratios'})
-            if ratio_list:
-                items = ratio_list.find_all('li')
-                for item in items:
-                    name_elem = item.find('span', {'class': 'name'})
-                    value_elem = item.find('span', {'class': 'number'})
+            # Only the ratios list is walked, not the whole document
+            for item in doc.xpath("//ul[@id='top-ratios']/li"):
+                name_elem = item.xpath(f".//span[{_has_class('name')}]")
+                value_elem = item.xpath(f".//span[{_has_class('number')}]")
+                
+                if name_elem and value_elem:
+                    name = self._text(name_elem[0]).lower()
+                    value = self._parse_value(self._text(value_elem[0]))
                     
-                    if name_elem and value_elem:
-                        name = name_elem.get_text(strip=True).lower()
-                        value = self._parse_value(value_elem.get_text(strip=True))
-                        
-                        if 'market cap' in name:
-                            ratios['screener_market_cap'] = value
-                        elif 'stock p/e' in name:
-                            ratios['screener_pe'] = value
-                        elif 'book value' in name:
-                            ratios['screener_book_value'] = value
-                        elif 'roce' in name:
-                            ratios['roce'] = value
-                        elif 'roe' in name:
-                            ratios['screener_roe'] = value
-                        elif 'dividend yield' in name:
-                            ratios['screener_dividend_yield'] = value
-                        elif 'face value' in name:
-                            ratios['face_value'] = value
+                    if 'market cap' in name:
+                        ratios['screener_market_cap'] = value
+                    elif 'stock p/e' in name:
+                        ratios['screener_pe'] = value
+                    elif 'book value' in name:
+                        ratios['screener_book_value'] = value
+                    elif 'roce' in name:
+                        ratios['roce'] = value
+                    elif 'roe' in name:
+                        ratios['screener_roe'] = value
+                    elif 'dividend yield' in name:
+                        ratios['screener_dividend_yield'] = value
+                    elif 'face value' in name:
+                        ratios['face_value'] = value
         except Exception as e:
             ratios['ratio_error'] = str(e)
         
         return ratios
     
-    def _extract_shareholding(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _extract_shareholding(self, doc) -> Dict[str, Any]:
         """Extract shareholding pattern."""
         shareholding = {}
         
         try:
-            # Look for shareholding section
-            sh_section = soup.find('div', {'id': 'shareholding'})
-            if sh_section:
-                # Find latest holding data
-                table = sh_section.find('table')
-                if table:
-                    rows = table.find_all('tr')
-                    for row in rows:
-                        cells = row.find_all(['th', 'td'])
-                        if len(cells) >= 2:
-                            label = cells[0].get_text(strip=True).lower()
-                            value = cells[-1].get_text(strip=True)  # Latest column
-                            
-                            if 'promoter' in label:
-                                shareholding['promoter_holding'] = self._parse_value(value)
-                            elif 'fii' in label or 'foreign' in label:
-                                shareholding['fii_holding'] = self._parse_value(value)
-                            elif 'dii' in label or 'domestic' in label:
-                                shareholding['dii_holding'] = self._parse_value(value)
-                            elif 'public' in label:
-                                shareholding['public_holding'] = self._parse_value(value)
+            # First table in the shareholding section
+            tables = doc.xpath("//*[@id='shareholding']//table")
+            if tables:
+                for row in tables[0].iter("tr"):
+                    cells = row.xpath("./th|./td")
+                    if len(cells) >= 2:
+                        label = self._text(cells[0]).lower()
+                        value = self._text(cells[-1])  # Latest column
+                        
+                        if 'promoter' in label:
+                            shareholding['promoter_holding'] = self._parse_value(value)
+                        elif 'fii' in label or 'foreign' in label:
+                            shareholding['fii_holding'] = self._parse_value(value)
+                        elif 'dii' in label or 'domestic' in label:
+                            shareholding['dii_holding'] = self._parse_value(value)
+                        elif 'public' in label:
+                            shareholding['public_holding'] = self._parse_value(value)
         except Exception as e:
             shareholding['shareholding_error'] = str(e)
         
         return shareholding
     
-    def _extract_growth(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _extract_growth(self, doc) -> Dict[str, Any]:
         """Extract growth metrics."""
         growth = {}
         
         try:
-            # Look for compounded growth section
-            tables = soup.find_all('table', {'class': 'ranges-table'})
-            for table in tables:
-                rows = table.find_all('tr')
-                for row in rows:
-                    cells = row.find_all(['th', 'td'])
+            # Compounded growth tables; the first value column is the 5yr figure
+            for table in doc.xpath(f"//table[{_has_class('ranges-table')}]"):
+                for row in table.iter("tr"):
+                    cells = row.xpath("./th|./td")
                     if len(cells) >= 2:
-                        label = cells[0].get_text(strip=True).lower()
+                        label = self._text(cells[0]).lower()
+                        value = self._text(cells[1])
                         
-                        # Look for 5yr and 10yr columns
-                        for i, cell in enumerate(cells[1:], 1):
-                            value = cell.get_text(strip=True)
-                            
-                            if 'sales' in label or 'revenue' in label:
-                                if i == 1:
-                                    growth['sales_growth_5yr'] = self._parse_value(value)
-                            elif 'profit' in label:
-                                if i == 1:
-                                    growth['profit_growth_5yr'] = self._parse_value(value)
+                        if 'sales' in label or 'revenue' in label:
+                            growth['sales_growth_5yr'] = self._parse_value(value)
+                        elif 'profit' in label:
+                            growth['profit_growth_5yr'] = self._parse_value(value)
         except Exception as e:
             growth['growth_error'] = str(e)
         
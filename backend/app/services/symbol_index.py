@@ -0,0 +1,250 @@
+"""
+Symbol Index - In-memory ticker autocomplete and fuzzy name resolution.
+Built once from the local symbol master (SYMBOL_MASTER_PATH, CSV with
+symbol,name,exchange columns or NSE's EQUITY_L.csv layout) plus the curated
+alias map. Prefix lookups bisect a sorted key array; misspellings fall back
+to trigram matching, so neither autocomplete nor resolution scans the whole
+universe or touches the network.
+"""
+import csv
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("symbol_index")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+EXCHANGE_SUFFIXES = {"NSE": ".NS", "BSE": ".BO", "US": ""}
+
+# Legal-form words dropped from company names ("Infosys Limited" -> "infosys")
+_NAME_STOPWORDS = {"limited", "ltd", "inc", "incorporated", "corp", "corporation", "co", "plc", "company", "the"}
+
+# Key kinds, best first: ticker symbol, full name/alias, later word of a name
+SYMBOL, NAME, WORD = 0, 1, 2
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop apostrophes/dots, turn other separators into spaces."""
+    text = re.sub(r"[.'’]", "", text.lower())
+    text = re.sub(r"[,()\-/_:]", " ", text)
+    return " ".join(text.split())
+
+
+def strip_legal_form(name: str) -> str:
+    """'tata consultancy services limited' -> 'tata consultancy services'."""
+    words = [w for w in name.split() if w not in _NAME_STOPWORDS]
+    return " ".join(words) or name
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymbolIndex:
+    """
+    One entry per ticker (display name, exchange, aliases) with a sorted
+    prefix-key array, an exact-name map and a trigram inverted index.
+    """
+
+    # Minimum trigram similarity (Dice) for a fuzzy resolution / suggestion
+    FUZZY_THRESHOLD = 0.6
+    SUGGEST_FUZZY_THRESHOLD = 0.4
+
+    def __init__(self, master_path: str):
+        self.master_path = master_path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._entries: List[Dict[str, Any]] = []
+        self._by_ticker: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._refs: List[Tuple[int, int]] = []  # (entry id, key kind), parallel to _keys
+        self._symbols: Dict[str, int] = {}
+        self._names: Dict[str, int] = {}
+        self._grams: Dict[str, List[int]] = {}
+        self._gram_keys: List[Tuple[int, int]] = []  # (trigram count, entry id) per name key
+
+    # ============== Build ==============
+
+    def load(self) -> "SymbolIndex":
+        """Build the index once (idempotent, thread-safe)."""
+        if self._loaded:
+            return self
+        with self._lock:
+            if not self._loaded:
+                self._build()
+                self._loaded = True
+        return self
+
+    def _build(self):
+        from app.services.ticker_search_service import INDIAN_STOCK_MAPPING
+
+        entries: List[Dict[str, Any]] = []
+        by_ticker: Dict[str, int] = {}
+
+        def entry_for(ticker: str, name: str, exchange: str, curated: bool) -> Dict[str, Any]:
+            if ticker not in by_ticker:
+                by_ticker[ticker] = len(entries)
+                entries.append({"ticker": ticker, "name": name, "exchange": exchange, "aliases": set(), "curated": curated})
+            return entries[by_ticker[ticker]]
+
+        for symbol, name, exchange in self._read_master():
+            ticker = f"{symbol}{EXCHANGE_SUFFIXES.get(exchange, '')}"
+            entry_for(ticker, name, exchange, curated=False)["aliases"].add(normalize(name))
+
+        for alias, ticker in INDIAN_STOCK_MAPPING.items():
+            exchange = "NSE" if ticker.endswith(".NS") else "BSE" if ticker.endswith(".BO") else "US"
+            entry = entry_for(ticker, alias.title(), exchange, curated=True)
+            entry["aliases"].add(normalize(alias))
+            entry["curated"] = True
+
+        keys: List[Tuple[str, int, int]] = []
+        symbols: Dict[str, int] = {}
+        names_map: Dict[str, int] = {}
+        grams: Dict[str, List[int]] = defaultdict(list)
+        gram_keys: List[Tuple[int, int]] = []
+        for entry_id, entry in enumerate(entries):
+            symbol = normalize(entry["ticker"].rsplit(".", 1)[0] if entry["exchange"] != "US" else entry["ticker"])
+            keys.append((symbol, entry_id, SYMBOL))
+            symbols.setdefault(symbol, entry_id)
+            names = set()
+            for alias in entry["aliases"]:
+                names.update({alias, strip_legal_form(alias)})
+            for name in names:
+                keys.append((name, entry_id, NAME))
+                names_map.setdefault(name, entry_id)
+                name_grams = trigrams(name)
+                for gram in name_grams:
+                    grams[gram].append(len(gram_keys))
+                gram_keys.append((len(name_grams), entry_id))
+                words = name.split()
+                for i in range(1, len(words)):
+                    keys.append((" ".join(words[i:]), entry_id, WORD))
+
+        keys.sort()
+
+        self._entries = entries
+        self._by_ticker = by_ticker
+        self._keys = [k for k, _, _ in keys]
+        self._refs = [(entry_id, kind) for _, entry_id, kind in keys]
+        self._symbols = symbols
+        self._names = names_map
+        self._grams = dict(grams)
+        self._gram_keys = gram_keys
+        logger.info(f"Symbol index built: {len(entries)} listings, {len(keys)} keys")
+
+    def _read_master(self) -> Iterable[Tuple[str, str, str]]:
+        """(symbol, name, exchange) rows from the master CSV, if present."""
+        try:
+            with open(self.master_path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+                    symbol = row.get("symbol")
+                    name = row.get("name") or row.get("name of company")
+                    if symbol and name:
+                        yield symbol.upper(), name, (row.get("exchange") or "NSE").upper()
+        except FileNotFoundError:
+            logger.warning(f"Symbol master not found at {self.master_path}; using curated aliases only")
+
+    # ============== Queries ==============
+
+    def _view(self, entry_id: int, score: Optional[float] = None) -> Dict[str, Any]:
+        entry = self._entries[entry_id]
+        view = {"name": entry["name"], "ticker": entry["ticker"], "exchange": entry["exchange"]}
+        if score is not None:
+            view["score"] = round(score, 3)
+        return view
+
+    def suggest(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Autocomplete: prefix matches on symbols, names and name words, ranked
+        (exact > symbol > name start > word start, curated first, shorter
+        names first), topped up with fuzzy matches for misspellings.
+        """
+        self.load()
+        q = normalize(query)
+        if not q or limit <= 0:
+            return []
+
+        lo = bisect_left(self._keys, q)
+        hi = bisect_left(self._keys, q + "\uffff")
+        best: Dict[int, Tuple] = {}
+        for key, (entry_id, kind) in zip(self._keys[lo:hi], self._refs[lo:hi]):
+            entry = self._entries[entry_id]
+            rank = (key != q or kind == WORD, kind, not entry["curated"], len(entry["name"]), entry_id)
+            if entry_id not in best or rank < best[entry_id]:
+                best[entry_id] = rank
+
+        ranked = sorted(best, key=best.get)[:limit]
+        suggestions = [self._view(entry_id) for entry_id in ranked]
+        if len(suggestions) < limit:
+            for score, entry_id in self.fuzzy(q, limit):
+                if score < self.SUGGEST_FUZZY_THRESHOLD:
+                    break
+                if entry_id not in best:
+                    suggestions.append(self._view(entry_id, score))
+                    best[entry_id] = ()
+                if len(suggestions) >= limit:
+                    break
+        return suggestions
+
+    def fuzzy(self, query: str, limit: int = 5) -> List[Tuple[float, int]]:
+        """Best (Dice similarity, entry id) pairs by shared trigrams."""
+        self.load()
+        q_grams = trigrams(normalize(query))
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in q_grams:
+            for key_id in self._grams.get(gram, ()):
+                shared[key_id] += 1
+
+        best: Dict[int, float] = {}
+        for key_id, count in shared.items():
+            size, entry_id = self._gram_keys[key_id]
+            score = 2 * count / (len(q_grams) + size)
+            if score > best.get(entry_id, 0):
+                best[entry_id] = score
+        return sorted(((s, e) for e, s in best.items()), reverse=True)[:limit]
+
+    def resolve(self, text: str) -> Optional[str]:
+        """
+        Ticker for a company name, alias or symbol: exact match (also after
+        dropping legal-form words or trailing words like "share price"), else
+        the best fuzzy match above FUZZY_THRESHOLD.
+        """
+        self.load()
+        q = normalize(text)
+        if not q:
+            return None
+        for candidate in (q, strip_legal_form(q)):
+            entry_id = self._names.get(candidate, self._symbols.get(candidate))
+            if entry_id is not None:
+                return self._entries[entry_id]["ticker"]
+        words = q.split()
+        for n in range(len(words) - 1, 0, -1):
+            entry_id = self._names.get(" ".join(words[:n]))
+            if entry_id is not None:
+                return self._entries[entry_id]["ticker"]
+
+        matches = self.fuzzy(q, limit=1)
+        if matches and matches[0][0] >= self.FUZZY_THRESHOLD:
+            return self._entries[matches[0][1]]["ticker"]
+        return None
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._loaded,
+            "master_path": self.master_path,
+            "listings": len(self._entries),
+            "keys": len(self._keys),
+        }
+
+
+# Singleton (built lazily, or at startup)
+symbol_index = SymbolIndex(os.path.join(BACKEND_DIR, settings.SYMBOL_MASTER_PATH))
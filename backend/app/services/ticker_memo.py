@@ -0,0 +1,182 @@
+"""
+Ticker Memo - Persistent memo of company-name -> ticker resolutions.
+Names the local symbol index can't resolve go to a web search; the outcome
+(including "no ticker found") is remembered in a JSON store with a TTL and
+hit counts, so repeated free-text lookups never touch the network. Entries
+can also be seeded by hand; seeded entries never expire.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("ticker_memo")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+
+def memo_key(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+class TickerMemo:
+    """
+    Name -> {ticker (None = unresolvable), source, resolved_at, expires_at,
+    hits, last_hit}, persisted to store_path.
+    """
+
+    # Hit counters alone are flushed to disk at most this often
+    HIT_FLUSH_SECONDS = 60
+
+    def __init__(self, store_path: str, ttl_seconds: float, negative_ttl_seconds: float):
+        self.store_path = store_path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        self._dirty = False
+        self._last_save = time.time()
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "expired": 0}
+
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Live memo entry for a name (counts a hit), or None if unknown or
+        expired. A hit with ticker None means "known unresolvable".
+        """
+        key = memo_key(name)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] is not None and entry["expires_at"] <= now:
+                del self._entries[key]
+                self._dirty = True
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            entry["hits"] += 1
+            entry["last_hit"] = now
+            self._dirty = True
+            self._stats["hits" if entry["ticker"] else "negative_hits"] += 1
+            result = dict(entry)
+            flush = now - self._last_save >= self.HIT_FLUSH_SECONDS
+        if flush:
+            self.save()
+        return result
+
+    def record(self, name: str, ticker: Optional[str], source: str = "search", ttl: Optional[float] = None):
+        """
+        Remember a resolution (ticker None caches a failed lookup for the
+        shorter negative TTL). ttl=0 never expires.
+        """
+        if ttl is None:
+            ttl = self.ttl_seconds if ticker else self.negative_ttl_seconds
+        now = time.time()
+        with self._lock:
+            previous = self._entries.get(memo_key(name), {})
+            self._entries[memo_key(name)] = {
+                "ticker": ticker,
+                "source": source,
+                "resolved_at": now,
+                "expires_at": now + ttl if ttl else None,
+                "hits": previous.get("hits", 0),
+                "last_hit": previous.get("last_hit"),
+            }
+            self._dirty = True
+        self.save()
+
+    def seed(self, mapping: Dict[str, Optional[str]]) -> int:
+        """Add hand-curated resolutions (never expire). Returns the count seeded."""
+        now = time.time()
+        with self._lock:
+            for name, ticker in mapping.items():
+                previous = self._entries.get(memo_key(name), {})
+                self._entries[memo_key(name)] = {
+                    "ticker": ticker.upper() if ticker else None,
+                    "source": "seed",
+                    "resolved_at": now,
+                    "expires_at": None,
+                    "hits": previous.get("hits", 0),
+                    "last_hit": previous.get("last_hit"),
+                }
+            self._dirty = True
+        self.save()
+        return len(mapping)
+
+    def forget(self, name: Optional[str] = None) -> int:
+        """Drop one name (or everything). Returns the number removed."""
+        with self._lock:
+            if name is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                removed = 1 if self._entries.pop(memo_key(name), None) is not None else 0
+            self._dirty = True
+        self.save()
+        return removed
+
+    def entries(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Entries, most hit first."""
+        with self._lock:
+            items = sorted(self._entries.items(), key=lambda item: item[1]["hits"], reverse=True)[:limit]
+        return [
+            {
+                "name": name,
+                **entry,
+                "resolved_at": datetime.fromtimestamp(entry["resolved_at"]).isoformat(),
+                "expires_at": datetime.fromtimestamp(entry["expires_at"]).isoformat() if entry["expires_at"] else None,
+                "last_hit": datetime.fromtimestamp(entry["last_hit"]).isoformat() if entry["last_hit"] else None,
+            }
+            for name, entry in items
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            negative = sum(1 for entry in self._entries.values() if not entry["ticker"])
+            return {
+                "entries": len(self._entries),
+                "negative_entries": negative,
+                "ttl_seconds": self.ttl_seconds,
+                "negative_ttl_seconds": self.negative_ttl_seconds,
+                **self._stats,
+            }
+
+    # ============== Persistence ==============
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.store_path) as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = json.dumps(self._entries)
+            self._dirty = False
+            self._last_save = time.time()
+        try:
+            os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+            tmp_path = f"{self.store_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.store_path)
+        except OSError as e:
+            logger.warning(f"Could not persist ticker memo: {e}")
+
+
+# Singleton
+ticker_memo = TickerMemo(
+    os.path.join(BACKEND_DIR, settings.TICKER_MEMO_PATH),
+    ttl_seconds=settings.TICKER_MEMO_TTL_SECONDS,
+    negative_ttl_seconds=settings.TICKER_MEMO_NEGATIVE_TTL_SECONDS
+)
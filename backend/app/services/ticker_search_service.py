@@ -1,7 +1,8 @@
 # Smart Ticker Search Service
 # Converts company names to ticker symbols using DuckDuckGo search
 
-import requests
+from app.core.exceptions import DataFetchException
+from app.core.providers import http_get
 from typing import Optional, Tuple
 import re
 
@@ -111,84 +112,77 @@ INDIAN_STOCK_MAPPING = {
 
 def search_ticker_local(company_name: str) -> Optional[str]:
     """
-    Quick local lookup for common company names.
+    Quick local lookup against the in-memory symbol index (curated aliases
+    plus the listings master, with fuzzy matching for misspellings).
     Returns ticker symbol if found, None otherwise.
     """
-    name_lower = company_name.lower().strip()
+    from app.services.symbol_index import symbol_index
     
-    # Direct match
-    if name_lower in INDIAN_STOCK_MAPPING:
-        return INDIAN_STOCK_MAPPING[name_lower]
-    
-    # Partial match
-    for key, ticker in INDIAN_STOCK_MAPPING.items():
-        if key in name_lower or name_lower in key:
-            return ticker
-    
-    return None
+    return symbol_index.resolve(company_name)
 
 
-def search_ticker_duckduckgo(company_name: str) -> Optional[str]:
+def _search_duckduckgo(company_name: str) -> Optional[str]:
     """
-    Search for ticker symbol using DuckDuckGo.
-    Returns ticker symbol if found, None otherwise.
+    DuckDuckGo lookup that raises when neither endpoint answered, so a
+    None result really means "no ticker found".
     """
-    try:
-        # Use DuckDuckGo instant answer API
-        query = f"{company_name} stock ticker symbol NSE BSE"
-        url = f"https://api.duckduckgo.com/?q={query}&format=json&no_html=1"
+    answered = False
+    # Use DuckDuckGo instant answer API
+    query = f"{company_name} stock ticker symbol NSE BSE"
+    url = f"https://api.duckduckgo.com/?q={query}&format=json&no_html=1"
+    
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    }
+    
+    response = http_get(url, headers=headers, timeout=5, provider="ticker_search")
+    if response.status_code == 200:
+        answered = True
+        data = response.json()
+        
+        # Check Abstract for ticker pattern
+        abstract = data.get("Abstract", "") + data.get("AbstractText", "")
         
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
+        # Look for NSE/BSE tickers
+        nse_pattern = r'\b([A-Z]{2,15})\.NS\b'
+        bse_pattern = r'\b([A-Z]{2,15})\.BO\b'
+        us_pattern = r'\b(NYSE|NASDAQ):\s*([A-Z]{1,5})\b'
         
-        response = requests.get(url, headers=headers, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Check Abstract for ticker pattern
-            abstract = data.get("Abstract", "") + data.get("AbstractText", "")
-            
-            # Look for NSE/BSE tickers
-            nse_pattern = r'\b([A-Z]{2,15})\.NS\b'
-            bse_pattern = r'\b([A-Z]{2,15})\.BO\b'
-            us_pattern = r'\b(NYSE|NASDAQ):\s*([A-Z]{1,5})\b'
-            
-            # Try NSE first
-            nse_match = re.search(nse_pattern, abstract)
-            if nse_match:
-                return f"{nse_match.group(1)}.NS"
-            
-            # Try BSE
-            bse_match = re.search(bse_pattern, abstract)
-            if bse_match:
-                return f"{bse_match.group(1)}.BO"
-            
-            # Try US stocks
-            us_match = re.search(us_pattern, abstract)
-            if us_match:
-                return us_match.group(2)
+        # Try NSE first
+        nse_match = re.search(nse_pattern, abstract)
+        if nse_match:
+            return f"{nse_match.group(1)}.NS"
         
-        # Fallback: Try a simple web search scrape
-        search_url = f"https://html.duckduckgo.com/html/?q={company_name}+stock+ticker+NSE"
-        response = requests.get(search_url, headers=headers, timeout=5)
+        # Try BSE
+        bse_match = re.search(bse_pattern, abstract)
+        if bse_match:
+            return f"{bse_match.group(1)}.BO"
         
-        if response.status_code == 200:
-            # Look for ticker patterns in results
-            content = response.text.upper()
-            
-            # Check for common patterns
-            nse_matches = re.findall(r'\b([A-Z]{2,15})\.NS\b', content)
-            if nse_matches:
-                return f"{nse_matches[0]}.NS"
-            
-            bse_matches = re.findall(r'\b([A-Z]{2,15})\.BO\b', content)
-            if bse_matches:
-                return f"{bse_matches[0]}.BO"
+        # Try US stocks
+        us_match = re.search(us_pattern, abstract)
+        if us_match:
+            return us_match.group(2)
     
-    except Exception as e:
-        print(f"DuckDuckGo search error: {e}")
+    # Fallback: Try a simple web search scrape
+    search_url = f"https://html.duckduckgo.com/html/?q={company_name}+stock+ticker+NSE"
+    response = http_get(search_url, headers=headers, timeout=5, provider="ticker_search")
     
+    if response.status_code == 200:
+        answered = True
+        # Look for ticker patterns in results
+        content = response.text.upper()
+        
+        # Check for common patterns
+        nse_matches = re.findall(r'\b([A-Z]{2,15})\.NS\b', content)
+        if nse_matches:
+            return f"{nse_matches[0]}.NS"
+        
+        bse_matches = re.findall(r'\b([A-Z]{2,15})\.BO\b', content)
+        if bse_matches:
+            return f"{bse_matches[0]}.BO"
+
+    if not answered:
+        raise DataFetchException(company_name, "DuckDuckGo", f"HTTP {response.status_code}")
     return None
 
 
@@ -197,7 +191,8 @@ def resolve_company_to_ticker(input_text: str) -> Tuple[str, str]:
     Main function: Resolve company name or ticker to a valid ticker symbol.
     
     Returns:
-        Tuple of (ticker, source) where source is 'exact', 'local', 'search', or 'passthrough'
+        Tuple of (ticker, source) where source is 'exact', 'local', 'search',
+        'seed' (hand-curated memo entry) or 'passthrough'
     """
     text = input_text.strip()
     
@@ -211,29 +206,43 @@ def resolve_company_to_ticker(input_text: str) -> Tuple[str, str]:
     if local_result:
         return local_result, "local"
     
-    # 3. Try DuckDuckGo search (slower but comprehensive)
-    search_result = search_ticker_duckduckgo(text)
+    # 3. Remembered resolutions: seeded, or earlier searches (including failed ones)
+    from app.services.ticker_memo import ticker_memo
+    
+    memo = ticker_memo.lookup(text)
+    if memo is not None:
+        if memo["ticker"]:
+            return memo["ticker"], memo["source"]
+        return text.upper().replace(" ", ""), "passthrough"
+    
+    # 4. Try DuckDuckGo search (slower but comprehensive)
+    try:
+        search_result = _search_duckduckgo(text)
+    except Exception as e:
+        print(f"DuckDuckGo search error: {e}")  # Not memoised; retried next time
+        search_result = None
+    else:
+        ticker_memo.record(text, search_result)
     if search_result:
         return search_result, "search"
     
-    # 4. Fallback: Return as-is (uppercase) and let Yahoo Finance try
+    # 5. Fallback: Return as-is (uppercase) and let Yahoo Finance try
     return text.upper().replace(" ", ""), "passthrough"
 
 
 def get_ticker_suggestions(partial_input: str, limit: int = 5) -> list:
     """
-    Get ticker suggestions for autocomplete based on partial input.
+    Get ticker suggestions for autocomplete based on partial input
+    (prefix matches on symbols and names, ranked, then fuzzy matches).
     """
-    partial_lower = partial_input.lower().strip()
-    suggestions = []
+    from app.services.symbol_index import symbol_index
     
-    for name, ticker in INDIAN_STOCK_MAPPING.items():
-        if partial_lower in name or name.startswith(partial_lower):
-            suggestions.append({
-                "name": name.title(),
-                "ticker": ticker
-            })
-            if len(suggestions) >= limit:
-                break
-    
-    return suggestions
+    return symbol_index.suggest(partial_input, limit)
+
+
+def get_popular_tickers() -> list:
+    """
+    Unique tickers from the local mapping (NIFTY-50 heavyweights and US
+    mega-caps), in mapping order. Used as the warm-up universe.
+    """
+    return list(dict.fromkeys(INDIAN_STOCK_MAPPING.values()))
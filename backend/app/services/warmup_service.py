@@ -0,0 +1,178 @@
+"""
+Warm-up Service - Pre-loads the popular-ticker universe after a deploy.
+Bulk-collects Scout data for the tickers users mostly query (which also
+fills the price store), loads the embedding model and sends the LLM a tiny
+prompt, so the first real requests don't pay cold fetches and model loads.
+Runs on a daemon thread under a concurrency and time budget and never
+blocks readiness.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("warmup")
+
+
+class WarmupService:
+    """
+    Startup (and optionally scheduled) warm-up job.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        batch_size: int,
+        budget_seconds: float,
+        interval_seconds: float,
+        warm_llm: bool
+    ):
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.budget_seconds = budget_seconds
+        self.interval_seconds = interval_seconds
+        self.warm_llm = warm_llm
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_run: Dict[str, Any] = {}
+        self._running = threading.Lock()
+
+    def run(self, tickers: Optional[List[str]] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        One warm-up pass. Scout batches already cached are skipped unless
+        force=True (scheduled passes refetch so entries never lapse).
+        """
+        if not self._running.acquire(blocking=False):
+            return {"state": "already_running"}
+        try:
+            return self._run_pass(tickers, force)
+        finally:
+            self._running.release()
+
+    def _run_pass(self, tickers: Optional[List[str]], force: bool) -> Dict[str, Any]:
+        """The warm-up pass itself (caller holds the running lock)."""
+        from app.services.ticker_search_service import get_popular_tickers
+
+        universe = tickers if tickers is not None else get_popular_tickers()
+        batches = [universe[i:i + self.batch_size] for i in range(0, len(universe), self.batch_size)]
+        start = time.monotonic()
+        deadline = start + self.budget_seconds
+        report: Dict[str, Any] = {
+            "started_at": datetime.now().isoformat(),
+            "tickers": len(universe),
+            "warmed": 0,
+            "skipped_batches": 0,
+            "steps": {}
+        }
+        lock = threading.Lock()
+
+        def warm_batch(batch: List[str]):
+            from app.agents.scout import scout_agent
+
+            if time.monotonic() >= deadline:
+                with lock:
+                    report["skipped_batches"] += 1
+                return
+            collected = scout_agent.collect_batch(batch, force=force)
+            with lock:
+                report["warmed"] += len(collected)
+
+        # Model/LLM warm-ups get their own workers so they never queue behind Scout
+        aux = ThreadPoolExecutor(max_workers=2, thread_name_prefix="warmup-aux")
+        scout = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="warmup-scout")
+        try:
+            futures = {aux.submit(self._timed, self._warm_embeddings): "embeddings"}
+            if self.warm_llm:
+                futures[aux.submit(self._timed, self._warm_llm)] = "llm"
+            for batch in batches:
+                futures[scout.submit(warm_batch, batch)] = "scout"
+
+            done, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+            for future in done:
+                name = futures[future]
+                try:
+                    result = future.result()
+                    if name != "scout":
+                        report["steps"][name] = result
+                except Exception as e:
+                    logger.warning(f"Warm-up step {name} failed: {e}")
+                    report["steps"].setdefault(name, {"error": str(e)})
+            for future in pending:
+                report["steps"].setdefault(futures[future], {"error": "time budget exceeded"})
+        finally:
+            aux.shutdown(wait=False, cancel_futures=True)
+            scout.shutdown(wait=False, cancel_futures=True)
+
+        report["duration_s"] = round(time.monotonic() - start, 2)
+        report["state"] = "completed"
+        self._last_run = report
+        logger.info(f"Warm-up warmed {report['warmed']}/{len(universe)} tickers in {report['duration_s']}s")
+        return report
+
+    @staticmethod
+    def _timed(step) -> Dict[str, Any]:
+        start = time.monotonic()
+        result = step()
+        return {**result, "ms": round((time.monotonic() - start) * 1000, 1)}
+
+    @staticmethod
+    def _warm_embeddings() -> Dict[str, Any]:
+        """Load the embedding model (or worker pool) and run one encode."""
+        from app.services.embedding_service import embedding_service
+
+        embedding_service.load().encode(["ELIDA warm-up"])
+        return {"status": "ok", "backend": embedding_service.backend}
+
+    @staticmethod
+    def _warm_llm() -> Dict[str, Any]:
+        """Send a tiny prompt through the provider chain (no retries)."""
+        from app.agents.base import BaseAgent
+
+        response = BaseAgent("Warm-up").call_llm(
+            "Reply with OK.",
+            system_prompt="Reply with one word.",
+            fallback_func=lambda _: None,
+            max_retries=1
+        )
+        return {"status": "ok" if response else "no_provider"}
+
+    # ============== Background Runs ==============
+
+    def start(self):
+        """Run once now and then every interval_seconds (if > 0), off the request path."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        self.run()
+        while self.interval_seconds > 0 and not self._stop_event.wait(self.interval_seconds):
+            self.run(force=True)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self._running.locked(),
+            "scheduled": self.interval_seconds > 0,
+            "concurrency": self.concurrency,
+            "budget_seconds": self.budget_seconds,
+            "last_run": self._last_run,
+        }
+
+
+# Singleton instance
+warmup_service = WarmupService(
+    concurrency=settings.WARMUP_CONCURRENCY,
+    batch_size=settings.WARMUP_BATCH_SIZE,
+    budget_seconds=settings.WARMUP_BUDGET_SECONDS,
+    interval_seconds=settings.WARMUP_INTERVAL_SECONDS,
+    warm_llm=settings.WARMUP_LLM
+)
@@ -0,0 +1,95 @@
+"""
+Benchmark the NumPy indicator module against the previous pandas/list code.
+
+Usage (from backend/):
+    python -m scripts.benchmark_indicators
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from app.services import indicators
+
+
+def legacy_scout_technicals(df: pd.DataFrame) -> dict:
+    """The pre-NumPy Scout path: rolling pandas ops and iterrows history."""
+    close = df["Close"]
+    sma_50 = close.rolling(window=50).mean().iloc[-1]
+    sma_200 = close.rolling(window=200).mean().iloc[-1]
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rsi = (100 - (100 / (1 + gain / loss))).iloc[-1]
+    volatility = close.pct_change().dropna().std() * np.sqrt(252)
+    history_df = pd.concat([close, close.rolling(window=50).mean().rename("sma_50")], axis=1).iloc[-100:]
+    history = []
+    for idx, row in history_df.iterrows():
+        history.append({
+            "date": str(idx.date()),
+            "price": round(float(row["Close"]), 2),
+            "sma_50": round(float(row["sma_50"]), 2) if not pd.isna(row["sma_50"]) else None
+        })
+    return {"sma_50": sma_50, "sma_200": sma_200, "rsi": rsi, "volatility": volatility, "history": history}
+
+
+def numpy_scout_technicals(df: pd.DataFrame) -> dict:
+    close = df["Close"].to_numpy(dtype=float)
+    result = indicators.compute_indicators(close)
+    result["history"] = indicators.history_records(df.index, close)
+    return result
+
+
+def legacy_history_rsi(history: list, period: int = 14) -> float:
+    """The pre-NumPy crypto RSI (list comprehension over history dicts)."""
+    prices = [h.get("Close") or h.get("close", 0) for h in history[-period - 1:]]
+    deltas = [prices[i + 1] - prices[i] for i in range(len(prices) - 1)]
+    avg_gain = sum(d for d in deltas if d > 0) / period
+    avg_loss = sum(-d for d in deltas if d < 0) / period
+    return 100 - (100 / (1 + avg_gain / avg_loss)) if avg_loss else 100.0
+
+
+def legacy_backtest_technicals(closes) -> dict:
+    """The pre-NumPy backtest indicators (Python lists)."""
+    deltas = [closes[i] - closes[i - 1] for i in range(1, len(closes))]
+    gains = [d if d > 0 else 0 for d in deltas]
+    losses = [-d if d < 0 else 0 for d in deltas]
+    avg_gain, avg_loss = sum(gains[-14:]) / 14, sum(losses[-14:]) / 14
+    rsi = 100 - (100 / (1 + avg_gain / avg_loss)) if avg_loss else 100
+    sma_20 = float(sum(closes[-20:])) / 20
+    sma_50 = float(sum(closes[-50:])) / 50
+    year_closes = closes[-252:]
+    high_52w, low_52w = float(max(year_closes)), float(min(year_closes))
+    returns = [(closes[i] - closes[i - 1]) / closes[i - 1] for i in range(-30, 0) if closes[i - 1] > 0]
+    volatility = (sum(r ** 2 for r in returns) / len(returns)) ** 0.5
+    return {"rsi": rsi, "sma_20": sma_20, "sma_50": sma_50, "high": high_52w, "low": low_52w, "vol": volatility}
+
+
+def main(number: int = 200):
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-01", periods=252)
+    df = pd.DataFrame({"Close": 100 * np.cumprod(1 + rng.normal(0, 0.02, 252))}, index=dates)
+    closes = df["Close"].to_numpy()
+
+    history = [{"Date": str(d.date()), "Close": c} for d, c in zip(dates, closes)]
+    price_history = pd.DataFrame({"close": closes})
+
+    from app.agents.scout import ScoutAgent
+    from app.services.backtest_service import backtest_service
+
+    cases = [
+        ("Scout technicals (1y)", lambda: legacy_scout_technicals(df), lambda: numpy_scout_technicals(df)),
+        ("Backtest technicals", lambda: legacy_backtest_technicals(list(closes)),
+         lambda: backtest_service._calculate_technicals(price_history)),
+        ("Crypto RSI (history)", lambda: legacy_history_rsi(history),
+         lambda: ScoutAgent._calculate_rsi_from_history(history)),
+    ]
+    print(f"{'case':<24}{'legacy ms':>12}{'numpy ms':>12}{'speedup':>10}")
+    for name, legacy, fast in cases:
+        legacy_ms = timeit.timeit(legacy, number=number) / number * 1000
+        fast_ms = timeit.timeit(fast, number=number) / number * 1000
+        print(f"{name:<24}{legacy_ms:>12.3f}{fast_ms:>12.3f}{legacy_ms / fast_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,21 @@ from app.models.investor_dna import InvestorDNA, DEFAULT_INVESTOR_DNA
 TEST_DATABASE_URL = "sqlite:///:memory:"
 
 
+@pytest.fixture(autouse=True)
+def isolated_indicator_states(tmp_path, monkeypatch):
+    """Keep indicator states synced by Scout out of backend/data during tests."""
+    from app.services.indicator_state_service import indicator_states
+    monkeypatch.setattr(indicator_states, "root", str(tmp_path / "indicator_state"))
+    monkeypatch.setattr(indicator_states, "_states", {})
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """A small tiered cache in tmp_path, for patching into cached services."""
+    from app.services.cache_service import TieredCache
+    return TieredCache(str(tmp_path), max_memory_entries=2, max_disk_bytes=10 * 1024 * 1024)
+
+
 @pytest.fixture(scope="function")
 def test_db():
     """Create a fresh test database for each test."""
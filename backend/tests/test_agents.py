@@ -128,3 +128,277 @@ class TestAgentScoreRanges:
         # We just want to ensure no crash and type correctness
         if score is not None:
              assert 0 <= score <= 100, f"{agent_name} returned invalid score: {score}"
+
+
+class TestDeadlineFallback:
+    """Agents should skip LLM providers once the request deadline is spent."""
+    
+    def test_expired_deadline_uses_fallback(self):
+        from app.agents.quant import quant_agent
+        from app.core.deadline import Deadline, deadline_scope
+        
+        with patch.object(quant_agent, "_call_ollama") as mock_ollama:
+            with deadline_scope(Deadline(0)):
+                response = quant_agent.call_llm(
+                    "prompt",
+                    fallback_func=lambda args: "[Rule-Based] fallback",
+                    fallback_args=None
+                )
+        
+        mock_ollama.assert_not_called()
+        assert response == "[Rule-Based] fallback"
+
+
+class TestScoutParallelFetch:
+    """Scout should fetch its independent sources concurrently."""
+    
+    def test_sources_run_concurrently_with_timeouts(self):
+        import threading
+        from app.agents.scout import ScoutAgent
+        
+        # Each source waits for the other two, so this only completes if they overlap
+        all_started = threading.Barrier(3, timeout=5)
+        release_news = threading.Event()
+        
+        def concurrent(value):
+            def fetch(asset_id):
+                all_started.wait()
+                return value
+            return fetch
+        
+        def hung(asset_id):
+            release_news.wait(5)
+            return [{"title": "Too late"}]
+        
+        timeouts = dict(ScoutAgent.SOURCE_TIMEOUTS, news=0.1)
+        try:
+            with patch.object(ScoutAgent, "_get_financials_deep_static", concurrent({"source": "test"})), \
+                 patch.object(ScoutAgent, "_get_technicals_static", concurrent({"history": []})), \
+                 patch.object(ScoutAgent, "_get_macro_data_static", concurrent({"region": "US"})), \
+                 patch.object(ScoutAgent, "_get_news_static", hung), \
+                 patch.object(ScoutAgent, "SOURCE_TIMEOUTS", timeouts):
+                sources = ScoutAgent._fetch_sources_parallel("TEST")
+        finally:
+            release_news.set()
+        
+        assert sources["financials"] == {"source": "test"}
+        assert sources["macro"] == {"region": "US"}
+        assert sources["news"] == []  # Timed out -> fallback
+        assert sources["fallback_sources"] == ["news"]
+        assert "screener" not in sources
+    
+    def test_fallback_results_are_not_cached(self):
+        from app.agents.scout import ScoutAgent
+        
+        cached = ScoutAgent._fetch_cached_data
+        results = iter([
+            {"financials": {"is_mock": True}, "fallback_sources": ["financials"]},
+            {"financials": {"source": "test"}, "fallback_sources": []},
+        ])
+        cached.invalidate("FALLBACK.TEST")
+        try:
+            with patch.object(ScoutAgent, "_build_asset_data", side_effect=lambda asset_id: next(results)) as build:
+                assert cached("FALLBACK.TEST")["fallback_sources"] == ["financials"]
+                assert cached("FALLBACK.TEST")["financials"] == {"source": "test"}  # Retried
+                assert cached("FALLBACK.TEST")["financials"] == {"source": "test"}  # Now cached
+            assert build.call_count == 2
+            
+            cached.prime({"fallback_sources": ["technicals"]}, "FALLBACK.TEST")
+            assert cached.peek("FALLBACK.TEST")["fallback_sources"] == []
+        finally:
+            cached.invalidate("FALLBACK.TEST")
+
+    
+    def test_news_race_returns_first_non_empty_source(self):
+        import time
+        from app.agents.scout import ScoutAgent
+        
+        def slow():
+            time.sleep(1)
+            return [{"title": "Slow"}]
+        
+        start = time.time()
+        news = ScoutAgent._race_news_sources({
+            "empty": list,
+            "fast": lambda: [{"title": "Fast"}],
+            "slow": slow,
+        }, limit=5)
+        
+        assert news == [{"title": "Fast"}]
+        assert time.time() - start < 0.5
+    
+    def test_fallback_news_is_not_cached(self):
+        from app.agents.scout import ScoutAgent
+        
+        generated = [{"title": "Market Update", "source": "Generated"}]
+        real = [{"title": "Real headline", "source": "yfinance"}]
+        races = iter([[], real])
+        ScoutAgent._fetch_news_cached.invalidate("NEWS.TEST")
+        try:
+            with patch.object(ScoutAgent, "_race_news_sources", side_effect=lambda *a, **k: next(races)) as race, \
+                 patch.object(ScoutAgent, "_get_fallback_news", return_value=generated):
+                assert ScoutAgent._get_news_static("NEWS.TEST") == generated
+                assert ScoutAgent._get_news_static("NEWS.TEST") == real  # Retried, not cached
+                assert ScoutAgent._get_news_static("NEWS.TEST") == real
+            assert race.call_count == 2
+        finally:
+            ScoutAgent._fetch_news_cached.invalidate("NEWS.TEST")
+    
+    def test_empty_volatility_news_is_not_cached(self):
+        from app.agents.scout import ScoutAgent
+        
+        responses = iter([{}, {"news": [{"title": "Shares jump on results"}]}])
+        cached = ScoutAgent._fetch_volatility_news_cached
+        cached.invalidate("VOL.TEST", "VOL.TEST surge")
+        try:
+            with patch("app.core.providers.search", side_effect=lambda query: next(responses)):
+                assert ScoutAgent._get_volatility_news("VOL.TEST", "VOL.TEST surge") == []
+                news = ScoutAgent._get_volatility_news("VOL.TEST", "VOL.TEST surge")
+            assert news[0]["title"] == "Shares jump on results"
+        finally:
+            cached.invalidate("VOL.TEST", "VOL.TEST surge")
+
+
+    def test_collect_data_does_not_share_cached_sections(self):
+        from app.agents.scout import ScoutAgent, scout_agent
+        
+        cached = {"financials": {"current_price": 10.0}, "technicals": {}, "macro": {}, "news": []}
+        with patch.object(ScoutAgent, "_fetch_cached_data", return_value=cached), \
+             patch("app.services.hot_ticker_service.hot_ticker_service"):
+            result = scout_agent.collect_data("COPY.TEST")
+        
+        result["financials"]["current_price"] = 0.0
+        assert cached["financials"]["current_price"] == 10.0
+
+
+class TestScoutBatchCollection:
+    """collect_batch should use bulk yahooquery calls instead of per-symbol ones."""
+    
+    def test_bulk_calls_split_per_symbol(self, tmp_path):
+        import numpy as np
+        import pandas as pd
+        from app.agents.scout import ScoutAgent, scout_agent
+        from app.services.data_validator import data_validator
+        from app.services.price_store import PriceStore
+        from app.services.sanity_checker import sanity_checker
+        
+        symbols = ["AAA", "BBB"]
+        dates = pd.date_range("2025-01-01", periods=120)
+        history = pd.concat([
+            pd.DataFrame({"close": np.linspace(10, 20, 120)},
+                         index=pd.MultiIndex.from_product([[s], dates], names=["symbol", "date"]))
+            for s in symbols
+        ])
+        modules = {
+            s: {"financialData": {"currentPrice": 20.0, "currency": "USD"},
+                "summaryProfile": {"sector": "Technology"}, "quoteType": {"quoteType": "EQUITY"}}
+            for s in symbols
+        }
+        mock_ticker = MagicMock()
+        mock_ticker.get_modules.return_value = modules
+        mock_ticker.history.return_value = history
+        
+        with patch("app.agents.scout.Ticker", return_value=mock_ticker) as ticker_cls, \
+             patch.object(ScoutAgent, "_get_news_static", return_value=[]), \
+             patch.object(ScoutAgent, "_get_macro_data_static", return_value={"region": "US"}), \
+             patch.object(ScoutAgent._fetch_cached_data, "peek", return_value=None), \
+             patch.object(ScoutAgent._fetch_cached_data, "prime") as mock_prime, \
+             patch("app.agents.scout.price_store", PriceStore(str(tmp_path), refresh_seconds=900)) as store, \
+             patch.object(data_validator, "validate_and_enrich", side_effect=AssertionError("per-asset")), \
+             patch.object(sanity_checker, "check_financials", side_effect=AssertionError("per-asset")), \
+             patch.object(data_validator, "validate_batch", wraps=data_validator.validate_batch) as validate_batch, \
+             patch.object(sanity_checker, "check_batch", wraps=sanity_checker.check_batch) as check_batch:
+            results = scout_agent.collect_batch(symbols)
+        
+        ticker_cls.assert_called_once_with(symbols, asynchronous=True)
+        # Validation and sanity checks run once over the whole batch
+        assert list(validate_batch.call_args[0][0]) == symbols
+        assert list(check_batch.call_args[0][0]) == symbols
+        assert results["AAA"]["financials"]["_sanity_checked"]
+        assert mock_prime.call_count == 2
+        assert set(results) == set(symbols)
+        assert results["AAA"]["technicals"]["source"] == "YahooQuery (Batch)"
+        assert results["BBB"]["financials"]["current_price"] == 20.0
+        # Bulk history is written through to the local price store
+        assert len(store.get_bars("AAA", sync=False)) == 120
+
+
+class TestMacroSnapshot:
+    """Macro data should be fetched once per region, not once per asset."""
+    
+    def test_region_snapshot_shared_across_assets(self):
+        from app.agents.scout import ScoutAgent
+        from app.services.macro_snapshot_service import MacroSnapshotService
+        
+        service = MacroSnapshotService(refresh_seconds=300)
+        with patch.object(ScoutAgent, "_fetch_macro_snapshot",
+                          side_effect=lambda region: {"region": region, "volatility_index": 15.0}) as mock_fetch, \
+             patch("app.services.macro_snapshot_service.macro_snapshot_service", service):
+            first = ScoutAgent._get_macro_data_static("AAPL")
+            second = ScoutAgent._get_macro_data_static("MSFT")
+            india = ScoutAgent._get_macro_data_static("TCS.NS")
+        
+        assert mock_fetch.call_count == 2  # One US, one INDIA
+        assert first == second and first is not second
+        assert india["region"] == "INDIA"
+
+
+class TestHotTickers:
+    """The refresher should re-collect popular tickers near expiry, within budget."""
+    
+    def test_refreshes_most_popular_due_tickers_within_budget(self):
+        from app.agents.scout import ScoutAgent
+        from app.services.hot_ticker_service import HotTickerService
+        
+        service = HotTickerService(top_n=3, refresh_seconds=60, budget=2, half_life_seconds=3600)
+        for symbol, hits in (("TCS.NS", 5), ("INFY.NS", 3), ("AAPL", 2), ("MSFT", 1)):
+            for _ in range(hits):
+                service.record(symbol)
+        
+        remaining = {"TCS.NS": 30.0, "INFY.NS": 3000.0, "AAPL": None}
+        with patch.object(ScoutAgent._fetch_cached_data, "ttl_remaining", side_effect=remaining.get), \
+             patch("app.agents.scout.scout_agent.collect_batch",
+                   side_effect=lambda symbols, force: {s: {} for s in symbols}) as mock_batch:
+            refreshed = service.refresh_cycle()
+        
+        assert [t["asset_id"] for t in service.top()] == ["TCS.NS", "INFY.NS", "AAPL"]
+        mock_batch.assert_called_once_with(["TCS.NS", "AAPL"], force=True)
+        assert refreshed == ["TCS.NS", "AAPL"]
+
+
+class TestWarmup:
+    """Warm-up should batch the universe and respect its time budget."""
+    
+    def test_batches_universe_within_budget(self):
+        import time
+        from app.services.warmup_service import WarmupService
+        
+        batches = []
+        
+        def collect_batch(symbols, force):
+            batches.append(list(symbols))
+            time.sleep(0.2)
+            return {s: {} for s in symbols}
+        
+        service = WarmupService(concurrency=1, batch_size=2, budget_seconds=0.3, interval_seconds=0, warm_llm=False)
+        with patch("app.agents.scout.scout_agent.collect_batch", side_effect=collect_batch), \
+             patch.object(WarmupService, "_warm_embeddings", return_value={"status": "ok"}):
+            report = service.run(["A", "B", "C", "D", "E", "F"])
+        
+        assert batches[0] == ["A", "B"]
+        assert len(batches) < 3  # Budget stops new batches
+        assert report["steps"]["embeddings"]["status"] == "ok"
+        assert report["duration_s"] < 0.6
+    
+    def test_failed_setup_releases_running_lock(self):
+        import pytest
+        from app.services.warmup_service import WarmupService
+        
+        service = WarmupService(concurrency=1, batch_size=2, budget_seconds=1, interval_seconds=0, warm_llm=False)
+        with patch("app.services.ticker_search_service.get_popular_tickers", side_effect=RuntimeError("no universe")):
+            with pytest.raises(RuntimeError):
+                service.run()
+        
+        with patch("app.agents.scout.scout_agent.collect_batch", return_value={}), \
+             patch.object(WarmupService, "_warm_embeddings", return_value={"status": "ok"}):
+            assert service.run(["A"])["state"] == "completed"
@@ -0,0 +1,75 @@
+"""
+Tests for the watchlist price alert engine.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.db_models import AlertEvent
+from app.services import indicators
+from app.services.alert_service import AlertService, evaluate
+from app.services.price_store import PriceStore
+
+
+def frame(closes, end="2025-06-02"):
+    index = pd.date_range(end=end, periods=len(closes), freq="B")
+    return pd.DataFrame({"close": closes}, index=index)
+
+
+class TestAlertEvaluation:
+    """Vectorised evaluation should agree with the per-symbol indicators."""
+    
+    def test_rules_across_symbols_in_one_pass(self):
+        rng = np.random.default_rng(7)
+        flat = np.full(40, 100.0)
+        matrix = np.full((3, indicators.TRADING_DAYS + 1), np.nan)
+        matrix[0, -40:] = np.append(flat[:-1], 94.0)   # -6% today
+        matrix[1, -40:] = np.append(flat[:-1], 130.0)  # new high
+        walk = 100 * np.cumprod(1 + rng.normal(0, 0.02, indicators.TRADING_DAYS + 1))
+        matrix[2] = walk
+        
+        rows = [0, 0, 1, 1, 2, 2]
+        kinds = ["change_below", "price_above", "high_52w", "change_below", "rsi_above", "low_52w"]
+        thresholds = [-3.0, 100.0, None, -3.0, 0.0, None]
+        met, values = evaluate(matrix, rows, kinds, thresholds, [1, 1, 1, 1, 1, 1])
+        
+        assert met.tolist() == [True, False, True, False, True, walk[-1] < walk[:-1].min()]
+        assert values[0] == pytest.approx(-6.0)
+        assert values[4] == pytest.approx(indicators.last(indicators.rsi(walk)))
+    
+    def test_short_history_never_triggers(self):
+        matrix = np.full((1, indicators.TRADING_DAYS + 1), np.nan)
+        matrix[0, -2:] = [100.0, 80.0]
+        met, _ = evaluate(matrix, [0, 0], ["change_below", "rsi_below"], [-5.0, 30.0], [5, 1])
+        assert not met.any()
+
+
+class TestAlertService:
+    """Alerts fire once per crossing and are persisted per user."""
+    
+    def test_builtin_and_user_rules_fire_once(self, test_db, sample_user, tmp_path, monkeypatch):
+        store = PriceStore(str(tmp_path), refresh_seconds=900)
+        monkeypatch.setattr("app.services.alert_service.price_store", store)
+        service = AlertService(interval_seconds=60, session_factory=lambda: test_db, refresh_prices=False)
+        user_id = sample_user.id
+        
+        assert service.add_to_watchlist(test_db, user_id, ["drop.ns", "DROP.NS"]) == ["DROP.NS"]
+        service.add_rule(test_db, user_id, "DROP.NS", "price_below", 95)
+        with pytest.raises(ValueError):
+            service.add_rule(test_db, user_id, "DROP.NS", "price_sideways", 1)
+        
+        store.merge_frame("DROP.NS", frame([100.0] * 30 + [93.0]))
+        assert service.run_cycle()["fired"] == 3  # -7% today, -7% over 5 days, price < 95
+        assert service.run_cycle()["fired"] == 0  # Still below: no repeat
+        
+        messages = [event["message"] for event in service.get_events(test_db, user_id)]
+        assert "DROP.NS dropped 7.0% today" in messages
+        assert service.mark_read(test_db, user_id) == 3
+        assert service.get_events(test_db, user_id, unread_only=True) == []
+        
+        # Recovers (conditions clear and re-arm), then crosses again
+        store.merge_frame("DROP.NS", frame([100.0] * 30 + [93.0, 95.5], end="2025-06-03"))
+        assert service.run_cycle()["fired"] == 0
+        store.merge_frame("DROP.NS", frame([100.0] * 30 + [93.0, 95.5, 92.0], end="2025-06-04"))
+        assert service.run_cycle()["fired"] == 3
+        assert test_db.query(AlertEvent).count() == 6
@@ -0,0 +1,58 @@
+"""
+Tests for the tiered data cache.
+"""
+import time
+
+import pytest
+
+
+class TestTieredCache:
+    """Tests for TTL, tiers and invalidation."""
+    
+    def test_expired_entries_are_recomputed(self, cache):
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+        
+        assert cache.get_or_compute("ns", "k", compute, ttl=0.05, stale_ttl=0) == 1
+        assert cache.get_or_compute("ns", "k", compute, ttl=0.05, stale_ttl=0) == 1
+        time.sleep(0.1)
+        assert cache.get_or_compute("ns", "k", compute, ttl=0.05, stale_ttl=0) == 2
+    
+    def test_stale_value_served_while_refreshing(self, cache):
+        values = iter(["old", "new"])
+        compute = lambda: next(values)
+        
+        cache.get_or_compute("ns", "k", compute, ttl=0.05, stale_ttl=60)
+        time.sleep(0.1)
+        assert cache.get_or_compute("ns", "k", compute, ttl=0.05, stale_ttl=60) == "old"
+        
+        cache._refresh_executor.shutdown(wait=True)
+        assert cache.get("ns", "k").value == "new"
+        assert cache.get_stats()["stale_served"] == 1
+    
+    def test_memory_lru_falls_back_to_disk(self, cache):
+        for key in ("a", "b", "c"):
+            cache.set("ns", key, key.upper(), ttl=60)
+        
+        stats = cache.get_stats()
+        assert stats["memory_entries"] == 2
+        assert stats["memory_evictions"] == 1
+        assert cache.get("ns", "a").value == "A"  # Evicted from memory, served from disk
+        assert cache.get_stats()["disk_hits"] == 1
+    
+    def test_invalidate_removes_both_tiers(self, cache):
+        cache.set("ns", "k", 1, ttl=60)
+        cache.set("other", "k", 2, ttl=60)
+        
+        assert cache.invalidate("ns") == 2  # Memory + disk copy
+        assert cache.get("ns", "k") is None
+        assert cache.get("other", "k").value == 2
+    
+    def test_invalidate_single_key_without_scanning(self, cache, monkeypatch):
+        cache.set("ns", "a", 1, ttl=60)
+        cache.set("ns", "b", 2, ttl=60)
+        monkeypatch.setattr(cache, "_disk_files", lambda *args: pytest.fail("disk tier scanned"))
+        
+        assert cache.invalidate("ns", "a") == 2
+        assert cache.invalidate("ns", "a") == 0
+        assert cache.get("ns", "b").value == 2
@@ -0,0 +1,53 @@
+"""
+Tests for the CoinGecko client.
+"""
+import time
+
+
+class TestCoinGeckoBatching:
+    """Crypto quotes should come from one bulk call and history from cache."""
+    
+    def test_bulk_markets_and_cached_history(self, cache, monkeypatch):
+        from unittest.mock import MagicMock
+        from app.services.coingecko_service import CoinGeckoService
+        
+        day_ms = 86400000
+        urls = []
+        
+        def fake_get(url, params=None, **kwargs):
+            urls.append(url)
+            if url.endswith("/coins/markets"):
+                body = [{"id": coin_id, "name": coin_id.title(), "current_price": 10.0}
+                        for coin_id in params["ids"].split(",")]
+            elif url.endswith("/market_chart"):
+                body = {"prices": [[i * day_ms, 100.0 + i] for i in range(30)],
+                        "total_volumes": [[i * day_ms, 5.0] for i in range(30)]}
+            else:
+                body = {"name": "Bitcoin", "categories": ["Layer 1"], "description": {"en": "Coin"}}
+            return MagicMock(json=MagicMock(return_value=body), raise_for_status=MagicMock())
+        
+        monkeypatch.setattr("app.services.coingecko_service.tiered_cache", cache)
+        monkeypatch.setattr("app.services.coingecko_service.http_get", fake_get)
+        service = CoinGeckoService(rate_per_minute=600, burst=10)
+        
+        markets = service.get_markets(["bitcoin", "ethereum", "solana"])
+        assert set(markets) == {"bitcoin", "ethereum", "solana"}
+        assert len(urls) == 1
+        
+        data = service.get_crypto_data("BTC")
+        assert data["current_price"] == 10.0  # Quote reused from the bulk call
+        assert data["industry"] == "Layer 1"
+        assert data["price_history"][0] == {"Date": "1970-01-01", "Close": 100.0, "Volume": 5.0}
+        assert len(urls) == 3  # + metadata + history
+        
+        service.get_crypto_data("BTC")
+        assert len(urls) == 3
+    
+    def test_token_bucket_limits_rate(self):
+        from app.services.coingecko_service import TokenBucket
+        
+        bucket = TokenBucket(rate=20, capacity=2)
+        start = time.monotonic()
+        assert all(bucket.acquire() for _ in range(4))
+        assert time.monotonic() - start >= 0.09  # 2 burst + 2 at 20/s
+        assert not bucket.acquire(timeout=0)
@@ -0,0 +1,78 @@
+"""
+Tests for the shared embedding service.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.services.embedding_service import EmbeddingService, mock_embeddings
+
+
+class TestEmbeddingService:
+    """Encodes are lazy and batched across callers."""
+    
+    def test_nothing_loads_until_first_encode(self):
+        service = EmbeddingService("all-MiniLM-L6-v2", batch_size=64, batch_wait_ms=5, workers=0)
+        assert service.backend == "unloaded"
+        assert service.encode([]) == []
+        assert service.backend == "unloaded"
+    
+    def test_concurrent_requests_share_batches(self):
+        service = EmbeddingService("all-MiniLM-L6-v2", batch_size=64, batch_wait_ms=50, workers=0)
+        service.backend = "mock"  # No model in the test environment
+        texts = [[f"doc {i}", f"other {i}"] for i in range(20)]
+        
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            results = list(pool.map(service.encode, texts))
+        
+        for request, vectors in zip(texts, results):
+            np.testing.assert_allclose(vectors, mock_embeddings(request))
+        status = service.get_status()
+        assert status["requests"] == 20
+        assert status["batches"] < 20
+    
+    def test_model_load_failure_raises_and_retries_after_backoff(self, monkeypatch):
+        import sys
+        import types
+        
+        attempts = []
+        
+        def offline_model(name):
+            attempts.append(name)
+            if len(attempts) == 1:
+                raise OSError("couldn't connect to huggingface.co")
+            return types.SimpleNamespace(encode=lambda texts, batch_size: mock_embeddings(texts) + 1)
+        
+        monkeypatch.setitem(sys.modules, "sentence_transformers",
+                            types.SimpleNamespace(SentenceTransformer=offline_model))
+        service = EmbeddingService("all-MiniLM-L6-v2", batch_size=64, batch_wait_ms=0, workers=0,
+                                   load_retry_seconds=60)
+        
+        # No silent fallback to mock vectors, and no reload on every batch
+        with pytest.raises(OSError, match="huggingface"):
+            service.encode(["a"])
+        with pytest.raises(RuntimeError, match="retrying"):
+            service.encode(["b"])
+        assert service.backend == "unloaded"
+        assert attempts == ["all-MiniLM-L6-v2"]
+        assert "huggingface" in service.get_status()["load_error"]
+        
+        service._load_failed_at -= 60  # Backoff elapsed
+        np.testing.assert_allclose(service.encode(["c"]), mock_embeddings(["c"]) + 1)
+        assert service.backend == "sentence-transformers"
+        assert service.get_status()["load_error"] is None
+    
+    def test_rag_refuses_mock_vectors_when_the_library_is_installed(self, tmp_path, monkeypatch):
+        from app.services.embedding_service import embedding_service
+        from app.services.rag_service import RAGService
+        
+        rag = RAGService(persist_directory=str(tmp_path / "chroma"))
+        monkeypatch.setattr(embedding_service, "backend", "mock")
+        monkeypatch.setattr(embedding_service, "library_missing", False)
+        with pytest.raises(RuntimeError, match="mock embeddings"):
+            rag.add_documents(["doc"], [{"asset_id": "AAPL"}])
+        assert rag.collection.count() == 0
+        
+        monkeypatch.setattr(embedding_service, "library_missing", True)
+        assert len(rag.add_documents(["doc"], [{"asset_id": "AAPL"}])) == 1
@@ -0,0 +1,34 @@
+"""
+Tests for the FRED economic data service.
+"""
+import time
+
+
+class TestFredCaching:
+    """FRED series should be fetched concurrently once and then served from cache."""
+    
+    def test_summary_fetches_each_endpoint_once(self, cache, monkeypatch):
+        from app.services.fred_service import FREDService
+        
+        calls = []
+        
+        def fake_request(endpoint, series_id, **extra):
+            calls.append((endpoint, series_id))
+            time.sleep(0.05)
+            if endpoint == "series":
+                return {"seriess": [{"title": series_id}]}
+            return {"observations": [{"value": "4.5", "date": "2025-01-01"}, {"value": "4.0", "date": "2024-12-01"}]}
+        
+        monkeypatch.setattr("app.services.fred_service.tiered_cache", cache)
+        service = FREDService(api_key="test")
+        monkeypatch.setattr(service, "_request", fake_request)
+        
+        start = time.time()
+        summary = service.get_macro_summary()
+        elapsed = time.time() - start
+        service.get_macro_summary()
+        
+        assert len(calls) == 16  # 8 series x (metadata + observations), once
+        assert elapsed < 0.5  # Parallel, not 16 x 50ms
+        assert summary["indicators"]["india_repo_rate"]["value"] == 4.5
+        assert summary["indicators"]["fed_funds"]["change"] == 0.5
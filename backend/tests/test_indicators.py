@@ -0,0 +1,130 @@
+"""
+Tests for the NumPy technical indicator module.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import indicators
+
+
+@pytest.fixture
+def closes():
+    rng = np.random.default_rng(42)
+    return 100 * np.cumprod(1 + rng.normal(0.0005, 0.02, 300))
+
+
+class TestIndicators:
+    """Indicators should match reference pandas/loop implementations."""
+    
+    def test_sma_and_bollinger_match_pandas(self, closes):
+        series = pd.Series(closes)
+        np.testing.assert_allclose(indicators.sma(closes, 50)[49:], series.rolling(50).mean()[49:])
+        
+        middle, upper, _ = indicators.bollinger(closes, 20, 2)
+        expected_upper = series.rolling(20).mean() + 2 * series.rolling(20).std(ddof=0)
+        np.testing.assert_allclose(upper[19:], expected_upper[19:], rtol=1e-9)
+    
+    def test_wilder_rsi_matches_reference_loop(self, closes):
+        period = 14
+        deltas = np.diff(closes)
+        gains, losses = np.clip(deltas, 0, None), np.clip(-deltas, 0, None)
+        avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+        for g, l in zip(gains[period:], losses[period:]):
+            avg_gain = (avg_gain * (period - 1) + g) / period
+            avg_loss = (avg_loss * (period - 1) + l) / period
+        expected = 100 - 100 / (1 + avg_gain / avg_loss)
+        
+        assert indicators.last(indicators.rsi(closes, period)) == pytest.approx(expected)
+        assert indicators.last(indicators.rsi(np.arange(1, 40), period)) == 100.0
+    
+    def test_volatility_drawdown_and_history(self, closes):
+        expected_vol = pd.Series(closes).pct_change().std() * np.sqrt(252)
+        assert indicators.volatility(closes) == pytest.approx(expected_vol)
+        
+        dd = indicators.drawdown([100, 120, 90, 110])
+        assert dd["max_drawdown_pct"] == pytest.approx(-25.0)
+        
+        dates = pd.date_range("2025-01-01", periods=len(closes))
+        history = indicators.history_records(dates, closes, tail=100)
+        assert len(history) == 100
+        assert history[-1]["date"] == str(dates[-1].date())
+        assert history[-1]["sma_50"] == pytest.approx(closes[-50:].mean(), abs=0.01)
+
+
+class TestIndicatorState:
+    """Streaming state should reproduce the batch snapshot bar by bar."""
+    
+    @staticmethod
+    def assert_matches(snapshot, expected):
+        assert snapshot.keys() == expected.keys()
+        for key, value in expected.items():
+            if isinstance(value, str) or value is None:
+                assert snapshot[key] == value, key
+            else:
+                assert snapshot[key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+    
+    def test_matches_compute_indicators(self, closes):
+        state = indicators.IndicatorState.from_closes(closes)
+        expected = indicators.compute_indicators(closes)
+        # Volatility is over a rolling year of returns
+        expected["volatility_raw"] = indicators.volatility(closes, window=indicators.TRADING_DAYS)
+        self.assert_matches(state.snapshot(), expected)
+        
+        short = indicators.IndicatorState.from_closes(closes[:30]).snapshot()
+        self.assert_matches(short, indicators.compute_indicators(closes[:30]))
+    
+    def test_tick_snapshot_does_not_commit(self, closes):
+        state = indicators.IndicatorState.from_closes(closes[:-1])
+        tick = state.snapshot(closes[-1])
+        assert state.count == len(closes) - 1
+        
+        state.add_bar(closes[-1])
+        self.assert_matches(tick, state.snapshot())
+    
+    def test_round_trips_through_json(self, closes):
+        import json
+        state = indicators.IndicatorState.from_closes(closes[:-1], last_date="2025-01-01")
+        restored = indicators.IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+        assert restored.last_date == "2025-01-01"
+        
+        state.add_bar(closes[-1])
+        restored.add_bar(closes[-1])
+        self.assert_matches(restored.snapshot(), state.snapshot())
+    
+    def test_store_appends_new_bars_and_rebuilds_on_revision(self, closes, tmp_path):
+        from app.services.indicator_state_service import IndicatorStateStore
+        store = IndicatorStateStore(str(tmp_path))
+        dates = pd.date_range("2025-01-01", periods=len(closes))
+        
+        store.sync("TEST.NS", dates[:-10], closes[:-10])
+        snapshot = IndicatorStateStore(str(tmp_path)).sync("TEST.NS", dates, closes)
+        self.assert_matches(snapshot, indicators.IndicatorState.from_closes(closes).snapshot())
+        
+        reloaded = IndicatorStateStore(str(tmp_path))
+        revised = closes * 0.5
+        self.assert_matches(
+            reloaded.sync("TEST.NS", dates, revised),
+            indicators.IndicatorState.from_closes(revised).snapshot()
+        )
+        assert reloaded.get_status()["rebuilds"] == 1
+        assert reloaded.live("TEST.NS", revised[-1])["current_price"] == revised[-1]
+    
+    def test_concurrent_syncs_append_each_bar_once(self, closes, tmp_path, monkeypatch):
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from app.services.indicator_state_service import IndicatorStateStore
+        store = IndicatorStateStore(str(tmp_path))
+        dates = pd.date_range("2025-01-01", periods=len(closes))
+        store.sync("TEST.NS", dates[:-20], closes[:-20])
+        
+        resume_index = IndicatorStateStore._resume_index
+        # Widen the window between reading the resume point and appending
+        monkeypatch.setattr(IndicatorStateStore, "_resume_index",
+                            staticmethod(lambda *args: (resume_index(*args), time.sleep(0.02))[0]))
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: store.sync("TEST.NS", dates, closes), range(8)))
+        
+        assert store.get("TEST.NS").count == len(closes) - 1
+        assert store.get_status()["bars_appended"] == 20  # The previous tick bar plus 19 new ones
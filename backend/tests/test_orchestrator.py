@@ -129,3 +129,237 @@ class TestMatchScore:
         )
         
         assert 0 <= result.match_score <= 100
+
+
+class TestDeadlines:
+    """Tests for per-request latency budgets."""
+    
+    def _mock_match(self):
+        return MagicMock(
+            match_score=50,
+            recommendation="HOLD",
+            fit_reasons=[],
+            concern_reasons=[],
+            summary="Test summary",
+            breakdown=MagicMock(
+                fundamental_score=50,
+                macro_score=50,
+                philosophy_score=50,
+                risk_score=50,
+                dna_match_score=50
+            )
+        )
+    
+    def test_deadline_budget_helpers(self):
+        """Sub-deadlines and timeouts should never exceed the parent budget."""
+        from app.core.deadline import Deadline
+        
+        deadline = Deadline(10)
+        assert not deadline.expired()
+        assert deadline.sub_deadline(0.5).remaining() <= 5
+        assert deadline.cap_timeout(300) <= 10
+        assert Deadline(0).expired()
+    
+    @patch('app.services.rag_service.rag_service.add_documents')
+    @patch('app.services.rag_service.rag_service.query')
+    @patch('app.agents.quant.quant_agent.run')
+    @patch('app.agents.macro.macro_agent.run')
+    @patch('app.agents.philosopher.philosopher_agent.run')
+    @patch('app.agents.regret.regret_agent.run')
+    @patch('app.agents.coach.coach_agent.run')
+    @patch('app.services.match_score_service.match_score_service.calculate_match_score')
+    def test_slow_agent_degrades_to_fallback(
+        self, mock_match, mock_coach, mock_regret, mock_phil, mock_macro, mock_quant, mock_rag, mock_add
+    ):
+        """An agent that misses the deadline is replaced by its fallback and flagged."""
+        import time
+        from app.core.deadline import get_current_deadline
+        
+        mock_rag.return_value = {"documents": [[]], "metadatas": [[]]}
+        fast_result = {"score": 50, "analysis": "Test", "confidence": 75}
+        
+        def slow_quant(context):
+            # Real LLM call is slow; the expired-deadline rerun answers instantly
+            if not get_current_deadline().expired():
+                time.sleep(1)
+            return {"score": 40, "analysis": "Rule-based", "confidence": 30}
+        
+        mock_quant.side_effect = slow_quant
+        mock_macro.return_value = dict(fast_result)
+        mock_phil.return_value = dict(fast_result)
+        mock_regret.return_value = dict(fast_result)
+        mock_coach.return_value = {"verdict": "HOLD", "score": 50}
+        mock_match.return_value = self._mock_match()
+        
+        orchestrator = FinancialOrchestrator()
+        orchestrator.current_asset_data["TEST"] = {"financials": {}, "technicals": {}}
+        
+        start = time.time()
+        result = orchestrator.retrieve_context("test query", "TEST", deadline_seconds=0.5)
+        
+        assert time.time() - start < 1.5
+        assert result["degraded"] is True
+        assert result["degraded_stages"] == ["quant"]
+        assert result["results"]["quant"]["degraded"] is True
+        assert "degraded" not in result["results"]["macro"]
+
+    
+    def test_llm_fallback_is_recorded(self):
+        """call_llm's rule-based fallback should be visible to the orchestrator."""
+        from app.agents.base import BaseAgent
+        from app.core.deadline import Deadline, deadline_scope, degradation_scope
+        
+        with deadline_scope(Deadline(0)), degradation_scope() as fallbacks:
+            answer = BaseAgent("Test").call_llm("prompt", fallback_func=lambda _: "rule-based")
+        assert answer == "rule-based"
+        assert fallbacks == ["deadline_exceeded"]
+    
+    @patch('app.services.rag_service.rag_service.add_documents')
+    @patch('app.services.rag_service.rag_service.query')
+    @patch('app.agents.quant.quant_agent.run')
+    @patch('app.agents.macro.macro_agent.run')
+    @patch('app.agents.philosopher.philosopher_agent.run')
+    @patch('app.agents.regret.regret_agent.run')
+    @patch('app.agents.coach.coach_agent.run')
+    @patch('app.services.match_score_service.match_score_service.calculate_match_score')
+    def test_in_time_fallback_is_reported_degraded(
+        self, mock_match, mock_coach, mock_regret, mock_phil, mock_macro, mock_quant, mock_rag, mock_add
+    ):
+        """An agent whose LLM call fell back before the deadline is still flagged."""
+        from app.core.deadline import record_degradation
+        
+        mock_rag.return_value = {"documents": [[]], "metadatas": [[]]}
+        fast_result = {"score": 50, "analysis": "Test", "confidence": 75}
+        
+        def timed_out_macro(context):
+            record_degradation("llm_unavailable")
+            return {"score": 45, "analysis": "Rule-based", "confidence": 30}
+        
+        mock_quant.return_value = dict(fast_result)
+        mock_macro.side_effect = timed_out_macro
+        mock_phil.return_value = dict(fast_result)
+        mock_regret.return_value = dict(fast_result)
+        mock_coach.return_value = {"verdict": "HOLD", "score": 50}
+        mock_match.return_value = self._mock_match()
+        
+        orchestrator = FinancialOrchestrator()
+        orchestrator.current_asset_data["TEST"] = {"financials": {}, "technicals": {}}
+        result = orchestrator.retrieve_context("test query", "TEST", deadline_seconds=5)
+        
+        assert result["degraded_stages"] == ["macro"]
+        assert result["results"]["macro"]["degraded_reason"] == "llm_unavailable"
+        assert "degraded" not in result["results"]["quant"]
+
+
+class TestInstantAnalysis:
+    """Tests for the heuristic instant tier."""
+    
+    def test_instant_result_without_llm(self):
+        """Instant tier should score from Scout data with no agent/LLM calls."""
+        from app.services.instant_analysis_service import instant_analysis_service
+        from app.models.investor_dna import DEFAULT_INVESTOR_DNA
+        
+        asset_data = {
+            "financials": {"sector": "Technology", "pe_ratio": 22, "profit_margins": 0.2,
+                           "return_on_equity": 0.3, "market_cap": "1.20T"},
+            "technicals": {"current_price": 105, "rsi_14": 55, "sma_50": 100,
+                           "trend_signal": "Strong Uptrend (Bullish)", "volatility_raw": 0.25,
+                           "pct_from_52w_high": -10,
+                           "history": [{"date": str(i), "price": 100 + i * 0.2} for i in range(30)]}
+        }
+        
+        with patch('app.agents.quant.quant_agent.run') as mock_quant:
+            result = instant_analysis_service.build_instant_result("TEST", asset_data, DEFAULT_INVESTOR_DNA)
+            mock_quant.assert_not_called()
+        
+        assert result["tier"] == "instant"
+        assert 0 <= result["match_score"] <= 100
+        assert set(result["results"]) == {"quant", "macro", "philosopher", "regret"}
+    
+    def test_job_lifecycle(self):
+        """Jobs should be pollable by request ID until refined."""
+        from app.services.instant_analysis_service import instant_analysis_service
+        
+        request_id = instant_analysis_service.create_job("TEST", {"tier": "instant"})
+        assert instant_analysis_service.get_job(request_id)["status"] == "pending"
+        
+        with patch('app.orchestrator.orchestrator.ingest_asset'), \
+             patch('app.orchestrator.orchestrator.retrieve_context', return_value={"match_score": 60}):
+            instant_analysis_service.run_refinement(request_id, "TEST")
+        
+        job = instant_analysis_service.get_job(request_id)
+        assert job["status"] == "completed"
+        assert job["refined"]["tier"] == "refined"
+
+
+class TestTracing:
+    """Tests for per-request tracing spans."""
+    
+    @patch('app.services.rag_service.rag_service.add_documents')
+    @patch('app.services.rag_service.rag_service.query')
+    @patch('app.agents.quant.quant_agent.run')
+    @patch('app.agents.macro.macro_agent.run')
+    @patch('app.agents.philosopher.philosopher_agent.run')
+    @patch('app.agents.regret.regret_agent.run')
+    @patch('app.agents.coach.coach_agent.run')
+    @patch('app.services.match_score_service.match_score_service.calculate_match_score')
+    def test_agent_spans_join_request_trace(
+        self, mock_match, mock_coach, mock_regret, mock_phil, mock_macro, mock_quant, mock_rag, mock_add
+    ):
+        """Spans opened in agent worker threads should nest under the request trace."""
+        from app.core.config import settings
+        from app.core.tracing import start_trace
+        
+        mock_rag.return_value = {"documents": [[]], "metadatas": [[]]}
+        for mock_agent in (mock_quant, mock_macro, mock_phil, mock_regret):
+            mock_agent.return_value = {"score": 50, "analysis": "Test", "confidence": 75}
+        mock_coach.return_value = {"verdict": "HOLD", "score": 50}
+        mock_match.return_value = TestDeadlines()._mock_match()
+        
+        orchestrator = FinancialOrchestrator()
+        orchestrator.current_asset_data["TEST"] = {"financials": {}, "technicals": {}}
+        
+        with patch.object(settings, "TRACE_EXPORT_PATH", None), \
+             start_trace("analyze", asset_id="TEST") as trace:
+            orchestrator.retrieve_context("test query", "TEST", deadline_seconds=0)
+            summary = trace.summary()
+        
+        names = {span["name"] for span in summary["spans"]}
+        assert {"agent.quant", "agent.macro", "agent.philosopher", "agent.regret",
+                "match_score", "agent.coach"} <= names
+        
+        root_id = next(s.span_id for s in trace.spans if s.parent_id is None)
+        agent_span = next(s for s in trace.spans if s.name == "agent.quant")
+        assert agent_span.parent_id == root_id
+        assert all(span["depth"] == 1 for span in summary["spans"] if span["name"].startswith("agent."))
+    
+    def test_straggler_spans_export_after_trace(self):
+        """Spans still open at export time should be exported when they finish."""
+        from app.core import tracing
+        
+        exported = []
+        with patch.object(tracing, "_submit_export", exported.append):
+            with tracing.start_trace("analyze") as trace:
+                with tracing.trace_span("fast"):
+                    pass
+                straggler = tracing.trace_span("straggler")
+                straggler.__enter__()
+            straggler.__exit__(None, None, None)
+        
+        assert trace.exported
+        assert {span["name"] for span in exported[0]} == {"analyze", "fast"}
+        assert [span["name"] for span in exported[1]] == ["straggler"]
+        assert exported[1][0]["tags"]["late"] == "True"
+    
+    def test_trace_file_rotates_at_size_cap(self, tmp_path):
+        """The JSONL export should roll over instead of growing without bound."""
+        from app.core import tracing
+        from app.core.config import settings
+        
+        path = str(tmp_path / "traces.jsonl")
+        with patch.object(settings, "TRACE_EXPORT_MAX_BYTES", 100):
+            for i in range(5):
+                tracing._write_file(path, "x" * 40 + "\n")
+        
+        assert (tmp_path / "traces.jsonl.1").exists()
+        assert (tmp_path / "traces.jsonl").stat().st_size <= 100
@@ -0,0 +1,103 @@
+"""
+Tests for the local OHLCV price store.
+"""
+import numpy as np
+
+
+class TestPriceStore:
+    """Tests for the local OHLCV store's incremental sync."""
+    
+    @staticmethod
+    def _frame(start, days):
+        import pandas as pd
+        dates = pd.date_range(start, periods=days, freq="D")
+        closes = [100.0 + i for i in range(days)]
+        return pd.DataFrame({"open": closes, "high": closes, "low": closes, "close": closes, "volume": 1000}, index=dates)
+    
+    def test_sync_appends_only_new_bars(self, tmp_path, monkeypatch):
+        from app.services.price_store import PriceStore
+        
+        store = PriceStore(str(tmp_path), refresh_seconds=0)
+        downloads = []
+        
+        def fake_download(symbol, start, end):
+            downloads.append(str(start))
+            frame = self._frame("2024-01-01", 10) if len(downloads) == 1 else self._frame("2024-01-10", 3)
+            frame.loc[frame.index[0], "close"] = 999.0 if len(downloads) > 1 else frame["close"].iloc[0]
+            return store._frame_to_bars(frame)
+        
+        monkeypatch.setattr(store, "_download", fake_download)
+        store.get_bars("TEST", start="2024-01-01")
+        bars = store.get_bars("TEST", start="2024-01-01")
+        
+        # Second sync starts from the last stored bar and overwrites it
+        assert downloads == ["2024-01-01", "2024-01-10"]
+        assert len(bars) == 12
+        assert bars["close"][9] == 999.0
+        assert str(bars["date"][-1]) == "2024-01-12"
+        
+        window = store.get_bars("TEST", start="2024-01-03", end="2024-01-05", sync=False)
+        assert window["close"].tolist() == [102.0, 103.0, 104.0]
+        assert window.base is None or not isinstance(window.base, np.memmap)  # Copied out of the mapping
+    
+    def test_historical_window_fetches_only_missing_range(self, tmp_path, monkeypatch):
+        from app.services.price_store import PriceStore
+        
+        store = PriceStore(str(tmp_path), refresh_seconds=900)
+        windows = []
+        
+        def fake_download(symbol, start, end):
+            windows.append((str(start), str(end)))
+            days = (end - start).astype(int) + 1
+            return store._frame_to_bars(self._frame(str(start), days))
+        
+        monkeypatch.setattr(store, "_download", fake_download)
+        assert len(store.get_bars("TEST", start="2020-01-10", end="2020-01-20")) == 11
+        assert len(store.get_bars("TEST", start="2020-01-12", end="2020-01-18")) == 7  # Stored: no fetch
+        store.get_bars("TEST", start="2020-01-01", end="2020-01-25")
+        
+        assert windows == [
+            ("2020-01-10", "2020-01-20"),
+            ("2020-01-01", "2020-01-10"),  # Missing prefix
+            ("2020-01-20", "2020-01-25"),  # Missing suffix, not up to today
+        ]
+    
+    def test_sync_many_fills_the_gap_of_an_old_store(self, tmp_path, monkeypatch):
+        import pandas as pd
+        from datetime import date, timedelta
+        from app.services.price_store import PriceStore
+        
+        store = PriceStore(str(tmp_path), refresh_seconds=900)
+        today = date.today()
+        old_end = today - timedelta(days=30)
+        for symbol in ("OLD", "OLD2"):
+            store.merge_frame(symbol, self._frame(str(old_end - timedelta(days=59)), 60))
+        
+        # A recent frame that doesn't join the stored span leaves the store stale
+        store.merge_frame("OLD", self._frame(str(today - timedelta(days=4)), 5))
+        assert store._load_meta("OLD")["requested_to"] == str(old_end)
+        assert "synced_at" not in store._load_meta("OLD")
+        
+        calls = []
+        make_frame = self._frame
+        
+        class FakeTicker:
+            def __init__(self, symbols, asynchronous=False):
+                self.symbols = symbols
+            
+            def history(self, interval, **params):
+                calls.append(params)
+                start = pd.Timestamp(params["start"])
+                days = (pd.Timestamp(params["end"]) - start).days
+                return pd.concat({s: make_frame(str(start.date()), days) for s in self.symbols}, names=["symbol", "date"])
+        
+        monkeypatch.setattr("app.core.providers.Ticker", FakeTicker)
+        assert store.sync_many(["OLD", "OLD2"]) == 2
+        
+        # One bulk call from the last stored bar through today
+        assert calls == [{"start": str(old_end), "end": str(today + timedelta(days=1))}]
+        bars = store.get_bars("OLD", sync=False)
+        assert len(bars) == 60 + 30
+        assert (np.diff(bars["date"]).astype(int) == 1).all()  # No hole
+        meta = store._load_meta("OLD")
+        assert meta["requested_to"] == str(today) and "synced_at" in meta
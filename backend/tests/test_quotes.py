@@ -0,0 +1,119 @@
+"""
+Tests for batched quotes and the quote stream.
+"""
+
+
+class TestQuoteService:
+    """Quotes for many symbols should come from one batched call and a short cache."""
+    
+    def test_one_batch_then_cached(self, monkeypatch):
+        from unittest.mock import MagicMock
+        from app.services.quote_service import QuoteService
+        
+        batches = []
+        
+        def fake_ticker(symbols, **kwargs):
+            batches.append(list(symbols))
+            modules = {
+                s: {
+                    "price": {"regularMarketPrice": 110.0, "regularMarketPreviousClose": 100.0,
+                              "regularMarketVolume": 1000, "marketCap": 2.5e12, "currency": "USD", "longName": s},
+                    "summaryDetail": {"fiftyTwoWeekHigh": 120.0, "fiftyTwoWeekLow": 80.0, "trailingPE": 25.0}
+                }
+                for s in symbols if s != "BAD"
+            }
+            modules["BAD"] = "Quote not found for ticker symbol: BAD"
+            return MagicMock(get_modules=MagicMock(return_value=modules))
+        
+        monkeypatch.setattr("app.services.quote_service.Ticker", fake_ticker)
+        service = QuoteService(ttl_seconds=60)
+        
+        quotes = service.get_quotes(["reliance.ns", "AAPL", "BAD", "AAPL"])
+        assert list(quotes) == ["RELIANCE.NS", "AAPL", "BAD"]
+        assert batches == [["RELIANCE.NS", "AAPL", "BAD"]]
+        assert quotes["AAPL"]["change"] == 10.0 and quotes["AAPL"]["market_cap"] == "2.50T"
+        assert quotes["RELIANCE.NS"]["currency"] == "INR"
+        assert "error" in quotes["BAD"]
+        
+        service.get_quotes(["AAPL", "RELIANCE.NS", "MSFT", "BAD"])
+        assert batches[1] == ["MSFT"]  # Only the uncached symbol is fetched; errors are cached too
+        assert service.get_stats()["upstream_calls"] == 2
+        
+        service._expires_at["AAPL"] = 0  # Expired entries are evicted on the next fetch
+        service.get_quotes(["TSLA"])
+        assert "AAPL" not in service._quotes and service.get_stats()["evictions"] == 1
+
+
+class TestQuoteStream:
+    """One batched poll should fan out to every subscriber of a symbol."""
+    
+    def test_fan_out_and_change_detection(self, monkeypatch):
+        import asyncio
+        from app.services.quote_stream_service import QuoteStreamService
+        
+        prices = {"AAPL": 100.0, "TCS.NS": 50.0, "MSFT": 10.0}
+        batches = []
+        
+        def fake_quotes(symbols):
+            batches.append(sorted(symbols))
+            return {s: {"symbol": s, "price": prices[s], "change": 0, "volume": 0} for s in symbols}
+        
+        monkeypatch.setattr("app.services.quote_service.quote_service.get_quotes", fake_quotes)
+        service = QuoteStreamService(interval_seconds=60, max_symbols_per_client=2)
+        monkeypatch.setattr(service, "start", lambda: None)
+        
+        async def scenario():
+            first = service.subscribe(["aapl", "TCS.NS", "MSFT"])
+            second = service.subscribe(["AAPL"])
+            assert first.symbols == {"AAPL", "TCS.NS"}  # Capped per client
+            
+            assert service.poll_once() == 3
+            await asyncio.sleep(0)
+            assert first.queue.qsize() == 2 and second.queue.qsize() == 1
+            
+            assert service.poll_once() == 0  # Unchanged quotes aren't re-sent
+            prices["AAPL"] = 101.0
+            assert service.poll_once() == 2
+            await asyncio.sleep(0)
+            assert (await second.queue.get())["quote"]["price"] == 100.0
+            assert (await second.queue.get())["quote"]["price"] == 101.0
+            
+            late = service.subscribe(["AAPL"])
+            await asyncio.sleep(0)
+            assert late.queue.qsize() == 1  # Snapshot of the last quote
+            
+            for subscriber in (first, second, late):
+                service.unsubscribe(subscriber)
+            assert service.poll_once() == 0
+        
+        asyncio.run(scenario())
+        assert batches == [["AAPL", "TCS.NS"]] * 3
+        assert service.get_status()["subscribers"] == 0
+    
+    def test_live_indicators_evaluated_outside_the_lock(self, monkeypatch):
+        import asyncio
+        from app.services.quote_stream_service import QuoteStreamService, _LIVE_INDICATORS
+        
+        service = QuoteStreamService(interval_seconds=60, max_symbols_per_client=5)
+        monkeypatch.setattr(service, "start", lambda: None)
+        monkeypatch.setattr(
+            "app.services.quote_service.quote_service.get_quotes",
+            lambda symbols: {s: {"symbol": s, "price": 100.0, "change": 0, "volume": 0} for s in symbols}
+        )
+        
+        def live(symbol, price):
+            # Subscriptions must not wait on a slow indicator state
+            assert service._lock.acquire(timeout=1)
+            service._lock.release()
+            return {k: 1.0 for k in _LIVE_INDICATORS}
+        
+        monkeypatch.setattr("app.services.indicator_state_service.indicator_states.live", live)
+        
+        async def scenario():
+            subscriber = service.subscribe(["AAPL"])
+            assert service.poll_once() == 1
+            await asyncio.sleep(0)
+            assert (await subscriber.queue.get())["quote"]["indicators"]["rsi_14"] == 1.0
+            assert "indicators" in service._last["AAPL"]  # Snapshot for late subscribers
+        
+        asyncio.run(scenario())
@@ -0,0 +1,54 @@
+"""
+Tests for the RBI policy rate store.
+"""
+import time
+
+
+class TestRBIStore:
+    """RBI rates should be served from the persisted store without scraping."""
+    
+    def test_persisted_rate_served_and_refreshed_when_stale(self, tmp_path, monkeypatch):
+        import json
+        from app.services.rbi_service import RBIService
+        
+        store_path = tmp_path / "rbi.json"
+        store_path.write_text(json.dumps({"repo_rate": 6.5, "fetched_at": time.time() - 100}))
+        scrapes = []
+        monkeypatch.setattr(RBIService, "_scrape", lambda self: scrapes.append(1) or {"repo_rate": 6.25})
+        
+        fresh = RBIService(str(store_path), refresh_seconds=3600).get_real_time_rates()
+        assert fresh["repo_rate"] == 6.5 and not fresh["stale"]
+        assert scrapes == []
+        
+        service = RBIService(str(store_path), refresh_seconds=10)
+        stale = service.get_real_time_rates()
+        assert stale["repo_rate"] == 6.5 and stale["stale"]  # Served instantly
+        for _ in range(50):
+            if scrapes and not service._fetch_lock.locked():
+                break
+            time.sleep(0.02)
+        assert service.get_real_time_rates()["repo_rate"] == 6.25
+        assert json.loads(store_path.read_text())["repo_rate"] == 6.25
+    
+    def test_failed_scrape_backs_off(self, tmp_path, monkeypatch):
+        from app.services.rbi_service import RBIService
+        
+        scrapes = []
+        monkeypatch.setattr(RBIService, "_scrape", lambda self: scrapes.append(1) or {"error": "unreachable"})
+        service = RBIService(str(tmp_path / "rbi.json"), refresh_seconds=10, retry_backoff_seconds=60)
+        
+        assert service.get_real_time_rates() == {"error": "unreachable"}
+        assert service.get_real_time_rates() == {"error": "unreachable"}  # No second scrape
+        assert len(scrapes) == 1
+        
+        service._rates = {"repo_rate": 6.5, "fetched_at": time.time() - 100}
+        assert service.get_real_time_rates()["stale"]
+        assert not service._fetch_lock.locked() and len(scrapes) == 1  # Stale value, no new thread
+        
+        service._last_attempt -= 60  # Backoff over: the stale value triggers a retry
+        service.get_real_time_rates()
+        for _ in range(50):
+            if len(scrapes) == 2 and not service._fetch_lock.locked():
+                break
+            time.sleep(0.02)
+        assert len(scrapes) == 2
@@ -0,0 +1,68 @@
+"""
+Tests for the Screener.in scraper cache.
+"""
+
+
+class TestScreenerCache:
+    """Screener pages should be parsed once and revalidated conditionally."""
+    
+    PAGE = b"""<html><body>
+        <ul id="top-ratios">
+          <li><span class="name">Market Cap</span><span class="nowrap value">
+            <span class="number">1,234</span> Cr.</span></li>
+          <li><span class="name">ROCE</span><span class="number">18.5</span> %</li>
+        </ul>
+        <section id="shareholding"><table>
+          <tr><th>Promoters +</th><td>50.1%</td><td>50.3%</td></tr>
+        </table></section>
+    </body></html>"""
+    
+    def test_cached_then_conditionally_refetched(self, cache, monkeypatch):
+        from unittest.mock import MagicMock
+        from app.services.screener_service import ScreenerService
+        
+        responses = [
+            MagicMock(status_code=200, content=self.PAGE, headers={"ETag": '"v1"'}),
+            MagicMock(status_code=304, content=b"", headers={}),
+        ]
+        sent_headers = []
+        
+        def fake_get(url, headers=None, **kwargs):
+            sent_headers.append(headers)
+            return responses[len(sent_headers) - 1]
+        
+        monkeypatch.setattr("app.services.screener_service.tiered_cache", cache)
+        monkeypatch.setattr("app.services.screener_service.http_get", fake_get)
+        service = ScreenerService()
+        
+        first = service.get_data("TEST.NS")
+        assert first["screener_market_cap"] == 1234.0
+        assert first["roce"] == 18.5
+        assert first["promoter_holding"] == 50.3
+        
+        assert service.get_data("TEST.NS") == first  # Same day: no request
+        assert len(sent_headers) == 1
+        
+        assert first["stale"] is False and first["fetched_at"]
+        
+        monkeypatch.setattr(ScreenerService, "DAILY_TTL_SECONDS", 0)
+        stale = service.get_data("TEST.NS")
+        assert stale["roce"] == 18.5  # Served while revalidating
+        assert stale["stale"] is True
+        assert "screener_market_cap" not in stale  # Price-driven, older than a day
+        service._executor.shutdown(wait=True)
+        assert sent_headers[1]["If-None-Match"] == '"v1"'
+    
+    def test_empty_parse_not_cached(self, cache, monkeypatch):
+        from unittest.mock import MagicMock
+        from app.services.screener_service import ScreenerService
+        
+        pages = [b"<html><body>Please log in</body></html>", self.PAGE]
+        monkeypatch.setattr("app.services.screener_service.tiered_cache", cache)
+        monkeypatch.setattr("app.services.screener_service.http_get",
+                            lambda url, **kwargs: MagicMock(status_code=200, content=pages.pop(0), headers={}))
+        service = ScreenerService()
+        
+        assert "error" in service.get_data("TEST.NS")
+        assert cache.get(ScreenerService.CACHE_NAMESPACE, "TEST") is None
+        assert service.get_data("TEST.NS")["roce"] == 18.5
@@ -0,0 +1,89 @@
+"""
+Tests for the symbol index and ticker resolution.
+"""
+import pytest
+
+from app.services.symbol_index import SymbolIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    master = tmp_path / "symbols.csv"
+    master.write_text(
+        "symbol,name,exchange\n"
+        "TCS,Tata Consultancy Services Limited,NSE\n"
+        "TATAPOWER,Tata Power Company Limited,NSE\n"
+        "500325,Reliance Industries Ltd,BSE\n"
+        "PFE,Pfizer Inc.,US\n"
+    )
+    return SymbolIndex(str(master)).load()
+
+
+class TestSymbolIndex:
+    
+    def test_prefix_suggestions_ranked(self, index):
+        tickers = [s["ticker"] for s in index.suggest("tata", limit=10)]
+        assert tickers[:2] == ["TATASTEEL.NS", "TATAMOTORS.NS"]  # Curated aliases first
+        assert "TATAPOWER.NS" in tickers and "TCS.NS" in tickers
+        assert index.suggest("consultancy")[0]["ticker"] == "TCS.NS"  # Later word of a name
+        assert index.suggest("pfe")[0] == {"name": "Pfizer Inc.", "ticker": "PFE", "exchange": "US"}
+        assert index.suggest("500")[0]["ticker"] == "500325.BO"
+    
+    def test_fuzzy_suggestions_for_misspellings(self, index):
+        top = index.suggest("relaince", limit=3)[0]
+        assert top["ticker"] == "RELIANCE.NS" and top["score"] >= index.SUGGEST_FUZZY_THRESHOLD
+    
+    def test_resolve(self, index):
+        assert index.resolve("Tata Consultancy Services Ltd") == "TCS.NS"
+        assert index.resolve("hdfc bank share price") == "HDFCBANK.NS"
+        assert index.resolve("Pfizer") == "PFE"
+        assert index.resolve("relaince industries") == "RELIANCE.NS"
+        assert index.resolve("metaverse labs") is None
+
+
+class TestTickerResolution:
+    
+    def test_search_results_memoised(self, tmp_path, monkeypatch):
+        from app.services import ticker_search_service
+        from app.services.ticker_memo import TickerMemo
+        
+        memo = TickerMemo(str(tmp_path / "memo.json"), ttl_seconds=3600, negative_ttl_seconds=60)
+        results = {"xyz widgets": "XYZ.NS", "nowhere corp": None}
+        calls = []
+        
+        def fake_search(name):
+            calls.append(name)
+            if name == "flaky co":
+                raise ConnectionError("offline")
+            return results[name]
+        
+        monkeypatch.setattr("app.services.ticker_memo.ticker_memo", memo)
+        monkeypatch.setattr(ticker_search_service, "search_ticker_local", lambda name: None)
+        monkeypatch.setattr(ticker_search_service, "_search_duckduckgo", fake_search)
+        resolve = ticker_search_service.resolve_company_to_ticker
+        
+        assert resolve("xyz widgets") == ("XYZ.NS", "search")
+        assert resolve("XYZ  Widgets") == ("XYZ.NS", "search")
+        assert resolve("nowhere corp") == ("NOWHERECORP", "passthrough")
+        assert resolve("nowhere corp") == ("NOWHERECORP", "passthrough")  # Negative hit
+        assert resolve("flaky co")[1] == "passthrough"
+        assert resolve("flaky co")[1] == "passthrough"  # Failures are not memoised
+        assert calls == ["xyz widgets", "nowhere corp", "flaky co", "flaky co"]
+        
+        stats = memo.get_stats()
+        assert (stats["entries"], stats["negative_entries"], stats["hits"], stats["negative_hits"]) == (2, 1, 1, 1)
+        
+        memo.seed({"acme holdings": "acme.ns"})
+        assert resolve("Acme Holdings") == ("ACME.NS", "seed")
+        
+        reloaded = TickerMemo(str(tmp_path / "memo.json"), ttl_seconds=3600, negative_ttl_seconds=60)
+        assert reloaded.lookup("xyz widgets")["ticker"] == "XYZ.NS"
+        assert reloaded.entries()[0]["name"] in ("xyz widgets", "nowhere corp")
+    
+    def test_expired_entries_dropped(self, tmp_path):
+        from app.services.ticker_memo import TickerMemo
+        
+        memo = TickerMemo(str(tmp_path / "memo.json"), ttl_seconds=3600, negative_ttl_seconds=60)
+        memo.record("gone inc", "GONE", ttl=-1)
+        assert memo.lookup("gone inc") is None
+        assert memo.get_stats()["expired"] == 1
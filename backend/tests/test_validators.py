@@ -0,0 +1,91 @@
+"""
+Tests for the stateless data validator and sanity checker.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.data_validator import DataValidator
+from app.services.sanity_checker import SanityChecker
+
+
+def _technicals(prev, last, price=None):
+    return {
+        "current_price": price if price is not None else last,
+        "history": [{"date": "2025-01-01", "price": prev}, {"date": "2025-01-02", "price": last}]
+    }
+
+
+class TestDataValidator:
+    
+    def test_batch_matches_single(self):
+        validator = DataValidator()
+        assets = {
+            "RELIANCE.NS": ({"currency": "USD", "market_cap": "20T", "current_price": 100}, _technicals(100, 115, 120)),
+            "AAPL": ({"currency": "USD", "market_cap": "4.2T", "current_price": 200}, _technicals(200, 196)),
+            "MSFT": ({"currency": "USD", "market_cap": "3T"}, {"history": []}),
+        }
+        batch = validator.validate_batch(assets)
+        for asset_id, (financials, technicals) in assets.items():
+            assert batch[asset_id] == validator.validate_and_enrich(financials, technicals, asset_id)
+        
+        financials, technicals, anomalies = batch["RELIANCE.NS"]
+        assert financials["currency"] == "INR" and financials["currency_original"] == "USD"
+        assert [a["type"] for a in anomalies] == ["abnormal_price_movement", "price_mismatch"]
+        assert anomalies[0]["severity"] == "EXTREME"
+        assert validator.get_news_search_query(anomalies, "RELIANCE.NS") == "RELIANCE.NS stock surge reason today"
+        
+        assert [a["type"] for a in batch["AAPL"][2]] == ["suspicious_market_cap"]
+        assert batch["MSFT"][2] == []
+        assert "currency_corrected" not in assets["RELIANCE.NS"][0]  # Inputs untouched
+    
+    def test_single_asset_skips_the_frame(self, monkeypatch):
+        validator = DataValidator()
+        monkeypatch.setattr(validator, "scan", lambda frame: pytest.fail("single asset built a frame"))
+        _, _, anomalies = validator.validate_and_enrich({"currency": "USD"}, _technicals(100, 90), "AAPL")
+        assert [a["severity"] for a in anomalies] == ["EXTREME"]
+    
+    def test_concurrent_calls_do_not_share_state(self):
+        validator = DataValidator()
+        
+        def validate(i):
+            asset_id = f"T{i}.NS" if i % 2 else f"T{i}"
+            _, technicals, anomalies = validator.validate_and_enrich(
+                {"currency": "USD"}, _technicals(100, 120 if i % 2 else 100), asset_id
+            )
+            return i, technicals["_corrections"], anomalies
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for i, corrections, anomalies in pool.map(validate, range(200)):
+                assert len(corrections) == len(anomalies) == i % 2
+
+
+class TestSanityChecker:
+    
+    def test_batch_matches_single(self):
+        checker = SanityChecker()
+        assets = {
+            "TCS.NS": {"debt_to_equity": 10.17, "profit_margins": 0.2, "sector": "Technology", "market_cap": "15T"},
+            "ABC": {"debt_to_equity": 150.0, "sector": "Technology", "market_cap": "2T"},
+            "XYZ": {"debt_to_equity": None, "pe_ratio": -4, "profit_margins": -0.6},
+        }
+        batch = checker.check_batch(assets)
+        for asset_id, financials in assets.items():
+            assert batch[asset_id] == checker.check_financials(financials, asset_id)
+        
+        tcs, alerts = batch["TCS.NS"]
+        assert tcs["debt_to_equity"] == 0.1017 and tcs["debt_to_equity_corrected"]
+        assert [a.severity for a in alerts] == ["CRITICAL", "CRITICAL"]  # Known low-debt + IT conflict
+        
+        abc, alerts = batch["ABC"]
+        assert abc["debt_to_equity"] == 150.0  # Outside the percentage-error range
+        assert [a.severity for a in alerts] == ["ERROR", "WARNING"]
+        
+        _, alerts = batch["XYZ"]
+        assert [a.field for a in alerts] == ["pe_ratio", "profit_margins"]
+    
+    def test_single_asset_skips_the_frame(self, monkeypatch):
+        checker = SanityChecker()
+        monkeypatch.setattr(checker, "scan", lambda frame: pytest.fail("single asset built a frame"))
+        _, alerts = checker.check_financials({"debt_to_equity": 8, "sector": "Retail", "market_cap": "1.2T"}, "XOM")
+        assert [a.severity for a in alerts] == ["WARNING"]  # Large-cap non-financial with high D/E